@@ -0,0 +1,210 @@
+"""Benchmark de carga de los CSV del pipeline: lectura antigua vs carga tipada.
+
+Para cada etapa compara la lectura que hacía el script (parser inferido,
+``engine='python'`` en la integración y ``astype`` posterior en la limpieza)
+con ``carga_datos`` (esquema declarado, ``usecols`` por etapa y motor pyarrow o
+C). Los datasets se replican ``--factor`` veces en un directorio temporal para
+que los tiempos sean medibles. Cada medición corre en un proceso nuevo y
+reporta:
+
+- tiempo de carga (mejor de ``--repeticiones``),
+- pico de RSS añadido por la carga (ru_maxrss tras cargar - antes de cargar),
+- memoria del DataFrame resultante (``memory_usage(deep=True)``),
+
+y comprueba que la carga tipada da los mismos valores que la antigua en las
+columnas proyectadas. Un método que no puede leer el fichero (p. ej. pyarrow
+con celdas de varias líneas en el corte de un bloque de los CSV replicados,
+que en el pipeline se releen con el parser en C) se informa como "n/a" con el
+motivo; un proceso que muere o pasa de ``--timeout`` segundos, también.
+
+Uso (desde la raíz del proyecto):
+    python bench/bench_carga.py [--factor 200] [--repeticiones 3] [--timeout 600]
+"""
+
+import argparse
+import multiprocessing
+import os
+import queue
+import resource
+import sys
+import tempfile
+import time
+
+RUTA_BENCH = os.path.dirname(os.path.abspath(__file__))
+RUTA_PROYECTO = os.path.dirname(RUTA_BENCH)
+sys.path.insert(0, os.path.join(RUTA_PROYECTO, "src"))
+
+import pandas as pd  # noqa: E402
+
+import carga_datos  # noqa: E402
+
+RUTA_DATASET = os.path.join(RUTA_PROYECTO, "dataset")
+FICHEROS = {
+    "indeed": ("indeed_global_final.csv", ","),
+    "integrado": ("Global Data Analyst Job Market 2025.csv", ";"),
+    "limpio": ("Global Data Analyst Job Market_Clean.csv", ";"),
+}
+# etapa -> fichero que lee
+ETAPAS = {
+    "integracion": "indeed",
+    "limpieza": "integrado",
+    "analisis": "limpio",
+    "visualizacion": "limpio",
+}
+
+
+def carga_antigua(etapa: str, ruta: str) -> pd.DataFrame:
+    """Lo que hacía cada script antes de carga_datos.py."""
+    if etapa == "integracion":
+        df = pd.read_csv(ruta, sep=",", quotechar='"', engine="python", on_bad_lines="warn")
+        return df[[c for c in carga_datos.COLUMNAS_ETAPA["integracion"] if c in df.columns]]
+    df = pd.read_csv(ruta, sep=";")
+    if etapa == "limpieza":
+        for col in ["pais", "modalidad"]:
+            df[col] = df[col].astype("category")
+        df["es_teletrabajo"] = df["es_teletrabajo"].astype(bool)
+    return df
+
+
+def carga_nueva(etapa: str, ruta: str, motor: str) -> pd.DataFrame:
+    if etapa == "integracion":
+        return carga_datos.cargar_indeed(ruta, motor)
+    return carga_datos.cargar_mercado(ruta, etapa, motor)
+
+
+class FalloMedicion(Exception):
+    """El método no pudo cargar el fichero (no aplicable) o su proceso murió."""
+
+
+def _medir(etapa, ruta, metodo, repeticiones, cola):
+    cargar = (lambda: carga_antigua(etapa, ruta)) if metodo == "antigua" else \
+        (lambda: carga_nueva(etapa, ruta, metodo))
+    try:
+        rss_antes = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        mejor = float("inf")
+        for i in range(repeticiones):
+            inicio = time.perf_counter()
+            df = cargar()
+            mejor = min(mejor, time.perf_counter() - inicio)
+            if i < repeticiones - 1:
+                del df
+        rss_despues = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    except Exception as e:
+        cola.put(("error", f"{type(e).__name__}: {e}"))
+        return
+    # ru_maxrss va en KB en Linux y en bytes en macOS
+    escala = 1 if sys.platform == "darwin" else 1024
+    cola.put(("ok", (mejor, (rss_despues - rss_antes) * escala, int(df.memory_usage(deep=True).sum()))))
+
+
+def medir(etapa: str, ruta: str, metodo: str, repeticiones: int, timeout: float | None = None) -> tuple:
+    """(segundos, pico RSS añadido, bytes del DataFrame) en un proceso limpio.
+
+    Lanza ``FalloMedicion`` si la carga falla, si el proceso muere sin dar
+    resultado o si tarda más de ``timeout`` segundos.
+    """
+    contexto = multiprocessing.get_context("spawn")
+    cola = contexto.Queue()
+    proceso = contexto.Process(target=_medir, args=(etapa, ruta, metodo, repeticiones, cola))
+    proceso.start()
+    limite = None if timeout is None else time.monotonic() + timeout
+    try:
+        while True:
+            try:
+                estado, resultado = cola.get(timeout=1.0)
+                break
+            except queue.Empty:
+                if not proceso.is_alive():
+                    # Lo que dejó justo antes de salir aún puede estar llegando
+                    try:
+                        estado, resultado = cola.get(timeout=1.0)
+                        break
+                    except queue.Empty:
+                        raise FalloMedicion(f"el proceso terminó con código {proceso.exitcode}") from None
+                if limite is not None and time.monotonic() > limite:
+                    proceso.terminate()
+                    raise FalloMedicion(f"más de {timeout:.0f}s") from None
+    finally:
+        proceso.join()
+        cola.close()
+    if estado == "error":
+        raise FalloMedicion(resultado)
+    return resultado
+
+
+def replicar(directorio: str, factor: int) -> dict:
+    rutas = {}
+    for clave, (nombre, sep) in FICHEROS.items():
+        origen = os.path.join(RUTA_DATASET, nombre)
+        if not os.path.exists(origen):
+            continue
+        df = pd.read_csv(origen, sep=sep)
+        ruta = os.path.join(directorio, nombre)
+        pd.concat([df] * factor, ignore_index=True).to_csv(ruta, sep=sep, index=False, encoding="utf-8-sig")
+        rutas[clave] = ruta
+    return rutas
+
+
+def mismos_valores(etapa: str, ruta: str, motor: str) -> bool:
+    antigua = carga_antigua(etapa, ruta)
+    nueva = carga_nueva(etapa, ruta, motor)
+    antigua = antigua[nueva.columns]
+    for col in nueva.columns:
+        a, b = antigua[col], nueva[col]
+        if isinstance(b.dtype, pd.CategoricalDtype) or isinstance(a.dtype, pd.CategoricalDtype):
+            a, b = a.astype(object), b.astype(object)
+        if pd.api.types.is_numeric_dtype(b) and pd.api.types.is_numeric_dtype(a):
+            a, b = a.astype("float64"), b.astype("float64")
+        if not a.astype(object).equals(b.astype(object)):
+            return False
+    return True
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--factor", type=int, default=200, help="veces que se replica cada CSV")
+    parser.add_argument("--repeticiones", type=int, default=3)
+    parser.add_argument("--timeout", type=float, default=600, help="segundos máximos por medición")
+    args = parser.parse_args()
+
+    motores = ["c"] + (["pyarrow"] if carga_datos.motor_csv() == "pyarrow" else [])
+    errores = []
+    no_aplicables = []
+    with tempfile.TemporaryDirectory() as directorio:
+        rutas = replicar(directorio, args.factor)
+        if not rutas:
+            print(f"[ERROR] No hay CSV del pipeline en {RUTA_DATASET}")
+            return 1
+
+        print(f"\n{'etapa':<15}{'método':<10}{'filas':>9}{'s':>8}{'x':>7}{'pico MB':>9}{'df MB':>8}")
+        for etapa, clave in ETAPAS.items():
+            if clave not in rutas:
+                continue
+            ruta = rutas[clave]
+            with open(ruta, encoding="utf-8-sig") as f:
+                filas = sum(1 for _ in f) - 1
+            t_antigua = None
+            for metodo in ["antigua"] + motores:
+                try:
+                    segundos, pico, memoria_df = medir(etapa, ruta, metodo, args.repeticiones, args.timeout)
+                except FalloMedicion as e:
+                    print(f"{etapa:<15}{metodo:<10}{filas:>9}{'n/a':>8}")
+                    no_aplicables.append(f"{etapa}/{metodo} ({e})")
+                    continue
+                t_antigua = t_antigua or segundos
+                print(f"{etapa:<15}{metodo:<10}{filas:>9}{segundos:>8.3f}{t_antigua / segundos:>7.1f}"
+                      f"{pico / 2**20:>9.1f}{memoria_df / 2**20:>8.1f}")
+                if metodo != "antigua" and not mismos_valores(etapa, ruta, metodo):
+                    errores.append(f"{etapa}/{metodo}")
+
+    for motivo in no_aplicables:
+        print(f"\n[INFO] No aplicable: {motivo}")
+    if errores:
+        print(f"\n[ERROR] Valores distintos a la carga antigua en: {', '.join(errores)}")
+        return 1
+    print("\n[OK] La carga tipada da los mismos valores que la antigua en todas las etapas")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,96 @@
+"""Benchmark del clustering económico: K-Means por fila vs deduplicado con pesos.
+
+Replica ``--factor`` veces el dataset limpio y, para cada factor, ajusta el
+StandardScaler + K-Means de registro_modelos.py de dos formas:
+
+- por fila: ``fit`` sobre todas las ofertas (lo que se hacía antes),
+- deduplicado: ``fit`` sobre los vectores distintos con ``sample_weight`` y
+  etiquetas repartidas a las filas (``seleccion_clusters.deduplicar``).
+
+Reporta el tiempo de cada uno (incluida la deduplicación) y comprueba que la
+inercia coincide y que cada fila recibe el mismo papel. Los números de cluster
+de K-Means pueden venir permutados entre los dos ajustes, así que se comparan
+las etiquetas ya traducidas con ``roles_por_coste`` (como en registro_modelos,
+un nombre distinto por cluster).
+
+Uso (desde la raíz del proyecto):
+    python bench/bench_clustering.py [--factor 1 100 1000]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+RUTA_BENCH = os.path.dirname(os.path.abspath(__file__))
+RUTA_PROYECTO = os.path.dirname(RUTA_BENCH)
+sys.path.insert(0, os.path.join(RUTA_PROYECTO, "src"))
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+from sklearn.preprocessing import StandardScaler  # noqa: E402
+
+import registro_modelos  # noqa: E402
+from carga_datos import cargar_mercado  # noqa: E402
+from seleccion_clusters import COLUMNA_COSTE, COLUMNAS_CLUSTER, crear_modelo, deduplicar, roles_por_coste  # noqa: E402
+
+RUTA_LIMPIO = os.path.join(RUTA_PROYECTO, "dataset", "Global Data Analyst Job Market_Clean.csv")
+
+
+def por_fila(df: pd.DataFrame) -> tuple[np.ndarray, float]:
+    X = StandardScaler().fit_transform(df[COLUMNAS_CLUSTER])
+    kmeans = crear_modelo(registro_modelos.n_clusters, registro_modelos.random_state,
+                          n_init=registro_modelos.n_init).fit(X)
+    return kmeans.labels_, kmeans.inertia_
+
+
+def deduplicado(df: pd.DataFrame) -> tuple[np.ndarray, float]:
+    unicos, pesos, inversa = deduplicar(df[COLUMNAS_CLUSTER])
+    X = StandardScaler().fit(unicos, sample_weight=pesos).transform(unicos)
+    kmeans = crear_modelo(registro_modelos.n_clusters, registro_modelos.random_state,
+                          n_init=registro_modelos.n_init).fit(X, sample_weight=pesos)
+    return kmeans.labels_[inversa], kmeans.inertia_
+
+
+def roles_filas(df: pd.DataFrame, etiquetas: np.ndarray) -> np.ndarray:
+    """Papel de cada fila según el coste de vida medio de su cluster."""
+    roles = roles_por_coste(df[COLUMNA_COSTE].groupby(etiquetas).mean())
+    return pd.Series(etiquetas).map(roles).to_numpy()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--factor", type=int, nargs="+", default=[1, 100, 1000])
+    args = parser.parse_args()
+
+    if not os.path.exists(RUTA_LIMPIO):
+        print(f"[ERROR] No existe {RUTA_LIMPIO}: ejecuta antes src/pipeline.py limpieza")
+        return 1
+    base = cargar_mercado(RUTA_LIMPIO, "analisis")
+
+    print(f"\n{'factor':>7}{'filas':>10}{'por fila s':>12}{'dedup. s':>10}{'inercia rel.':>14}{'roles':>11}")
+    errores = []
+    for factor in args.factor:
+        df = pd.concat([base] * factor, ignore_index=True)
+        inicio = time.perf_counter()
+        etiquetas_fila, inercia_fila = por_fila(df)
+        t_fila = time.perf_counter() - inicio
+        inicio = time.perf_counter()
+        etiquetas_dedup, inercia_dedup = deduplicado(df)
+        t_dedup = time.perf_counter() - inicio
+
+        igual = np.array_equal(roles_filas(df, etiquetas_fila), roles_filas(df, etiquetas_dedup))
+        diferencia = abs(inercia_dedup - inercia_fila) / inercia_fila
+        if not igual or diferencia > 1e-6:
+            errores.append(str(factor))
+        print(f"{factor:>7}{len(df):>10}{t_fila:>12.3f}{t_dedup:>10.3f}{diferencia:>14.2e}{'igual' if igual else 'DISTINTA':>11}")
+
+    if errores:
+        print(f"\n[ERROR] El ajuste deduplicado no reproduce el de por fila (factor {', '.join(errores)})")
+        return 1
+    print("\n[OK] Mismos roles por fila e inercia con el ajuste deduplicado")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
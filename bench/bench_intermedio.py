@@ -0,0 +1,100 @@
+"""Benchmark del hand-off entre etapas: CSV ``;`` vs intermedio Feather.
+
+Replica ``--factor`` veces el dataset limpio en un directorio temporal y, para
+el CSV y el Feather (con LZ4 y sin comprimir), mide con ``carga_datos``:
+
+- escritura (``guardar_etapa``) y tamaño en disco,
+- lectura completa (etapa ``limpieza``) y proyectada (etapa ``analisis``),
+
+todo como mejor de ``--repeticiones``. Comprueba además que las lecturas del
+Feather dan el mismo DataFrame que la del CSV, tipos incluidos.
+
+Uso (desde la raíz del proyecto):
+    python bench/bench_intermedio.py [--factor 200] [--repeticiones 3]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+RUTA_BENCH = os.path.dirname(os.path.abspath(__file__))
+RUTA_PROYECTO = os.path.dirname(RUTA_BENCH)
+sys.path.insert(0, os.path.join(RUTA_PROYECTO, "src"))
+
+import pandas as pd  # noqa: E402
+
+import carga_datos  # noqa: E402
+
+RUTA_LIMPIO = os.path.join(RUTA_PROYECTO, "dataset", "Global Data Analyst Job Market_Clean.csv")
+
+
+def mejor_tiempo(funcion, repeticiones: int) -> tuple:
+    """(mejor tiempo en segundos, resultado de la última llamada)."""
+    mejor, resultado = float("inf"), None
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        resultado = funcion()
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return mejor, resultado
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--factor", type=int, default=200, help="veces que se replica el CSV limpio")
+    parser.add_argument("--repeticiones", type=int, default=3)
+    args = parser.parse_args()
+
+    if carga_datos.motor_csv() != "pyarrow":
+        print("[ERROR] El formato Feather necesita pyarrow ('pip install pyarrow').")
+        return 1
+    if not os.path.exists(RUTA_LIMPIO):
+        print(f"[ERROR] No existe {RUTA_LIMPIO}")
+        return 1
+
+    base = carga_datos.cargar_mercado(RUTA_LIMPIO, "limpieza", motor="c")
+    df = pd.concat([base] * args.factor, ignore_index=True)
+
+    resultados = {}
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta_csv = os.path.join(directorio, os.path.basename(RUTA_LIMPIO))
+        for nombre, formato, compresion in [
+            ("csv", "csv", None),
+            ("feather", "feather", "lz4"),
+            ("feather-sc", "feather", "uncompressed"),
+        ]:
+            t_escritura, rutas = mejor_tiempo(
+                lambda: carga_datos.guardar_etapa(df, ruta_csv, formato, compresion=compresion),
+                args.repeticiones)
+            # Con "csv" se fuerza el parser (ignora el Feather); con "feather"
+            # cargar_mercado elige el Feather vigente
+            motor = "c" if formato == "csv" else None
+            t_completa, completa = mejor_tiempo(
+                lambda: carga_datos.cargar_mercado(ruta_csv, "limpieza", motor), args.repeticiones)
+            t_proyectada, _ = mejor_tiempo(
+                lambda: carga_datos.cargar_mercado(ruta_csv, "analisis", motor), args.repeticiones)
+            tamano = os.path.getsize(rutas[0])
+            resultados[nombre] = (t_escritura, t_completa, t_proyectada, tamano, completa)
+            os.remove(rutas[0])
+
+    print(f"\nFilas: {len(df)}")
+    print(f"{'formato':<12}{'escribir s':>12}{'leer s':>10}{'proyec. s':>11}{'MB':>8}")
+    for nombre, (t_escritura, t_completa, t_proyectada, tamano, _) in resultados.items():
+        print(f"{nombre:<12}{t_escritura:>12.3f}{t_completa:>10.3f}{t_proyectada:>11.3f}{tamano / 2**20:>8.1f}")
+
+    csv, feather = resultados["csv"], resultados["feather"]
+    print(f"\nHand-off (escribir + leer): {csv[0] + csv[1]:.3f}s -> {feather[0] + feather[1]:.3f}s "
+          f"(x{(csv[0] + csv[1]) / (feather[0] + feather[1]):.1f}); tamaño x{csv[3] / feather[3]:.1f}")
+    for nombre in ["feather", "feather-sc"]:
+        try:
+            pd.testing.assert_frame_equal(csv[4], resultados[nombre][4])
+        except AssertionError as error:
+            print(f"\n[ERROR] {nombre} no reproduce la lectura del CSV: {error}")
+            return 1
+    print("[OK] Feather y CSV dan el mismo DataFrame")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,184 @@
+"""Benchmark del modo por lotes: integración + limpieza en memoria vs por lotes.
+
+Replica ``--factor`` veces el CSV de Indeed en un directorio temporal (con los
+CSV de OECD y Numbeo) y ejecuta la integración y la limpieza de las dos formas,
+cada una en un proceso nuevo:
+
+- en memoria: ``integrar`` + ``limpiar`` (como antes),
+- por lotes: ``integrar_por_lotes`` + ``limpiar_por_lotes`` con ``--filas-lote``.
+
+Reporta el tiempo y el pico de RSS añadido tras los imports (ru_maxrss) y
+comprueba que el CSV limpio es idéntico byte a byte. Con dos factores
+distintos se ve que el pico por lotes no crece con la entrada.
+
+Antes comprueba además un caso límite de ``limpiar_por_lotes``: un lote que
+el filtro deja vacío no debe escribir la cabecera del CSV (ni repetirla).
+
+Uso (desde la raíz del proyecto):
+    python bench/bench_lotes.py [--factor 200 1000] [--filas-lote 50000]
+"""
+
+import argparse
+import filecmp
+import multiprocessing
+import os
+import resource
+import shutil
+import sys
+import tempfile
+import time
+
+RUTA_BENCH = os.path.dirname(os.path.abspath(__file__))
+RUTA_PROYECTO = os.path.dirname(RUTA_BENCH)
+sys.path.insert(0, os.path.join(RUTA_PROYECTO, "src"))
+
+import pandas as pd  # noqa: E402
+
+import carga_datos  # noqa: E402
+import data_cleaning  # noqa: E402
+import integracion_datos  # noqa: E402
+
+
+def _medir(directorio, modo, filas_lote, cola):
+    # Las etapas escriben y leen en ``directorio`` en vez de en dataset/
+    integracion_datos.ruta_dataset = directorio
+    integracion_datos.ruta_salida = os.path.join(directorio, integracion_datos.nombre_archivo)
+    integracion_datos.ruta_cache_limpieza = os.path.join(directorio, ".cache", "limpieza_ubicacion.sqlite")
+    data_cleaning.ruta_fichero = integracion_datos.ruta_salida
+    data_cleaning.ruta_cache_limpieza = integracion_datos.ruta_cache_limpieza
+    data_cleaning.nombre_salida = os.path.join(directorio, f"limpio_{modo}.csv")
+
+    rss_antes = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    inicio = time.perf_counter()
+    try:
+        if modo == "memoria":
+            data_cleaning.limpiar(integracion_datos.integrar())
+        else:
+            integracion_datos.integrar_por_lotes(filas_lote=filas_lote)
+            data_cleaning.limpiar_por_lotes(filas_lote=filas_lote)
+    except Exception as e:
+        # Sin esto el proceso padre esperaría el resultado para siempre
+        cola.put(e)
+        raise
+    segundos = time.perf_counter() - inicio
+    rss_despues = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss va en KB en Linux y en bytes en macOS
+    escala = 1 if sys.platform == "darwin" else 1024
+    cola.put((segundos, (rss_despues - rss_antes) * escala, data_cleaning.nombre_salida))
+
+
+def medir(directorio: str, modo: str, filas_lote: int) -> tuple:
+    """(segundos, pico RSS añadido, CSV limpio) en un proceso limpio."""
+    contexto = multiprocessing.get_context("spawn")
+    cola = contexto.Queue()
+    proceso = contexto.Process(target=_medir, args=(directorio, modo, filas_lote, cola))
+    proceso.start()
+    resultado = cola.get()
+    proceso.join()
+    if isinstance(resultado, Exception):
+        raise RuntimeError(f"Falló el modo {modo}") from resultado
+    return resultado
+
+
+def _lote_vacio(directorio, cola):
+    data_cleaning.ruta_fichero = os.path.join(directorio, integracion_datos.nombre_archivo)
+    data_cleaning.ruta_cache_limpieza = os.path.join(directorio, ".cache", "limpieza_ubicacion.sqlite")
+    data_cleaning.nombre_salida = os.path.join(directorio, "limpio.csv")
+    # 5 filas con descripción corta (el primer lote entero se filtra) y 20 válidas
+    n = 25
+    df = pd.DataFrame({
+        "titulo": [f"data analyst {i}" for i in range(n)],
+        "empresa": "Empresa",
+        "pais": "ES",
+        "ciudad_limpia": "Madrid",
+        "ubicacion_raw": "Madrid",
+        "salario_medio_ppp_2024": 50000.0,
+        "indice_coste_vida_2024": 50.0,
+        "indice_alquiler_2024": 20.0,
+        "salario_real_ajustado": 100000.0,
+        "modalidad": "Presencial",
+        "es_teletrabajo": False,
+        "desc_longitud": [5.0] * 5 + [100.0 + i for i in range(n - 5)],
+        "url": [f"https://es.indeed.com/viewjob?jk={i}" for i in range(n)],
+    })[integracion_datos.cols_finales_ordenadas]
+    carga_datos.guardar_etapa(df, data_cleaning.ruta_fichero, "csv")
+    try:
+        data_cleaning.limpiar_por_lotes(formato="csv", filas_lote=5)
+        with open(data_cleaning.nombre_salida, encoding="utf-8-sig") as f:
+            cabeceras = sum(linea.startswith("titulo;") for linea in f)
+        filas = len(pd.read_csv(data_cleaning.nombre_salida, sep=";", encoding="utf-8-sig"))
+    except Exception as e:
+        cola.put(e)
+        raise
+    cola.put((cabeceras, filas))
+
+
+def comprobar_lote_vacio() -> str | None:
+    """None si el CSV por lotes sale bien con un lote filtrado entero; si no, el fallo."""
+    contexto = multiprocessing.get_context("spawn")
+    with tempfile.TemporaryDirectory() as directorio:
+        cola = contexto.Queue()
+        proceso = contexto.Process(target=_lote_vacio, args=(directorio, cola))
+        proceso.start()
+        resultado = cola.get()
+        proceso.join()
+    if isinstance(resultado, Exception):
+        raise RuntimeError("Falló la limpieza por lotes con un lote vacío") from resultado
+    cabeceras, filas = resultado
+    if cabeceras != 1 or filas != 20:
+        return f"{cabeceras} cabeceras y {filas} filas (se esperaban 1 y 20)"
+    return None
+
+
+def replicar(directorio: str, factor: int) -> int:
+    """Copia las fuentes a ``directorio`` con Indeed replicado; devuelve sus filas."""
+    for ruta in integracion_datos.ficheros_entrada():
+        if ruta != integracion_datos.ruta_indeed():
+            shutil.copy(ruta, directorio)
+    df = pd.read_csv(integracion_datos.ruta_indeed())
+    destino = os.path.join(directorio, os.path.basename(integracion_datos.ruta_indeed()))
+    pd.concat([df] * factor, ignore_index=True).to_csv(destino, index=False, encoding="utf-8-sig")
+    return len(df) * factor
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--factor", type=int, nargs="+", default=[200, 1000],
+                        help="veces que se replica el CSV de Indeed (uno o varios)")
+    parser.add_argument("--filas-lote", type=int, default=50_000)
+    args = parser.parse_args()
+
+    if not os.path.exists(integracion_datos.ruta_indeed()):
+        print(f"[ERROR] No existe {integracion_datos.ruta_indeed()}")
+        return 1
+
+    fallo = comprobar_lote_vacio()
+    if fallo:
+        print(f"[ERROR] Lote vacío en limpiar_por_lotes: {fallo}")
+        return 1
+    print("[OK] Un lote filtrado entero no repite la cabecera del CSV limpio")
+
+    errores = []
+    filas_salida = []
+    for factor in args.factor:
+        with tempfile.TemporaryDirectory() as directorio:
+            filas = replicar(directorio, factor)
+            resultados = {modo: medir(directorio, modo, args.filas_lote) for modo in ["memoria", "lotes"]}
+            if not filecmp.cmp(resultados["memoria"][2], resultados["lotes"][2], shallow=False):
+                errores.append(str(factor))
+            filas_salida.append((factor, filas, resultados))
+
+    print(f"\n{'factor':>7}{'filas':>10}{'modo':>9}{'s':>8}{'pico MB':>9}")
+    for factor, filas, resultados in filas_salida:
+        for modo, (segundos, pico, _) in resultados.items():
+            print(f"{factor:>7}{filas:>10}{modo:>9}{segundos:>8.2f}{pico / 2**20:>9.1f}")
+
+    if errores:
+        print(f"\n[ERROR] El CSV limpio por lotes no coincide con el de memoria (factor {', '.join(errores)})")
+        return 1
+    print("\n[OK] Por lotes y en memoria dan el mismo CSV limpio")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,170 @@
+"""Benchmark de memoria de la limpieza: versión con copias vs versión actual.
+
+Replica ``--factor`` veces el dataset integrado en un directorio temporal y,
+en un proceso nuevo por versión, carga el DataFrame de entrada y mide solo
+la limpieza (sin guardar):
+
+- ``antigua``: ``dropna(...).copy()``, dos re-selecciones con máscaras
+  booleanas y ``np.where`` para el capping (lo que hacía data_cleaning.py),
+- ``actual``: ``data_cleaning.limpiar`` (una máscara, ``clip``).
+
+Reporta el pico de RSS durante la limpieza respecto a la memoria del
+DataFrame de entrada (``memory_usage(deep=True)``): ratio pico/entrada =
+(entrada + pico añadido) / entrada, el mínimo de ``--repeticiones`` procesos.
+En Linux el pico se reinicia tras la carga (/proc/self/clear_refs) para no
+contar el del parser; en otros sistemas se usa ru_maxrss y la cifra incluye la
+carga. Arrow usa el allocator del sistema, para que la memoria liberada vuelva
+al SO y el RSS refleje lo que de verdad está vivo. Comprueba además que las
+dos versiones dan el mismo DataFrame.
+
+Con el dataset real, ``--factor 10`` (unas 3.000 filas) queda por debajo del
+ruido del allocator; el factor por defecto da un dataset de ~300.000 filas.
+
+Uso (desde la raíz del proyecto):
+    python bench/bench_memoria_limpieza.py [--factor 1000] [--repeticiones 3]
+"""
+
+import argparse
+import multiprocessing
+import os
+import resource
+import sys
+import tempfile
+
+# Antes de importar pyarrow (también en los procesos hijos, que heredan el entorno)
+os.environ.setdefault("ARROW_DEFAULT_MEMORY_POOL", "system")
+
+RUTA_BENCH = os.path.dirname(os.path.abspath(__file__))
+RUTA_PROYECTO = os.path.dirname(RUTA_BENCH)
+sys.path.insert(0, os.path.join(RUTA_PROYECTO, "src"))
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+
+import carga_datos  # noqa: E402
+import data_cleaning  # noqa: E402
+from limpieza_ubicacion import limpiar_ubicacion_regex_final, mapear_unicos  # noqa: E402
+
+RUTA_INTEGRADO = os.path.join(RUTA_PROYECTO, "dataset", "Global Data Analyst Job Market 2025.csv")
+
+
+def limpiar_antigua(df: pd.DataFrame) -> pd.DataFrame:
+    """La limpieza de data_cleaning.py antes de eliminar las copias intermedias."""
+    cols_criticas = ['salario_medio_ppp_2024', 'indice_coste_vida_2024']
+    df_clean = df.dropna(subset=cols_criticas).copy()
+    df_clean['titulo'] = df_clean['titulo'].fillna('Sin Título')
+    df_clean['empresa'] = df_clean['empresa'].fillna('Empresa Confidencial')
+    df_clean = df_clean[df_clean['indice_coste_vida_2024'] > 0]
+    df_clean['empresa'] = df_clean['empresa'].astype(str)
+
+    filtro_calidad = df_clean['desc_longitud'] >= data_cleaning.min_desc_longitud
+    df_clean = df_clean[filtro_calidad]
+    Q1 = df_clean['desc_longitud'].quantile(0.25)
+    Q3 = df_clean['desc_longitud'].quantile(0.75)
+    upper_bound = Q3 + data_cleaning.factor_iqr * (Q3 - Q1)
+    df_clean['desc_longitud'] = np.where(
+        df_clean['desc_longitud'] > upper_bound, upper_bound, df_clean['desc_longitud']
+    )
+    df_clean['titulo'] = df_clean['titulo'].str.strip().str.title()
+    df_clean['ciudad_limpia'] = mapear_unicos(df_clean['ubicacion_raw'], limpiar_ubicacion_regex_final)
+    return df_clean
+
+
+def _leer_status(campo: str) -> int | None:
+    try:
+        with open("/proc/self/status", encoding="ascii") as f:
+            for linea in f:
+                if linea.startswith(campo + ":"):
+                    return int(linea.split()[1]) * 1024
+    except OSError:
+        return None
+    return None
+
+
+def _reiniciar_pico() -> bool:
+    """Reinicia el pico de RSS del proceso (solo Linux); True si se pudo."""
+    try:
+        with open("/proc/self/clear_refs", "w", encoding="ascii") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def _pico_rss() -> int:
+    pico = _leer_status("VmHWM")
+    if pico is not None:
+        return pico
+    # ru_maxrss va en KB en Linux y en bytes en macOS
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * (1 if sys.platform == "darwin" else 1024)
+
+
+def _medir(ruta, version, cola):
+    df = carga_datos.cargar_mercado(ruta, "limpieza")
+    entrada = int(df.memory_usage(deep=True).sum())
+    # Sin caché de ubicaciones: las dos versiones hacen el mismo trabajo
+    data_cleaning.abrir_cache = lambda *args, **kwargs: None
+
+    reiniciado = _reiniciar_pico()
+    base = _leer_status("VmRSS") if reiniciado else _pico_rss()
+    if version == "antigua":
+        resultado = limpiar_antigua(df)
+    else:
+        resultado = data_cleaning.limpiar(df, guardar=False)
+    cola.put((entrada, _pico_rss() - base, reiniciado, resultado))
+
+
+def medir(ruta: str, version: str, repeticiones: int) -> tuple:
+    """(bytes de entrada, pico añadido, pico reiniciado, DataFrame limpio).
+
+    Cada repetición es un proceso nuevo (un pico ya alcanzado no se vuelve a
+    ver en el mismo proceso); se queda la de menor pico.
+    """
+    contexto = multiprocessing.get_context("spawn")
+    mejor = None
+    for _ in range(repeticiones):
+        cola = contexto.Queue()
+        proceso = contexto.Process(target=_medir, args=(ruta, version, cola))
+        proceso.start()
+        resultado = cola.get()
+        proceso.join()
+        if mejor is None or resultado[1] < mejor[1]:
+            mejor = resultado
+    return mejor
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--factor", type=int, default=1000, help="veces que se replica el dataset integrado")
+    parser.add_argument("--repeticiones", type=int, default=3)
+    args = parser.parse_args()
+
+    if not os.path.exists(RUTA_INTEGRADO):
+        print(f"[ERROR] No existe {RUTA_INTEGRADO}: ejecuta antes src/integracion_datos.py")
+        return 1
+
+    base = carga_datos.cargar_mercado(RUTA_INTEGRADO, "limpieza", motor="c")
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta = os.path.join(directorio, os.path.basename(RUTA_INTEGRADO))
+        # En CSV: un Feather de la concatenación tendría un trozo Arrow por copia
+        carga_datos.guardar_etapa(pd.concat([base] * args.factor, ignore_index=True), ruta, "csv")
+        resultados = {version: medir(ruta, version, args.repeticiones) for version in ["antigua", "actual"]}
+
+    print(f"\nFilas de entrada: {len(base) * args.factor}")
+    print(f"{'versión':<10}{'entrada MB':>12}{'pico añadido MB':>17}{'pico/entrada':>14}")
+    for version, (entrada, pico, _, _) in resultados.items():
+        print(f"{version:<10}{entrada / 2**20:>12.1f}{pico / 2**20:>17.1f}{(entrada + pico) / entrada:>14.2f}")
+    if not all(reiniciado for _, _, reiniciado, _ in resultados.values()):
+        print("[WARN] No se pudo reiniciar el pico de RSS: las cifras incluyen la carga")
+
+    try:
+        pd.testing.assert_frame_equal(resultados["antigua"][3], resultados["actual"][3])
+    except AssertionError as error:
+        print(f"\n[ERROR] La limpieza actual no reproduce la antigua: {error}")
+        return 1
+    print("\n[OK] Las dos versiones dan el mismo DataFrame limpio")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,152 @@
+"""Benchmark y test de paridad del extractor de tarjetas de Indeed.
+
+Recorre el corpus de ``bench/fixtures/indeed`` (un fichero por país y layout)
+y para cada página mide:
+
+- tarjetas/segundo y ms por página del parser completo,
+- coste por campo (tiempo extra respecto a solo detectar tarjetas e ids),
+- pico de memoria del parseo (tracemalloc),
+
+y comprueba que ``extraer_ofertas`` produce exactamente lo guardado en
+``esperado.json`` con el esquema de ``ofertas``. Sale con código 1 si no.
+
+Uso (desde la raíz del proyecto):
+    python bench/bench_parser.py [--repeticiones 30] [--actualizar-esperado]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+RUTA_BENCH = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(RUTA_BENCH), "src"))
+
+from parser_indeed import CAMPOS, extraer_ofertas, extraer_tarjetas  # noqa: E402
+
+RUTA_FIXTURES = os.path.join(RUTA_BENCH, "fixtures", "indeed")
+RUTA_ESPERADO = os.path.join(RUTA_FIXTURES, "esperado.json")
+
+ESQUEMA_OFERTAS = ["titulo", "empresa", "pais", "ubicacion_raw", "modalidad", "desc_longitud", "url"]
+DOMINIOS = {
+    "es": ("ES", "https://es.indeed.com"),
+    "us": ("US", "https://www.indeed.com"),
+    "uk": ("UK", "https://uk.indeed.com"),
+    "de": ("DE", "https://de.indeed.com"),
+}
+
+
+def cargar_corpus() -> dict:
+    corpus = {}
+    for nombre in sorted(os.listdir(RUTA_FIXTURES)):
+        if nombre.endswith(".html"):
+            with open(os.path.join(RUTA_FIXTURES, nombre), "r", encoding="utf-8") as f:
+                corpus[nombre] = f.read()
+    return corpus
+
+
+def cronometrar(funcion, repeticiones: int) -> float:
+    """Mejor tiempo (s) de ``repeticiones`` ejecuciones."""
+    mejor = float("inf")
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return mejor
+
+
+def pico_memoria(funcion) -> int:
+    tracemalloc.start()
+    funcion()
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return pico
+
+
+def ofertas_de(nombre: str, html: str) -> list:
+    codigo_pais, dominio = DOMINIOS[nombre.split("_")[0]]
+    return [[job_id, oferta] for job_id, oferta in extraer_ofertas(html, codigo_pais, dominio)]
+
+
+def comprobar_paridad(corpus: dict, esperado: dict) -> list[str]:
+    errores = []
+    for nombre, html in corpus.items():
+        obtenido = ofertas_de(nombre, html)
+        for _, oferta in obtenido:
+            if list(oferta) != ESQUEMA_OFERTAS:
+                errores.append(f"{nombre}: esquema {list(oferta)} != {ESQUEMA_OFERTAS}")
+                break
+        if nombre not in esperado:
+            errores.append(f"{nombre}: sin salida esperada (usa --actualizar-esperado)")
+        elif obtenido != esperado[nombre]:
+            for i, (a, b) in enumerate(zip(obtenido, esperado[nombre])):
+                if a != b:
+                    errores.append(f"{nombre}: tarjeta {i}: {a} != {b}")
+                    break
+            else:
+                errores.append(f"{nombre}: {len(obtenido)} ofertas != {len(esperado[nombre])} esperadas")
+    return errores
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeticiones", type=int, default=30)
+    parser.add_argument("--actualizar-esperado", action="store_true",
+                        help="reescribe esperado.json con la salida actual (revisar el diff)")
+    args = parser.parse_args()
+
+    corpus = cargar_corpus()
+    if not corpus:
+        print(f"[ERROR] No hay fixtures en {RUTA_FIXTURES}")
+        return 1
+
+    if args.actualizar_esperado:
+        esperado = {nombre: ofertas_de(nombre, html) for nombre, html in corpus.items()}
+        with open(RUTA_ESPERADO, "w", encoding="utf-8") as f:
+            json.dump(esperado, f, ensure_ascii=False, indent=1)
+        print(f"[OK] esperado.json actualizado ({len(esperado)} fixtures)")
+
+    # --- Rendimiento -----------------------------------------------------
+    print(f"\n{'fixture':<24}{'KB':>7}{'tarjetas':>10}{'ms/pág':>9}{'tarj/s':>10}{'pico KB':>9}")
+    total_tarjetas = total_tiempo = 0.0
+    costes = {campo: 0.0 for campo in CAMPOS}
+    for nombre, html in corpus.items():
+        n_tarjetas = len(extraer_tarjetas(html))
+        t = cronometrar(lambda: extraer_tarjetas(html), args.repeticiones)
+        pico = pico_memoria(lambda: extraer_tarjetas(html))
+        total_tarjetas += n_tarjetas
+        total_tiempo += t
+        print(f"{nombre:<24}{len(html) / 1024:>7.0f}{n_tarjetas:>10}{t * 1000:>9.2f}"
+              f"{n_tarjetas / t:>10.0f}{pico / 1024:>9.0f}")
+
+        # Coste por campo: tiempo con ese único campo menos el de solo tarjetas+id
+        base = cronometrar(lambda: extraer_tarjetas(html, campos=()), args.repeticiones)
+        for campo in CAMPOS:
+            t_campo = cronometrar(lambda: extraer_tarjetas(html, campos=(campo,)), args.repeticiones)
+            costes[campo] += max(0.0, t_campo - base) / max(n_tarjetas, 1)
+
+    print(f"\nTotal: {total_tarjetas:.0f} tarjetas, {total_tarjetas / total_tiempo:.0f} tarjetas/s")
+    print("\nCoste medio por campo (µs/tarjeta, sobre detección de tarjeta + id):")
+    for campo, coste in costes.items():
+        print(f"   {campo:<10}{coste / len(corpus) * 1e6:>8.1f}")
+
+    # --- Paridad ---------------------------------------------------------
+    if not os.path.exists(RUTA_ESPERADO):
+        print("\n[ERROR] Falta esperado.json (ejecuta con --actualizar-esperado)")
+        return 1
+    with open(RUTA_ESPERADO, "r", encoding="utf-8") as f:
+        esperado = json.load(f)
+    errores = comprobar_paridad(corpus, esperado)
+    if errores:
+        print("\n[ERROR] La salida no coincide con esperado.json:")
+        for error in errores:
+            print(f"   {error}")
+        return 1
+    print(f"\n[OK] Paridad con esperado.json y esquema de ofertas en {len(corpus)} fixtures")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,76 @@
+"""Benchmark del scraper contra el servidor local de fixtures.
+
+Arranca ``servidor_fixtures.arrancar()`` en un hilo y recorre todos los países
+con ``jobs_scraper.scrapear_todos`` y el ``FetcherHTTP`` (limitador sin pausas)
+hacia un ``SinkMemoria``. Mide, para cada número de workers, el tiempo del
+crawl completo (mejor de ``--repeticiones``) y las páginas y ofertas por
+segundo. La corrección del crawl (ofertas esperadas, challenges, reanudación y
+checkpoints) se comprueba en ``tests/test_scraper.py``.
+
+Uso (desde la raíz del proyecto):
+    python bench/bench_scraper.py [--paginas 5] [--repeticiones 3]
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+
+RUTA_BENCH = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(RUTA_BENCH), "src"))
+sys.path.insert(0, RUTA_BENCH)
+
+import jobs_scraper  # noqa: E402
+import servidor_fixtures  # noqa: E402
+from escritura_ofertas import EscritorOfertas, SinkMemoria  # noqa: E402
+from fetchers import FetcherHTTP  # noqa: E402
+from limitador_ritmo import obtener_limitador  # noqa: E402
+from plan_crawl import expandir_plan  # noqa: E402
+
+
+def crawl(tareas: list, workers: int) -> tuple[int, float]:
+    """Ofertas que llegan al sink y segundos del crawl."""
+    sink = SinkMemoria()
+    escritor = EscritorOfertas([sink], tamano_lote=50)
+    inicio = time.perf_counter()
+    # Sin el progreso por página del scraper: solo la tabla de tiempos
+    with contextlib.redirect_stdout(io.StringIO()):
+        jobs_scraper.scrapear_todos(escritor, tareas=tareas, workers=workers, fetcher=FetcherHTTP())
+    escritor.cerrar()
+    return len(sink.filas), time.perf_counter() - inicio
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--paginas", type=int, default=5, help="páginas con resultados por país")
+    parser.add_argument("--repeticiones", type=int, default=3)
+    args = parser.parse_args()
+
+    servidor = servidor_fixtures.arrancar(paginas=args.paginas)
+    base = f"http://127.0.0.1:{servidor.server_address[1]}"
+    paises = {codigo: f"{base}/{codigo.lower()}" for codigo in jobs_scraper.PAISES}
+    tareas = expandir_plan(jobs_scraper.keywords, jobs_scraper.locations, paises)
+    for dominio in paises.values():
+        # Casi sin pausas entre peticiones: el servidor es local
+        obtener_limitador(dominio, intervalo_inicial=0.001, intervalo_min=0.001, jitter=0.0)
+    paginas_plan = len(tareas) * jobs_scraper.max_pages_per_country
+
+    print(f"\n{'workers':<9}{'páginas':>8}{'ofertas':>9}{'s':>8}{'pág/s':>8}{'ofertas/s':>11}")
+    try:
+        for workers in sorted({1, len(tareas)}):
+            ofertas, segundos = 0, float("inf")
+            for _ in range(args.repeticiones):
+                n, s = crawl(tareas, workers)
+                ofertas, segundos = n, min(segundos, s)
+            print(f"{workers:<9}{paginas_plan:>8}{ofertas:>9}{segundos:>8.2f}{paginas_plan / segundos:>8.1f}"
+                  f"{ofertas / segundos:>11.1f}")
+    finally:
+        servidor.shutdown()
+        servidor.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
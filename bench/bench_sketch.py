@@ -0,0 +1,90 @@
+"""Benchmark del sketch KLL de cuantiles frente a ``quantile`` exacto.
+
+Genera ``--filas`` longitudes de descripción sintéticas (lognormal, como
+``desc_longitud``) y, para cada ``--error``, compara los cuartiles del capping
+calculados:
+
+- exactos con ``Series.quantile`` sobre la columna entera,
+- con un sketch actualizado por lotes de ``--filas-lote`` valores,
+- con ``--shards`` sketches independientes fusionados (un worker por shard).
+
+Reporta tiempos, valores retenidos por el sketch y el error de rango observado
+(que debe quedar por debajo del configurado).
+
+Uso (desde la raíz del proyecto):
+    python bench/bench_sketch.py [--filas 20000000] [--error 0.01 0.001]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+RUTA_BENCH = os.path.dirname(os.path.abspath(__file__))
+RUTA_PROYECTO = os.path.dirname(RUTA_BENCH)
+sys.path.insert(0, os.path.join(RUTA_PROYECTO, "src"))
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+
+from sketch_cuantiles import SketchKLL  # noqa: E402
+
+CUANTILES = (0.25, 0.75)
+
+
+def error_rango(ordenados: np.ndarray, valor: float, q: float) -> float:
+    """Distancia entre ``q`` y el rango normalizado que ocupa ``valor``."""
+    abajo = np.searchsorted(ordenados, valor, side="left") / len(ordenados)
+    arriba = np.searchsorted(ordenados, valor, side="right") / len(ordenados)
+    return 0.0 if abajo <= q <= arriba else min(abs(abajo - q), abs(arriba - q))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--filas", type=int, default=20_000_000)
+    parser.add_argument("--filas-lote", type=int, default=100_000)
+    parser.add_argument("--shards", type=int, default=8)
+    parser.add_argument("--error", type=float, nargs="+", default=[0.01, 0.001])
+    args = parser.parse_args()
+
+    datos = np.round(np.random.default_rng(42).lognormal(6, 0.6, args.filas))
+    inicio = time.perf_counter()
+    exactos = [pd.Series(datos).quantile(q) for q in CUANTILES]
+    t_exacto = time.perf_counter() - inicio
+    ordenados = np.sort(datos)
+
+    print(f"\nFilas: {args.filas}  exacto: {t_exacto:.2f}s  Q1={exactos[0]:.2f} Q3={exactos[1]:.2f}")
+    print(f"{'error':>8}{'modo':>8}{'k':>6}{'s':>8}{'retenidos':>11}{'Q1':>10}{'Q3':>10}{'err. obs.':>11}")
+    fallos = []
+    for error in args.error:
+        inicio = time.perf_counter()
+        por_lotes = SketchKLL.para_error(error)
+        for i in range(0, len(datos), args.filas_lote):
+            por_lotes.actualizar(datos[i:i + args.filas_lote])
+        t_lotes = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        shards = [SketchKLL.para_error(error, semilla=i).actualizar(shard)
+                  for i, shard in enumerate(np.array_split(datos, args.shards))]
+        fusionado = shards[0]
+        for shard in shards[1:]:
+            fusionado.fusionar(shard)
+        t_shards = time.perf_counter() - inicio
+
+        for modo, sketch, segundos in [("lotes", por_lotes, t_lotes), ("shards", fusionado, t_shards)]:
+            valores = [sketch.cuantil(q) for q in CUANTILES]
+            observado = max(error_rango(ordenados, v, q) for v, q in zip(valores, CUANTILES))
+            print(f"{error:>8}{modo:>8}{sketch.k:>6}{segundos:>8.2f}{sketch.retenidos:>11}"
+                  f"{valores[0]:>10.2f}{valores[1]:>10.2f}{observado:>11.4%}")
+            if observado > error:
+                fallos.append(f"{modo}/{error}")
+
+    if fallos:
+        print(f"\n[ERROR] Error de rango por encima del configurado en: {', '.join(fallos)}")
+        return 1
+    print("\n[OK] Todos los cuartiles dentro del error de rango configurado")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,59 @@
+"""Graba páginas reales de resultados de Indeed en el corpus de fixtures.
+
+El corpus versionado es sintético (mismo marcado que Indeed, datos inventados)
+para no publicar ofertas reales. Este script lo sustituye por capturas reales
+de la primera página de cada dominio de ``PAISES``, usando el mismo backend de
+descarga que el scraper, y guarda cada una como ``<pais>_<layout>.html`` según
+el layout que se detecte. Después hay que regenerar la salida esperada y
+revisar el diff:
+
+    python bench/grabar_fixtures.py [--backend auto]
+    python bench/bench_parser.py --actualizar-esperado
+"""
+
+import argparse
+import os
+import sys
+
+RUTA_BENCH = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(RUTA_BENCH), "src"))
+
+import jobs_scraper  # noqa: E402
+from parser_indeed import _ParserIndeed  # noqa: E402
+from plan_crawl import TareaCrawl  # noqa: E402
+
+RUTA_FIXTURES = os.path.join(RUTA_BENCH, "fixtures", "indeed")
+
+
+def layout_de(html: str) -> str | None:
+    parser = _ParserIndeed(campos=())
+    parser.feed(html)
+    if parser.beacons:
+        return "beacon"
+    if parser.result_content:
+        return "resultcontent"
+    return None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Graba fixtures reales de Indeed")
+    parser.add_argument("--backend", choices=["auto", "http", "navegador"], default="auto")
+    args = parser.parse_args()
+
+    os.makedirs(RUTA_FIXTURES, exist_ok=True)
+    fetcher = jobs_scraper.crear_fetcher_por_defecto(args.backend, 1, headless=True)
+    try:
+        for codigo_pais, dominio_base in jobs_scraper.PAISES.items():
+            tarea = TareaCrawl(jobs_scraper.keywords[0], jobs_scraper.locations[0], codigo_pais, dominio_base)
+            url = tarea.url(0)
+            pagina = fetcher.obtener(url)
+            layout = layout_de(pagina.html)
+            if pagina.challenge or layout is None:
+                print(f"[WARN] {codigo_pais}: sin tarjetas ({pagina.backend}, '{pagina.titulo}'), no se guarda")
+                continue
+            ruta = os.path.join(RUTA_FIXTURES, f"{codigo_pais.lower()}_{layout}.html")
+            with open(ruta, "w", encoding="utf-8") as f:
+                f.write(pagina.html)
+            print(f"[OK] {codigo_pais}: {ruta} ({len(pagina.html) / 1024:.0f} KB, {pagina.backend})")
+    finally:
+        fetcher.cerrar()
@@ -0,0 +1,94 @@
+"""Servidor local que imita Indeed a partir del corpus de fixtures.
+
+Sirve ``/<pais>/jobs?start=N`` con las páginas de ``bench/fixtures/indeed``
+(``start=0`` el layout beacon y ``start=10`` el de resultContent, cambiando los
+``data-jk`` por página para que no se deduplique todo). A partir de
+``--paginas`` devuelve una página vacía, como Indeed al acabarse los resultados.
+Las páginas de ``ManejadorFixtures.challenges`` responden la primera vez con un
+challenge de Cloudflare (403).
+
+Uso, en dos terminales (desde la raíz del proyecto):
+    python bench/servidor_fixtures.py --puerto 8765
+    python src/jobs_scraper.py --base-local http://127.0.0.1:8765 --backend http --sin-checkpoint
+"""
+
+import argparse
+import http.server
+import os
+import re
+import threading
+from urllib.parse import parse_qs, urlparse
+
+RUTA_FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "indeed")
+LAYOUTS = ["beacon", "resultcontent"]
+PAGINA_VACIA = b"<html><head><title>Indeed</title></head><body>Sin resultados</body></html>"
+PAGINA_CHALLENGE = b"<html><head><title>Just a moment...</title></head><body>cf-chl-widget</body></html>"
+
+_patron_jk = re.compile(r'data-jk="([0-9a-f]+)"')
+
+
+def pagina_fixture(pais: str, start: int, paginas: int) -> bytes | None:
+    n = start // 10
+    if n >= paginas:
+        return PAGINA_VACIA
+    ruta = os.path.join(RUTA_FIXTURES, f"{pais}_{LAYOUTS[n % len(LAYOUTS)]}.html")
+    if not os.path.exists(ruta):
+        return None
+    with open(ruta, "r", encoding="utf-8") as f:
+        html = f.read()
+    # Ids distintos en cada página: sufijo con el número de página
+    html = _patron_jk.sub(lambda m: f'data-jk="{m.group(1)}p{n}"', html)
+    return html.encode("utf-8")
+
+
+class ManejadorFixtures(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"   # keep-alive, como el FetcherHTTP
+    paginas = 5
+    challenges = set()              # (pais, start) con un challenge en la primera petición
+    _lock = threading.Lock()
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        partes = url.path.strip("/").split("/")
+        cuerpo = None
+        estado = 404
+        if len(partes) == 2 and partes[1] == "jobs":
+            start = int(parse_qs(url.query).get("start", ["0"])[0])
+            with self._lock:
+                challenge = (partes[0], start) in self.challenges
+                self.challenges.discard((partes[0], start))
+            if challenge:
+                cuerpo, estado = PAGINA_CHALLENGE, 403
+            else:
+                cuerpo = pagina_fixture(partes[0], start, self.paginas)
+                estado = 200 if cuerpo else 404
+
+        self.send_response(estado)
+        cuerpo = cuerpo or b"not found"
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(cuerpo)))
+        self.end_headers()
+        self.wfile.write(cuerpo)
+
+    def log_message(self, formato, *args):
+        pass
+
+
+def arrancar(puerto: int = 0, paginas: int = 5) -> http.server.ThreadingHTTPServer:
+    """Arranca el servidor en un hilo (``puerto=0`` elige uno libre)."""
+    ManejadorFixtures.paginas = paginas
+    servidor = http.server.ThreadingHTTPServer(("127.0.0.1", puerto), ManejadorFixtures)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    return servidor
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Servidor local de fixtures de Indeed")
+    parser.add_argument("--puerto", type=int, default=8765)
+    parser.add_argument("--paginas", type=int, default=5, help="páginas con resultados por país")
+    args = parser.parse_args()
+
+    ManejadorFixtures.paginas = args.paginas
+    servidor = http.server.ThreadingHTTPServer(("127.0.0.1", args.puerto), ManejadorFixtures)
+    print(f"[INFO] Sirviendo {RUTA_FIXTURES} en http://127.0.0.1:{args.puerto}/<pais>/jobs")
+    servidor.serve_forever()
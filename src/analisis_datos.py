@@ -6,170 +6,203 @@ import matplotlib
 matplotlib.use("Agg")
 import matplotlib.pyplot as plt
 import seaborn as sns
-from sklearn.preprocessing import StandardScaler
-from sklearn.cluster import KMeans
-from sklearn.model_selection import train_test_split
-from sklearn.ensemble import RandomForestClassifier
 from sklearn.metrics import classification_report, confusion_matrix, accuracy_score
 from scipy import stats
 
+import registro_modelos
+from carga_datos import cargar_mercado, proyectar
+from registro_modelos import matriz_rf, obtener_modelos, particion_rf
+from seleccion_clusters import nombres_cluster
+
 # ==============================================================================
 # 0. CARGA DE DATOS
 # ==============================================================================
 
 ruta_fichero = "dataset/Global Data Analyst Job Market_Clean.csv"
-df = pd.read_csv(ruta_fichero, sep=";")
-print(f"Datos cargados para análisis: {df.shape}")
 fig_dir = Path("dataset") / "figs"
-fig_dir.mkdir(parents=True, exist_ok=True)
+FIGURAS = ["kmeans_clusters.png", "boxplot_desc_vs_modalidad.png"]
 
-# ==============================================================================
-# 4.1.A. MODELO NO SUPERVISADO (CLUSTERING ECONÓMICO)
-# Objetivo: Identificar perfiles de rentabilidad (Salario vs Coste)
-# ==============================================================================
+# Parámetros del contraste (los de los modelos están en registro_modelos.py)
+alpha = 0.05
+dpi = 300
 
-print("\n--- 4.1.A Clustering Económico (K-Means) ---")
-
-# 1. Selección y Escalado
-X_cluster = df[['salario_real_ajustado', 'indice_coste_vida_2024']].copy()
-scaler = StandardScaler()
-X_scaled = scaler.fit_transform(X_cluster)
-
-# 2. Aplicación del Modelo
-kmeans = KMeans(n_clusters=3, random_state=42, n_init=10)
-df['cluster_label'] = kmeans.fit_predict(X_scaled)
-
-# 3. Asignación Inteligente de Etiquetas (Lógica de Negocio)
-# Calculamos medias para identificar qué cluster es cual
-resumen = df.groupby('cluster_label')[['salario_real_ajustado', 'indice_coste_vida_2024']].mean()
-
-# Lógica:
-# - Alta Eficiencia: El que tiene menor coste de vida (idxmin) dentro de los competitivos
-id_eficiente = resumen['indice_coste_vida_2024'].idxmin()
-# - Coste Elevado: El que tiene el mayor coste de vida (idxmax)
-id_caro = resumen['indice_coste_vida_2024'].idxmax()
-# - Retorno Limitado: El que queda
-id_resto = list(set(resumen.index) - {id_eficiente, id_caro})[0]
-
-mapa_nombres = {
-    id_eficiente: 'Alta Eficiencia (Coste Bajo/Salario Alto)', 
-    id_caro:      'Altos Ingresos / Coste Elevado',
-    id_resto:     'Retorno Limitado'
+# Nombre de cada perfil de cluster (los intermedios se numeran si k > 3)
+NOMBRES_CLUSTER = {
+    'eficiente': 'Alta Eficiencia (Coste Bajo/Salario Alto)',
+    'caro':      'Altos Ingresos / Coste Elevado',
+    'resto':     'Retorno Limitado',
 }
-df['cluster_nombre'] = df['cluster_label'].map(mapa_nombres)
-
-# 4. Visualización Definitiva
-plt.figure(figsize=(11, 7))
-sns.scatterplot(
-    data=df, 
-    x='indice_coste_vida_2024', 
-    y='salario_real_ajustado', 
-    hue='cluster_nombre',    
-    style='pais',            
-    palette='viridis', 
-    s=140, 
-    alpha=0.85
-)
-
-plt.title('Matriz de Rentabilidad Real: ¿Dónde compensa trabajar?', fontsize=14, fontweight='bold')
-plt.xlabel('Índice Coste de Vida (Menor es mejor)', fontsize=12)
-plt.ylabel('Salario Real Ajustado (Poder Adquisitivo)', fontsize=12)
-plt.legend(bbox_to_anchor=(1.01, 1), loc='upper left', title="Perfil de Mercado")
-plt.grid(True, linestyle='--', alpha=0.4)
-plt.tight_layout()
-plt.savefig(fig_dir / 'kmeans_clusters.png', dpi=300)
-plt.close()
-
-# Resumen numérico para la memoria
-print("\n>> Perfil de los Clusters Identificados:")
-print(df.groupby('cluster_nombre')[['salario_real_ajustado', 'indice_coste_vida_2024']].mean())
-
-
-# ==============================================================================
-# 4.1.B. MODELO SUPERVISADO (RANDOM FOREST)
-# Objetivo: Predecir Teletrabajo priorizando la detección de oportunidades (Recall)
-# ==============================================================================
-
-print("\n--- 4.1.B Modelo Supervisado (Random Forest) ---")
-
-# 1. Ingeniería de Variables
-df['titulo_len'] = df['titulo'].str.len()
-
-# 2. Preparación (X, y)
-X = pd.get_dummies(df[['desc_longitud', 'titulo_len', 'pais']], drop_first=True)
-y = df['es_teletrabajo']
-
-# 3. Split Train/Test
-X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
-
-# 4. Entrenamiento (Balanced para detectar la clase minoritaria)
-rf_model = RandomForestClassifier(n_estimators=100, random_state=42, class_weight='balanced')
-rf_model.fit(X_train, y_train)
 
-# 5. Evaluación
-y_pred = rf_model.predict(X_test)
-acc = accuracy_score(y_test, y_pred)
 
-print(f"\n>> EXACTITUD GLOBAL (Accuracy): {acc:.2%}")
-print("\n>> REPORTE DE CLASIFICACIÓN (Atención al Recall de 'True'):")
-print(classification_report(y_test, y_pred))
-
-# Importancia de variables (Opcional, para justificar)
-importances = pd.Series(rf_model.feature_importances_, index=X.columns).nlargest(3)
-print("\n>> Variables más influyentes en la predicción:")
-print(importances)
-
-
-# ==============================================================================
-# 4.2. CONTRASTE DE HIPÓTESIS
-# Pregunta: ¿Son diferentes las descripciones de ofertas remotas vs presenciales?
-# ==============================================================================
-
-print("\n--- 4.2 Contraste de Hipótesis ---")
-
-# 1. Definición de grupos
-grupo_remoto = df[df['es_teletrabajo'] == True]['desc_longitud']
-grupo_presencial = df[df['es_teletrabajo'] == False]['desc_longitud']
-
-print(f"Longitud Media - Remoto:     {grupo_remoto.mean():.2f} caracteres")
-print(f"Longitud Media - Presencial: {grupo_presencial.mean():.2f} caracteres")
-
-# 2. Test de Normalidad (Shapiro-Wilk)
-_, p_norm_r = stats.shapiro(grupo_remoto)
-_, p_norm_p = stats.shapiro(grupo_presencial)
-
-print(f"\nTest de Normalidad (Shapiro): p_remoto={p_norm_r:.5f}, p_presencial={p_norm_p:.5f}")
-
-# 3. Selección y Ejecución del Test
-alpha = 0.05
-if p_norm_r < alpha or p_norm_p < alpha:
-    print(">> Decisión: Datos NO normales -> Se aplica U de Mann-Whitney.")
-    stat, p_val = stats.mannwhitneyu(grupo_remoto, grupo_presencial, alternative='two-sided')
-else:
-    print(">> Decisión: Datos Normales -> Se aplica T-Student.")
-    stat, p_val = stats.ttest_ind(grupo_remoto, grupo_presencial)
-
-print(f"\n>> RESULTADO DEL CONTRASTE: p-value = {p_val:.5f}")
-
-if p_val < alpha:
-    print(">>> CONCLUSIÓN: RECHAZAMOS H0. Existen diferencias significativas entre grupos.")
-else:
-    print(">>> CONCLUSIÓN: NO RECHAZAMOS H0. No hay evidencia suficiente de diferencias.")
-
-# Gráfico Boxplot para la memoria
-plt.figure(figsize=(8, 5))
-sns.boxplot(
-    data=df,
-    x='es_teletrabajo',
-    y='desc_longitud',
-    hue='es_teletrabajo',
-    palette='pastel',
-    legend=False
-)
-plt.title('Distribución de Longitud de Descripción por Modalidad')
-plt.xlabel('¿Es Teletrabajo?')
-plt.ylabel('Caracteres (Longitud)')
-plt.grid(True, axis='y', alpha=0.3)
-plt.tight_layout()
-plt.savefig(fig_dir / 'boxplot_desc_vs_modalidad.png', dpi=300)
-plt.close()
+def parametros() -> dict:
+    return {**registro_modelos.parametros(), "alpha": alpha, "dpi": dpi}
+
+
+def analizar(df: pd.DataFrame | None = None) -> dict:
+    """Clustering, clasificador de teletrabajo y contraste de hipótesis.
+
+    Sin ``df`` lee el dataset limpio de ``ruta_fichero``; el runner
+    (pipeline.py) le pasa el de ``limpiar``. Las figuras van a ``fig_dir`` y
+    devuelve los resultados principales (perfiles, accuracy, p-value).
+    """
+    if df is None:
+        df = cargar_mercado(ruta_fichero, "analisis")
+    else:
+        df = proyectar(df, "analisis")
+    print(f"Datos cargados para análisis: {df.shape}")
+    fig_dir.mkdir(parents=True, exist_ok=True)
+
+    # Scaler, K-Means y Random Forest se entrenan una vez por dataset y se
+    # comparten con visualizacion_datos.py (registro_modelos.py)
+    modelos = obtener_modelos(df)
+
+    # ==============================================================================
+    # 4.1.A. MODELO NO SUPERVISADO (CLUSTERING ECONÓMICO)
+    # Objetivo: Identificar perfiles de rentabilidad (Salario vs Coste)
+    # ==============================================================================
+
+    print("\n--- 4.1.A Clustering Económico (K-Means) ---")
+
+    # 1. Escalado y asignación de clusters (modelos ya ajustados)
+    df['cluster_label'] = modelos.etiquetas_cluster(df)
+
+    # 2. Etiquetas de Negocio: el registro guarda el papel de cada cluster
+    # (menor coste de vida = eficiente, mayor = caro, los intermedios = resto)
+    mapa_nombres = nombres_cluster(modelos.roles_cluster, NOMBRES_CLUSTER)
+    df['cluster_nombre'] = df['cluster_label'].map(mapa_nombres)
+
+    # 3. Visualización Definitiva
+    plt.figure(figsize=(11, 7))
+    sns.scatterplot(
+        data=df,
+        x='indice_coste_vida_2024',
+        y='salario_real_ajustado',
+        hue='cluster_nombre',
+        style='pais',
+        palette='viridis',
+        s=140,
+        alpha=0.85
+    )
+
+    plt.title('Matriz de Rentabilidad Real: ¿Dónde compensa trabajar?', fontsize=14, fontweight='bold')
+    plt.xlabel('Índice Coste de Vida (Menor es mejor)', fontsize=12)
+    plt.ylabel('Salario Real Ajustado (Poder Adquisitivo)', fontsize=12)
+    plt.legend(bbox_to_anchor=(1.01, 1), loc='upper left', title="Perfil de Mercado")
+    plt.grid(True, linestyle='--', alpha=0.4)
+    plt.tight_layout()
+    plt.savefig(fig_dir / FIGURAS[0], dpi=dpi)
+    plt.close()
+
+    # Resumen numérico para la memoria
+    print("\n>> Perfil de los Clusters Identificados:")
+    perfiles = df.groupby('cluster_nombre')[['salario_real_ajustado', 'indice_coste_vida_2024']].mean()
+    print(perfiles)
+
+
+    # ==============================================================================
+    # 4.1.B. MODELO SUPERVISADO (RANDOM FOREST)
+    # Objetivo: Predecir Teletrabajo priorizando la detección de oportunidades (Recall)
+    # ==============================================================================
+
+    print("\n--- 4.1.B Modelo Supervisado (Random Forest) ---")
+
+    # 1. Ingeniería de Variables
+    df['titulo_len'] = df['titulo'].str.len()
+
+    # 2. Preparación (X, y): el pipeline del modelo codifica ``pais`` (one-hot fijo)
+    X = matriz_rf(df)
+    y = df['es_teletrabajo']
+
+    # 3. Split Train/Test (el mismo con el que se entrenó el modelo)
+    X_train, X_test, y_train, y_test = particion_rf(X, y)
+
+    # 4. Entrenamiento: árboles hasta que el score OOB se estanca y validación
+    # cruzada estratificada sobre el train (clasificador_teletrabajo.py)
+    metricas = modelos.metricas
+    if metricas.get("curva_oob"):
+        curva = ", ".join(f"{n}: {oob:.3f}" for n, oob in metricas["curva_oob"])
+        print(f"\n>> Score OOB por nº de árboles: {curva}")
+    print(f">> Árboles del modelo: {metricas['n_arboles']} (ajuste: {metricas['ajuste_s']:.2f}s)")
+    folds = pd.DataFrame(metricas["cv"])
+    print(f"\n>> VALIDACIÓN CRUZADA ({len(folds)} folds estratificados):")
+    print(folds.to_string(index=False, float_format=lambda v: f"{v:.3f}"))
+    print(f"Recall medio: {folds['recall'].mean():.2%} ± {folds['recall'].std():.2%}")
+
+    # 5. Evaluación sobre el test
+    rf_model = modelos.rf
+    y_pred = rf_model.predict(X_test)
+    acc = accuracy_score(y_test, y_pred)
+
+    print(f"\n>> EXACTITUD GLOBAL (Accuracy): {acc:.2%}")
+    print("\n>> REPORTE DE CLASIFICACIÓN (Atención al Recall de 'True'):")
+    print(classification_report(y_test, y_pred))
+
+    # Importancia de variables (Opcional, para justificar)
+    importances = modelos.importancias().nlargest(3)
+    print("\n>> Variables más influyentes en la predicción:")
+    print(importances)
+
+
+    # ==============================================================================
+    # 4.2. CONTRASTE DE HIPÓTESIS
+    # Pregunta: ¿Son diferentes las descripciones de ofertas remotas vs presenciales?
+    # ==============================================================================
+
+    print("\n--- 4.2 Contraste de Hipótesis ---")
+
+    # 1. Definición de grupos
+    grupo_remoto = df[df['es_teletrabajo'] == True]['desc_longitud']
+    grupo_presencial = df[df['es_teletrabajo'] == False]['desc_longitud']
+
+    print(f"Longitud Media - Remoto:     {grupo_remoto.mean():.2f} caracteres")
+    print(f"Longitud Media - Presencial: {grupo_presencial.mean():.2f} caracteres")
+
+    # 2. Test de Normalidad (Shapiro-Wilk)
+    _, p_norm_r = stats.shapiro(grupo_remoto)
+    _, p_norm_p = stats.shapiro(grupo_presencial)
+
+    print(f"\nTest de Normalidad (Shapiro): p_remoto={p_norm_r:.5f}, p_presencial={p_norm_p:.5f}")
+
+    # 3. Selección y Ejecución del Test
+    if p_norm_r < alpha or p_norm_p < alpha:
+        print(">> Decisión: Datos NO normales -> Se aplica U de Mann-Whitney.")
+        stat, p_val = stats.mannwhitneyu(grupo_remoto, grupo_presencial, alternative='two-sided')
+    else:
+        print(">> Decisión: Datos Normales -> Se aplica T-Student.")
+        stat, p_val = stats.ttest_ind(grupo_remoto, grupo_presencial)
+
+    print(f"\n>> RESULTADO DEL CONTRASTE: p-value = {p_val:.5f}")
+
+    if p_val < alpha:
+        print(">>> CONCLUSIÓN: RECHAZAMOS H0. Existen diferencias significativas entre grupos.")
+    else:
+        print(">>> CONCLUSIÓN: NO RECHAZAMOS H0. No hay evidencia suficiente de diferencias.")
+
+    # Gráfico Boxplot para la memoria
+    plt.figure(figsize=(8, 5))
+    sns.boxplot(
+        data=df,
+        x='es_teletrabajo',
+        y='desc_longitud',
+        hue='es_teletrabajo',
+        palette='pastel',
+        legend=False
+    )
+    plt.title('Distribución de Longitud de Descripción por Modalidad')
+    plt.xlabel('¿Es Teletrabajo?')
+    plt.ylabel('Caracteres (Longitud)')
+    plt.grid(True, axis='y', alpha=0.3)
+    plt.tight_layout()
+    plt.savefig(fig_dir / FIGURAS[1], dpi=dpi)
+    plt.close()
+
+    return {
+        "perfiles_clusters": perfiles,
+        "accuracy": acc,
+        "importancias": importances,
+        "p_valor": p_val,
+    }
+
+
+if __name__ == "__main__":
+    analizar()
@@ -0,0 +1,131 @@
+import hashlib
+import inspect
+import json
+import os
+import shutil
+import time
+
+# ==========================================
+# CACHÉ DE ARTEFACTOS POR ETAPA
+# ==========================================
+# Caché del runner (pipeline.py). Cada ejecución de una etapa se guarda bajo
+# su clave: un hash de los ficheros que lee, de la salida de las etapas de las
+# que depende, de su código y de sus parámetros.
+#
+#   <ruta>/<etapa>/<clave>.json  -> hash de la salida + {fichero: sha1}
+#   <ruta>/objetos/<sha1>        -> contenido de cada fichero producido
+#
+# Si la clave ya está, la etapa no se ejecuta: los ficheros que falten o que
+# hayan cambiado se restauran desde ``objetos``. Volver a un parámetro o a una
+# versión del código anterior recupera sus artefactos sin recalcular. Se
+# conservan las ``max_versiones`` claves usadas más recientemente en cada
+# etapa y los objetos que ya no usa ninguna se borran.
+
+TAMANO_BLOQUE = 1 << 20
+
+
+def hash_fichero(ruta: str) -> str:
+    h = hashlib.sha1()
+    with open(ruta, "rb") as f:
+        for bloque in iter(lambda: f.read(TAMANO_BLOQUE), b""):
+            h.update(bloque)
+    return h.hexdigest()
+
+
+def hash_codigo(*objetos) -> str:
+    """Hash del código fuente de funciones o módulos."""
+    fuentes = [inspect.getsource(o) for o in objetos]
+    return hashlib.sha1("\n".join(fuentes).encode("utf-8")).hexdigest()
+
+
+def clave_etapa(nombre: str, ficheros: list[str], dependencias: dict, codigo: str,
+                parametros: dict) -> str:
+    partes = [nombre, f"codigo:{codigo}", f"parametros:{json.dumps(parametros, sort_keys=True, default=str)}"]
+    partes += [f"{os.path.basename(r)}:{hash_fichero(r)}" for r in ficheros]
+    partes += [f"{d}:{h}" for d, h in dependencias.items()]
+    return hashlib.sha1("\n".join(partes).encode("utf-8")).hexdigest()
+
+
+class CacheEtapas:
+    """Artefactos de cada etapa indexados por clave, con contenido deduplicado."""
+
+    def __init__(self, ruta: str, max_versiones: int = 5):
+        self.ruta = ruta
+        self.max_versiones = max_versiones
+        self.ruta_objetos = os.path.join(ruta, "objetos")
+        os.makedirs(self.ruta_objetos, exist_ok=True)
+
+    def _ruta_entrada(self, etapa: str, clave: str) -> str:
+        return os.path.join(self.ruta, etapa, f"{clave}.json")
+
+    def buscar(self, etapa: str, clave: str) -> dict | None:
+        """Entrada de ``clave`` si está completa (todos sus objetos existen)."""
+        try:
+            with open(self._ruta_entrada(etapa, clave), encoding="utf-8") as f:
+                entrada = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        objetos = entrada["ficheros"].values()
+        if not all(os.path.exists(os.path.join(self.ruta_objetos, sha)) for sha in objetos):
+            return None
+        # La poda conserva las usadas más recientemente, no las más nuevas
+        os.utime(self._ruta_entrada(etapa, clave))
+        return entrada
+
+    def restaurar(self, entrada: dict) -> int:
+        """Deja en disco los ficheros de ``entrada``; devuelve cuántos tuvo que copiar."""
+        copiados = 0
+        for ruta, sha in entrada["ficheros"].items():
+            if os.path.exists(ruta) and hash_fichero(ruta) == sha:
+                continue
+            os.makedirs(os.path.dirname(ruta) or ".", exist_ok=True)
+            temporal = f"{ruta}.tmp"
+            shutil.copyfile(os.path.join(self.ruta_objetos, sha), temporal)
+            os.replace(temporal, ruta)
+            copiados += 1
+        return copiados
+
+    def guardar(self, etapa: str, clave: str, ficheros: list[str], salida: str | None) -> None:
+        """Registra los ``ficheros`` producidos con ``clave`` y el hash de su ``salida``."""
+        registro = {}
+        for ruta in ficheros:
+            sha = hash_fichero(ruta)
+            destino = os.path.join(self.ruta_objetos, sha)
+            if not os.path.exists(destino):
+                shutil.copyfile(ruta, f"{destino}.tmp")
+                os.replace(f"{destino}.tmp", destino)
+            registro[ruta] = sha
+
+        ruta_entrada = self._ruta_entrada(etapa, clave)
+        os.makedirs(os.path.dirname(ruta_entrada), exist_ok=True)
+        with open(f"{ruta_entrada}.tmp", "w", encoding="utf-8") as f:
+            json.dump({"salida": salida, "ficheros": registro, "creado": time.time()}, f, indent=2)
+        os.replace(f"{ruta_entrada}.tmp", ruta_entrada)
+        self._podar(etapa)
+
+    def _podar(self, etapa: str) -> None:
+        directorio = os.path.join(self.ruta, etapa)
+        entradas = sorted(
+            (os.path.join(directorio, n) for n in os.listdir(directorio) if n.endswith(".json")),
+            key=os.path.getmtime,
+            reverse=True,
+        )
+        sobrantes = entradas[self.max_versiones:]
+        if not sobrantes:
+            return
+        for ruta in sobrantes:
+            os.remove(ruta)
+        self._borrar_huerfanos()
+
+    def _borrar_huerfanos(self) -> None:
+        usados = set()
+        for raiz, _, nombres in os.walk(self.ruta):
+            if raiz == self.ruta_objetos:
+                continue
+            for nombre in nombres:
+                if nombre.endswith(".json"):
+                    with open(os.path.join(raiz, nombre), encoding="utf-8") as f:
+                        usados.update(json.load(f)["ficheros"].values())
+        for sha in os.listdir(self.ruta_objetos):
+            if sha not in usados:
+                os.remove(os.path.join(self.ruta_objetos, sha))
@@ -0,0 +1,116 @@
+import hashlib
+import inspect
+import json
+import os
+import sqlite3
+import time
+
+# ==========================================
+# CACHÉ PERSISTENTE DE NORMALIZACIÓN
+# ==========================================
+# Las mismas ubicaciones ("Madrid", "Remote in London", "Berlin 10115") se
+# repiten en cada crawl. Esta caché guarda en SQLite el resultado de cada
+# función de limpieza por texto en bruto, entre ejecuciones y entre etapas:
+#
+#   (funcion, version, raw) -> resultado (JSON), ultimo_uso
+#
+# ``version`` es un hash del código de la función (y de los patrones que use),
+# así que al cambiar un limpiador sus entradas viejas dejan de coincidir y se
+# recalculan sin tener que borrar nada a mano. La tabla tiene un máximo de
+# entradas: al superarlo se expulsan las de uso más antiguo (LRU).
+
+TAMANO_CONSULTA = 500          # parámetros por SELECT ... IN (...)
+
+
+def version_de(funcion, *dependencias) -> str:
+    """Hash corto del código de ``funcion`` y de sus ``dependencias`` (p. ej. regex)."""
+    partes = [inspect.getsource(funcion)]
+    for dependencia in dependencias:
+        partes.append(getattr(dependencia, "pattern", repr(dependencia)))
+    return hashlib.sha1("\n".join(partes).encode("utf-8")).hexdigest()[:12]
+
+
+class CacheNormalizacion:
+    """Resultados de limpieza por texto en bruto, persistidos en SQLite."""
+
+    def __init__(self, ruta: str, max_entradas: int = 200_000):
+        self.ruta = ruta
+        self.max_entradas = max_entradas
+        self.aciertos = 0
+        self.fallos = 0
+        os.makedirs(os.path.dirname(ruta) or ".", exist_ok=True)
+        self.conexion = sqlite3.connect(ruta, timeout=30)
+        self.conexion.execute("PRAGMA journal_mode=WAL")
+        self.conexion.execute("PRAGMA synchronous=NORMAL")
+        self.conexion.execute(
+            "CREATE TABLE IF NOT EXISTS normalizacion ("
+            " funcion TEXT NOT NULL, version TEXT NOT NULL, raw TEXT NOT NULL,"
+            " resultado TEXT NOT NULL, ultimo_uso REAL NOT NULL,"
+            " PRIMARY KEY (funcion, version, raw))"
+        )
+        self.conexion.execute(
+            "CREATE INDEX IF NOT EXISTS idx_ultimo_uso ON normalizacion (ultimo_uso)"
+        )
+        self.conexion.commit()
+
+    def obtener(self, funcion: str, version: str, claves: list[str]) -> dict:
+        """Devuelve ``{raw: resultado}`` para las claves que ya están en caché."""
+        encontrados = {}
+        for i in range(0, len(claves), TAMANO_CONSULTA):
+            lote = claves[i:i + TAMANO_CONSULTA]
+            marcas = ",".join("?" * len(lote))
+            filas = self.conexion.execute(
+                f"SELECT raw, resultado FROM normalizacion"
+                f" WHERE funcion = ? AND version = ? AND raw IN ({marcas})",
+                [funcion, version, *lote],
+            )
+            encontrados.update((raw, json.loads(resultado)) for raw, resultado in filas)
+
+        ahora = time.time()
+        with self.conexion:
+            self.conexion.executemany(
+                "UPDATE normalizacion SET ultimo_uso = ? WHERE funcion = ? AND version = ? AND raw = ?",
+                [(ahora, funcion, version, raw) for raw in encontrados],
+            )
+        self.aciertos += len(encontrados)
+        self.fallos += len(claves) - len(encontrados)
+        return encontrados
+
+    def guardar(self, funcion: str, version: str, resultados: dict) -> None:
+        if not resultados:
+            return
+        ahora = time.time()
+        with self.conexion:
+            self.conexion.executemany(
+                "INSERT OR REPLACE INTO normalizacion VALUES (?, ?, ?, ?, ?)",
+                [(funcion, version, raw, json.dumps(valor), ahora) for raw, valor in resultados.items()],
+            )
+        self._expulsar()
+
+    def _expulsar(self) -> None:
+        (total,) = self.conexion.execute("SELECT COUNT(*) FROM normalizacion").fetchone()
+        sobrantes = total - self.max_entradas
+        if sobrantes > 0:
+            with self.conexion:
+                self.conexion.execute(
+                    "DELETE FROM normalizacion WHERE rowid IN"
+                    " (SELECT rowid FROM normalizacion ORDER BY ultimo_uso LIMIT ?)",
+                    (sobrantes,),
+                )
+
+    def resumen(self) -> str:
+        consultas = self.aciertos + self.fallos
+        tasa = self.aciertos / consultas if consultas else 0.0
+        return f"{self.aciertos} aciertos, {self.fallos} nuevos ({tasa:.0%} de acierto)"
+
+    def cerrar(self) -> None:
+        self.conexion.close()
+
+
+def abrir_cache(ruta: str, max_entradas: int = 200_000) -> CacheNormalizacion | None:
+    """Abre la caché o devuelve None si no se puede (la limpieza sigue sin ella)."""
+    try:
+        return CacheNormalizacion(ruta, max_entradas)
+    except sqlite3.Error as e:
+        print(f"[WARN] Caché de normalización no disponible ({e}). Se limpia sin caché.")
+        return None
@@ -0,0 +1,417 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from cache_etapas import hash_fichero
+
+# ==========================================
+# CARGA TIPADA DE LOS CSV DEL PIPELINE
+# ==========================================
+# Esquema declarado una sola vez para todas las etapas: en lugar de inferir
+# tipos en cada lectura y convertir después con ``astype``, el parser crea ya
+# las categorías, booleanos y floats. Cada etapa lee además solo las columnas
+# que usa (``COLUMNAS_ETAPA``) y con el motor más rápido disponible: pyarrow
+# (multihilo) si está instalado y, si no, el parser en C de pandas.
+#
+# Entre etapas los datos pasan además por un fichero columnar Feather (Arrow
+# IPC) junto al CSV: conserva categorías y booleanos, se abre con memory-map y
+# se lee solo por las columnas pedidas. ``cargar_mercado`` lo
+# prefiere al CSV si existe y el CSV no ha cambiado desde que se escribió (su
+# huella de contenido, no las fechas); el CSV queda como entregable.
+#
+# Para ficheros que no caben en memoria, ``*_por_lotes`` y ``EscritorEtapa``
+# recorren y escriben los mismos ficheros en lotes de ``FILAS_LOTE`` filas.
+#
+# Medición antes/después: python bench/bench_carga.py, bench/bench_intermedio.py
+# y bench/bench_lotes.py
+
+ESQUEMA_INDEED = {
+    "titulo": "str",
+    "empresa": "str",
+    "pais": "str",
+    "ubicacion_raw": "str",
+    "modalidad": "str",
+    # desc_longitud se infiere: integracion_datos.py la convierte con to_numeric
+    # tolerando basura del scraping
+    "url": "str",
+}
+
+ESQUEMA_MERCADO = {
+    "titulo": "str",
+    "empresa": "str",
+    "pais": "category",
+    "ciudad_limpia": "str",
+    "ubicacion_raw": "str",
+    "salario_medio_ppp_2024": "float64",
+    "indice_coste_vida_2024": "float64",
+    "indice_alquiler_2024": "float64",
+    "salario_real_ajustado": "float64",
+    "modalidad": "category",
+    "es_teletrabajo": "bool",
+    "desc_longitud": "float64",
+    "url": "str",
+}
+
+# Proyección por etapa (None = todas las columnas del fichero)
+COLUMNAS_ETAPA = {
+    "integracion": ["titulo", "empresa", "pais", "ubicacion_raw", "modalidad", "desc_longitud", "url"],
+    "limpieza": None,
+    "analisis": [
+        "titulo", "pais", "salario_real_ajustado", "indice_coste_vida_2024",
+        "es_teletrabajo", "desc_longitud",
+    ],
+    "visualizacion": [
+        "titulo", "pais", "salario_real_ajustado", "indice_coste_vida_2024",
+        "es_teletrabajo", "desc_longitud",
+    ],
+}
+
+# LZ4 deja el Feather en torno a la mitad del CSV y se descomprime más rápido
+# de lo que se parsea el CSV; "uncompressed" permite leer con memory-map sin
+# copiar los buffers, a cambio de un fichero mayor que el CSV.
+COMPRESION_FEATHER = "lz4"
+
+# Modo por lotes: filas por lote (la memoria depende de esto, no del fichero)
+FILAS_LOTE = 100_000
+
+
+def motor_csv() -> str:
+    """``pyarrow`` si está instalado; si no, el parser en C."""
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return "c"
+    return "pyarrow"
+
+
+def formato_intermedio(formato: str = "auto") -> str:
+    """Resuelve ``"auto"``: Feather si pyarrow está instalado; si no, CSV."""
+    if formato == "auto":
+        return "feather" if motor_csv() == "pyarrow" else "csv"
+    if formato not in ("feather", "csv"):
+        raise ValueError(f"Formato intermedio desconocido: {formato!r}")
+    if formato == "feather" and motor_csv() != "pyarrow":
+        raise RuntimeError("El formato Feather necesita pyarrow ('pip install pyarrow').")
+    return formato
+
+
+def ruta_columnar(ruta_csv: str) -> str:
+    """Fichero Feather que acompaña a ``ruta_csv`` (mismo nombre, otra extensión)."""
+    return os.path.splitext(ruta_csv)[0] + ".feather"
+
+
+def tipar(df: pd.DataFrame, esquema: dict) -> pd.DataFrame:
+    """Aplica a ``df`` los tipos de ``esquema`` (salvo ``str``, que se deja tal cual)."""
+    for col, tipo in esquema.items():
+        if tipo != "str" and col in df.columns and df[col].dtype != tipo:
+            df[col] = df[col].astype(tipo)
+    return df
+
+
+def proyectar(df: pd.DataFrame, etapa: str) -> pd.DataFrame:
+    """Lo que ``cargar_mercado`` daría a ``etapa``, a partir de un DataFrame en memoria.
+
+    Es el hand-off del runner (pipeline.py): mismas columnas, mismo orden y
+    mismos tipos que la lectura de disco, en un DataFrame nuevo que la etapa
+    puede modificar sin tocar el de la etapa anterior.
+    """
+    columnas = COLUMNAS_ETAPA[etapa]
+    if columnas is not None:
+        df = df[[c for c in df.columns if c in columnas]]
+    return tipar(df.copy(), ESQUEMA_MERCADO)
+
+
+def seleccionar_filas(df: pd.DataFrame, mascara) -> pd.DataFrame:
+    """``df[mascara]`` seleccionando columna a columna.
+
+    Con texto respaldado por Arrow, ``df[mascara]`` pasa por ``take``, que
+    concatena los trozos de cada columna antes de elegir filas (una copia
+    completa de más); la máscara booleana sobre el array usa ``filter``, que
+    trabaja trozo a trozo. Mismo resultado (índice incluido), la mitad de pico.
+    """
+    mascara = np.asarray(mascara, dtype=bool)
+    indice = df.index[mascara]
+    columnas = {c: pd.Series(df[c].array[mascara], index=indice, name=c) for c in df.columns}
+    return pd.DataFrame(columnas, columns=df.columns, copy=False)
+
+
+def leer_cabecera(ruta: str, sep: str) -> list[str]:
+    return pd.read_csv(ruta, sep=sep, nrows=0, encoding="utf-8-sig").columns.tolist()
+
+
+def leer_csv_tipado(ruta: str, esquema: dict, sep: str, columnas: list[str] | None = None,
+                    motor: str | None = None) -> pd.DataFrame:
+    """Lee ``ruta`` con los tipos de ``esquema`` y solo las ``columnas`` pedidas.
+
+    Las columnas pedidas que no existan en el fichero se ignoran (como hacía la
+    selección "segura" de integracion_datos.py) y el resultado conserva el
+    orden del fichero sea cual sea el motor.
+    """
+    cabecera = leer_cabecera(ruta, sep)
+    if columnas is not None:
+        cabecera = [c for c in cabecera if c in columnas]
+    tipos = {c: t for c, t in esquema.items() if c in cabecera}
+    opciones = dict(sep=sep, usecols=cabecera, dtype=tipos, encoding="utf-8-sig")
+    engine = motor or motor_csv()
+    try:
+        # Con pyarrow una fila mal formada es un error y no se salta: puede ser
+        # el trozo de una celda de varias líneas, no una línea rota de verdad
+        df = pd.read_csv(ruta, engine=engine, on_bad_lines="error" if engine == "pyarrow" else "warn",
+                         **opciones)
+    except ValueError as e:
+        # pyarrow parte el fichero en bloques por saltos de línea y falla si
+        # una celda entre comillas los tiene justo en el corte (ficheros
+        # grandes): en ese caso se relee con el parser en C
+        if motor is not None or engine != "pyarrow":
+            raise
+        print(f"[WARN] pyarrow no puede leer {os.path.basename(ruta)} ({e}). Se usa el parser en C.")
+        df = pd.read_csv(ruta, engine="c", on_bad_lines="warn", **opciones)
+    return df[cabecera]
+
+
+def leer_feather(ruta: str, columnas: list[str] | None = None) -> pd.DataFrame:
+    """Lee ``ruta`` con memory-map y solo las ``columnas`` pedidas que existan."""
+    import pyarrow as pa
+    from pyarrow import feather
+
+    if columnas is not None:
+        with pa.memory_map(ruta) as fuente:
+            disponibles = pa.ipc.open_file(fuente).schema.names
+        columnas = [c for c in disponibles if c in columnas]
+    return feather.read_table(ruta, columns=columnas, memory_map=True).to_pandas()
+
+
+def ruta_huella(ruta_csv: str) -> str:
+    """Huella del CSV que había al escribir el Feather de ``ruta_csv``."""
+    return ruta_columnar(ruta_csv) + ".json"
+
+
+def huella_csv(ruta_csv: str) -> dict | None:
+    """Tamaño y SHA-1 del contenido de ``ruta_csv`` (None si no existe)."""
+    if not os.path.exists(ruta_csv):
+        return None
+    return {"tamano": os.path.getsize(ruta_csv), "sha1": hash_fichero(ruta_csv)}
+
+
+def anotar_huella(ruta_csv: str) -> None:
+    """Guarda junto al Feather recién escrito la huella del CSV actual."""
+    with open(ruta_huella(ruta_csv), "w", encoding="utf-8") as f:
+        json.dump({"csv": huella_csv(ruta_csv)}, f)
+
+
+def borrar_columnar(ruta_csv: str) -> None:
+    for ruta in (ruta_columnar(ruta_csv), ruta_huella(ruta_csv)):
+        if os.path.exists(ruta):
+            os.remove(ruta)
+
+
+def columnar_vigente(ruta_csv: str) -> str | None:
+    """Feather de ``ruta_csv`` si se puede leer y el CSV no ha cambiado desde que se escribió.
+
+    Se compara el contenido del CSV con la huella anotada al escribir el
+    Feather, no las fechas: un checkout o un ``touch`` no lo invalidan y un
+    CSV con otro contenido sí, tenga el mtime que tenga. Un Feather sin huella
+    (de una versión anterior) no se usa si hay CSV.
+    """
+    ruta = ruta_columnar(ruta_csv)
+    if motor_csv() != "pyarrow" or not os.path.exists(ruta):
+        return None
+    if not os.path.exists(ruta_csv):
+        return ruta
+    try:
+        with open(ruta_huella(ruta_csv), encoding="utf-8") as f:
+            anotada = json.load(f)["csv"]
+    except (FileNotFoundError, json.JSONDecodeError, KeyError):
+        return None
+    # Sin CSV al escribir el Feather: el que hay ahora es posterior
+    if anotada is None or os.path.getsize(ruta_csv) != anotada["tamano"]:
+        return None
+    return ruta if hash_fichero(ruta_csv) == anotada["sha1"] else None
+
+
+def guardar_etapa(df: pd.DataFrame, ruta_csv: str, formato: str = "auto",
+                  entregable: bool = False, compresion: str = COMPRESION_FEATHER) -> list[str]:
+    """Escribe la salida de una etapa; devuelve las rutas escritas.
+
+    Con ``"feather"`` el intermedio es el fichero columnar (con los tipos de
+    ``ESQUEMA_MERCADO``) y con ``"csv"`` el CSV ``;`` de siempre. Si la salida
+    es ``entregable`` el CSV se escribe en cualquier caso. Junto al Feather se
+    anota la huella del CSV (``columnar_vigente``). Un Feather previo que ya
+    no correspondería se borra.
+    """
+    formato = formato_intermedio(formato)
+    borrar_columnar(ruta_csv)
+    rutas = []
+    if entregable or formato == "csv":
+        df.to_csv(ruta_csv, index=False, sep=";", encoding="utf-8-sig")
+        rutas.append(ruta_csv)
+    ruta = ruta_columnar(ruta_csv)
+    if formato == "feather":
+        import pyarrow as pa
+        from pyarrow import feather
+
+        tabla = pa.Table.from_pandas(tipar(df.copy(), ESQUEMA_MERCADO), preserve_index=False)
+        feather.write_feather(tabla, ruta, compression=compresion)
+        anotar_huella(ruta_csv)
+        rutas.append(ruta)
+    return rutas
+
+
+def cargar_indeed(ruta: str, motor: str | None = None) -> pd.DataFrame:
+    """CSV del scraper, proyectado a las columnas que usa la integración."""
+    return leer_csv_tipado(ruta, ESQUEMA_INDEED, ",", COLUMNAS_ETAPA["integracion"], motor)
+
+
+def cargar_mercado(ruta: str, etapa: str, motor: str | None = None) -> pd.DataFrame:
+    """Dataset integrado o limpio con las columnas que usa ``etapa``.
+
+    Lee el Feather de ``ruta`` si está vigente (``columnar_vigente``) y, si no,
+    el CSV ``;``. Pasar ``motor`` fuerza la lectura del CSV con ese parser.
+    """
+    ruta_feather = columnar_vigente(ruta) if motor is None else None
+    if ruta_feather:
+        return tipar(leer_feather(ruta_feather, COLUMNAS_ETAPA[etapa]), ESQUEMA_MERCADO)
+    return leer_csv_tipado(ruta, ESQUEMA_MERCADO, ";", COLUMNAS_ETAPA[etapa], motor)
+
+
+# ==========================================
+# LECTURA Y ESCRITURA POR LOTES
+# ==========================================
+
+def leer_csv_por_lotes(ruta: str, esquema: dict, sep: str, columnas: list[str] | None = None,
+                       filas_lote: int = FILAS_LOTE):
+    """``leer_csv_tipado`` en lotes de ``filas_lote`` filas (generador).
+
+    Usa siempre el parser en C: el de pyarrow no lee por trozos.
+    """
+    cabecera = leer_cabecera(ruta, sep)
+    if columnas is not None:
+        cabecera = [c for c in cabecera if c in columnas]
+    tipos = {c: t for c, t in esquema.items() if c in cabecera}
+    with pd.read_csv(
+        ruta,
+        sep=sep,
+        usecols=cabecera,
+        dtype=tipos,
+        engine="c",
+        encoding="utf-8-sig",
+        on_bad_lines="warn",
+        chunksize=filas_lote,
+    ) as lector:
+        for lote in lector:
+            yield lote[cabecera]
+
+
+def cargar_indeed_por_lotes(ruta: str, filas_lote: int = FILAS_LOTE):
+    """``cargar_indeed`` en lotes de ``filas_lote`` filas (generador)."""
+    yield from leer_csv_por_lotes(ruta, ESQUEMA_INDEED, ",", COLUMNAS_ETAPA["integracion"], filas_lote)
+
+
+def cargar_mercado_por_lotes(ruta: str, etapa: str, filas_lote: int = FILAS_LOTE):
+    """``cargar_mercado`` en lotes de ``filas_lote`` filas (generador).
+
+    Del Feather vigente se descomprime un record batch cada vez; si no hay, se
+    lee el CSV por trozos.
+    """
+    ruta_feather = columnar_vigente(ruta)
+    if ruta_feather is None:
+        yield from leer_csv_por_lotes(ruta, ESQUEMA_MERCADO, ";", COLUMNAS_ETAPA[etapa], filas_lote)
+        return
+
+    import pyarrow as pa
+
+    with pa.memory_map(ruta_feather) as fuente:
+        lector = pa.ipc.open_file(fuente)
+        columnas = COLUMNAS_ETAPA[etapa]
+        if columnas is not None:
+            columnas = [c for c in lector.schema.names if c in columnas]
+        for i in range(lector.num_record_batches):
+            batch = lector.get_batch(i)
+            if columnas is not None:
+                batch = batch.select(columnas)
+            for inicio in range(0, batch.num_rows, filas_lote):
+                yield tipar(batch.slice(inicio, filas_lote).to_pandas(), ESQUEMA_MERCADO)
+
+
+# Tipos Arrow fijos para escribir por lotes: cada lote trae sus propias
+# categorías, así que en el Feather las categóricas van como texto (al leerlo,
+# ``tipar`` las vuelve a convertir)
+TIPOS_ARROW = {"str": "string", "category": "string", "bool": "bool", "float64": "float64"}
+
+
+class EscritorEtapa:
+    """``guardar_etapa`` por lotes: cada ``escribir`` añade un lote a los ficheros.
+
+    Escribe los mismos ficheros que ``guardar_etapa`` con los mismos
+    ``formato`` y ``entregable``. Se usa como context manager; si algo falla
+    antes de cerrar, los ficheros a medias se borran.
+    """
+
+    def __init__(self, ruta_csv: str, formato: str = "auto", entregable: bool = False,
+                 compresion: str = COMPRESION_FEATHER):
+        self.formato = formato_intermedio(formato)
+        self.ruta_csv = ruta_csv
+        self.ruta_feather = ruta_columnar(ruta_csv)
+        self.compresion = None if compresion == "uncompressed" else compresion
+        self.filas = 0
+        self.rutas = []
+        self._csv = None
+        # Aparte de ``filas``: un lote vacío (todo filtrado) también escribe la cabecera
+        self._cabecera_escrita = False
+        self._feather = None
+        self._esquema = None
+        borrar_columnar(ruta_csv)
+        if entregable or self.formato == "csv":
+            self._csv = open(ruta_csv, "w", encoding="utf-8-sig", newline="")
+            self.rutas.append(ruta_csv)
+        if self.formato == "feather":
+            self.rutas.append(self.ruta_feather)
+
+    def _abrir_feather(self, tabla) -> None:
+        import pyarrow as pa
+
+        campos = [
+            pa.field(c, TIPOS_ARROW[ESQUEMA_MERCADO[c]]) if c in ESQUEMA_MERCADO else tabla.schema.field(c)
+            for c in tabla.column_names
+        ]
+        self._esquema = pa.schema(campos)
+        self._feather = pa.ipc.new_file(
+            self.ruta_feather, self._esquema, options=pa.ipc.IpcWriteOptions(compression=self.compresion)
+        )
+
+    def escribir(self, df: pd.DataFrame) -> None:
+        if self._csv is not None:
+            df.to_csv(self._csv, index=False, sep=";", header=not self._cabecera_escrita)
+            self._cabecera_escrita = True
+        if self.formato == "feather":
+            import pyarrow as pa
+
+            tabla = pa.Table.from_pandas(df, preserve_index=False)
+            if self._feather is None:
+                self._abrir_feather(tabla)
+            self._feather.write_table(tabla.cast(self._esquema))
+        self.filas += len(df)
+
+    def cerrar(self) -> list[str]:
+        """Cierra los ficheros y anota la huella del CSV junto al Feather."""
+        if self._csv is not None:
+            self._csv.close()
+        if self._feather is not None:
+            self._feather.close()
+            anotar_huella(self.ruta_csv)
+        elif self.formato == "feather" and self.filas == 0:
+            self.rutas.remove(self.ruta_feather)
+        return self.rutas
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, tipo, valor, traza):
+        self.cerrar()
+        if tipo is not None:
+            for ruta in [*self.rutas, ruta_huella(self.ruta_csv)]:
+                if os.path.exists(ruta):
+                    os.remove(ruta)
+        return False
@@ -0,0 +1,163 @@
+import json
+import os
+import re
+import threading
+
+import pandas as pd
+
+# ==========================================
+# CHECKPOINT DEL CRAWL (APPEND-ONLY)
+# ==========================================
+# Cada página terminada se añade como una línea JSON con su cursor
+# (país, start) y las ofertas nuevas que aportó:
+#
+#   {"pais": "ES", "start": 10, "fin": false, "ofertas": [{"job_id": ..., ...}]}
+#
+# Una línea se escribe entera y con fsync, así que tras un corte como mucho se
+# pierde la página en curso; una última línea truncada se ignora al cargar.
+# En memoria solo se guardan cursores e ids; las ofertas se releen del fichero
+# en streaming cuando hay que reconstruir la salida (``iterar_ofertas``).
+
+
+class CheckpointCrawl:
+    """Estado persistente de un crawl: páginas hechas, ``data-jk`` vistos y ofertas."""
+
+    def __init__(self, ruta: str):
+        self.ruta = ruta
+        self._lock = threading.Lock()
+        self.paginas = set()          # (pais, start) ya procesadas
+        self.paises_terminados = set()
+        self.ids = set()              # data-jk de las ofertas guardadas
+        os.makedirs(os.path.dirname(ruta) or ".", exist_ok=True)
+        self._cargar()
+
+    def _registros(self):
+        if not os.path.exists(self.ruta):
+            return
+        with open(self.ruta, "r", encoding="utf-8") as f:
+            for linea in f:
+                try:
+                    yield json.loads(linea)
+                except json.JSONDecodeError:
+                    # Línea a medio escribir por un corte: se descarta
+                    continue
+
+    def _cargar(self) -> None:
+        if not os.path.exists(self.ruta):
+            return
+        lineas = 0
+        for registro in self._registros():
+            lineas += 1
+            self.paginas.add((registro["pais"], registro["start"]))
+            if registro.get("fin"):
+                self.paises_terminados.add(registro["pais"])
+            self.ids.update(oferta["job_id"] for oferta in registro.get("ofertas", []))
+        print(f"♻️  Checkpoint cargado: {lineas} páginas, {len(self.ids)} ofertas ({self.ruta})")
+
+    def iterar_ofertas(self):
+        """Relee del fichero las páginas guardadas como ``{data-jk: oferta}``."""
+        for registro in self._registros():
+            ofertas = {}
+            for oferta in registro.get("ofertas", []):
+                oferta = dict(oferta)
+                ofertas[oferta.pop("job_id")] = oferta
+            if ofertas:
+                yield ofertas
+
+    def ids_vistos(self) -> set:
+        with self._lock:
+            return set(self.ids)
+
+    def pagina_hecha(self, pais: str, start: int) -> bool:
+        with self._lock:
+            return pais in self.paises_terminados or (pais, start) in self.paginas
+
+    def pais_terminado(self, pais: str) -> bool:
+        with self._lock:
+            return pais in self.paises_terminados
+
+    def completo(self, paises: list[str], starts) -> bool:
+        """True si en cada país están hechas todas las páginas ``starts`` (o terminó antes)."""
+        return all(self.pagina_hecha(pais, start) for pais in paises for start in starts)
+
+    def registrar_pagina(self, pais: str, start: int, ofertas: dict, fin: bool = False) -> None:
+        """Persiste una página procesada con sus ofertas nuevas (data-jk -> oferta)."""
+        registro = {
+            "pais": pais,
+            "start": start,
+            "fin": fin,
+            "ofertas": [{"job_id": job_id, **oferta} for job_id, oferta in ofertas.items()],
+        }
+        linea = json.dumps(registro, ensure_ascii=False) + "\n"
+        with self._lock:
+            with open(self.ruta, "a", encoding="utf-8") as f:
+                f.write(linea)
+                f.flush()
+                os.fsync(f.fileno())
+            self.paginas.add((pais, start))
+            if fin:
+                self.paises_terminados.add(pais)
+            self.ids.update(ofertas)
+
+    def reiniciar(self) -> None:
+        with self._lock:
+            if os.path.exists(self.ruta):
+                os.remove(self.ruta)
+            self.paginas.clear()
+            self.paises_terminados.clear()
+            self.ids.clear()
+
+
+def ruta_checkpoint(ruta_dataset: str, keyword: str, location: str, sufijo: str = "") -> str:
+    """Un checkpoint por búsqueda, p. ej. ``.crawl/data-analyst-todas.jsonl``.
+
+    ``sufijo`` (la fecha en modo incremental) separa el cursor de cada ejecución.
+    """
+    slug = re.sub(r"[^a-z0-9]+", "-", f"{keyword}__{location or 'todas'}__{sufijo}".lower()).strip("-")
+    return os.path.join(ruta_dataset, ".crawl", f"{slug}.jsonl")
+
+
+# ==========================================
+# ÍNDICE DE IDS HISTÓRICOS (MODO INCREMENTAL)
+# ==========================================
+
+_patron_jk = re.compile(r"[?&]jk=([^&#]+)")
+
+
+def id_de_url(url: str) -> str | None:
+    """Extrae el ``data-jk`` de una URL ``/viewjob?jk=...``."""
+    coincidencia = _patron_jk.search(str(url))
+    return coincidencia.group(1) if coincidencia else None
+
+
+def cargar_ids_historicos(ruta_csv: str, ruta_indice: str) -> set:
+    """Devuelve los ``data-jk`` ya publicados en ``ruta_csv``.
+
+    Se lee el índice compacto (un id por línea) si está al día; si no existe o
+    el CSV es más reciente, se reconstruye a partir de la columna ``url``.
+    """
+    if os.path.exists(ruta_indice) and (
+        not os.path.exists(ruta_csv) or os.path.getmtime(ruta_indice) >= os.path.getmtime(ruta_csv)
+    ):
+        with open(ruta_indice, "r", encoding="utf-8") as f:
+            return {linea.strip() for linea in f if linea.strip()}
+
+    if not os.path.exists(ruta_csv):
+        return set()
+
+    urls = pd.read_csv(ruta_csv, usecols=["url"], encoding="utf-8-sig")["url"]
+    ids = {job_id for job_id in map(id_de_url, urls) if job_id}
+    os.makedirs(os.path.dirname(ruta_indice) or ".", exist_ok=True)
+    with open(ruta_indice, "w", encoding="utf-8") as f:
+        f.writelines(f"{job_id}\n" for job_id in sorted(ids))
+    print(f"🗂️  Índice de ids reconstruido: {len(ids)} ids ({ruta_indice})")
+    return ids
+
+
+def anadir_ids_indice(ruta_indice: str, ids: list) -> None:
+    """Añade ids nuevos al índice compacto (append-only)."""
+    if not ids:
+        return
+    os.makedirs(os.path.dirname(ruta_indice) or ".", exist_ok=True)
+    with open(ruta_indice, "a", encoding="utf-8") as f:
+        f.writelines(f"{job_id}\n" for job_id in ids)
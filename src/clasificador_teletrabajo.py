@@ -0,0 +1,142 @@
+import time
+
+import numpy as np
+import pandas as pd
+from sklearn.compose import ColumnTransformer
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.metrics import accuracy_score, f1_score, make_scorer, recall_score
+from sklearn.model_selection import StratifiedKFold, cross_validate
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import OneHotEncoder
+from sklearn.utils.class_weight import compute_class_weight
+
+# ==========================================
+# CLASIFICADOR DE TELETRABAJO (RANDOM FOREST)
+# ==========================================
+# Pipeline de scikit-learn: codificador de variables + Random Forest.
+#
+# - El codificador deja pasar ``desc_longitud`` y ``titulo_len`` y codifica
+#   ``pais`` en one-hot con una lista de países fija (la del entrenamiento).
+#   Tiene siempre las mismas columnas, en el orden de ``pd.get_dummies(...,
+#   drop_first=True)``, venga el lote que venga. Un país desconocido queda
+#   codificado igual que el primero (todo ceros).
+# - ``crecer_hasta_meseta`` añade árboles con ``warm_start`` (de
+#   ``arboles_paso`` en ``arboles_paso``) hasta que el score OOB deja de mejorar
+#   más de ``tolerancia_oob`` durante ``paciencia_oob`` pasos o se llega a
+#   ``arboles_max``. Con la misma semilla, crecer hasta N árboles da el mismo
+#   bosque que ajustar N de golpe.
+# - ``validacion_cruzada`` evalúa ese número de árboles con k-fold
+#   estratificado, un fold por proceso (``n_jobs``), con los tiempos de
+#   ajuste y predicción de cada fold.
+
+COLUMNAS_NUMERICAS = ['desc_longitud', 'titulo_len']
+COLUMNA_PAIS = 'pais'
+COLUMNAS = [*COLUMNAS_NUMERICAS, COLUMNA_PAIS]
+
+arboles_paso = 25
+arboles_max = 500
+tolerancia_oob = 0.002
+paciencia_oob = 2
+
+
+def paises_de(X: pd.DataFrame) -> list[str]:
+    """Lista fija de países para el codificador (las categorías de ``pais``, ordenadas)."""
+    pais = X[COLUMNA_PAIS]
+    categorias = pais.cat.categories if isinstance(pais.dtype, pd.CategoricalDtype) else pais.dropna().unique()
+    return sorted(str(p) for p in categorias)
+
+
+def crear_codificador(paises: list[str]) -> ColumnTransformer:
+    return ColumnTransformer(
+        [("numericas", "passthrough", COLUMNAS_NUMERICAS),
+         (COLUMNA_PAIS, OneHotEncoder(categories=[paises], drop="first", handle_unknown="ignore",
+                                      sparse_output=False), [COLUMNA_PAIS])],
+        verbose_feature_names_out=False,
+    )
+
+
+def pesos_balanceados(y: pd.Series) -> dict:
+    """``class_weight='balanced'`` calculado una vez (con warm_start el preset avisa)."""
+    clases = np.unique(y)
+    return dict(zip(clases, compute_class_weight("balanced", classes=clases, y=y)))
+
+
+def crear_pipeline(paises: list[str], pesos_clase: dict, n_arboles: int, random_state: int,
+                   n_jobs: int | None = None) -> Pipeline:
+    rf = RandomForestClassifier(n_estimators=n_arboles, random_state=random_state, class_weight=pesos_clase,
+                                n_jobs=n_jobs)
+    return Pipeline([("codificador", crear_codificador(paises)), ("rf", rf)])
+
+
+def crecer_hasta_meseta(pipeline: Pipeline, X: pd.DataFrame, y: pd.Series) -> list[tuple[int, float]]:
+    """Ajusta ``pipeline`` añadiendo árboles hasta que el OOB se estanca.
+
+    Devuelve la curva [(árboles, score OOB), ...]; el bosque final es el del
+    último punto.
+    """
+    X_cod = pipeline["codificador"].fit_transform(X)
+    rf = pipeline["rf"]
+    rf.set_params(warm_start=True, oob_score=True, n_estimators=arboles_paso)
+    curva = []
+    mejor, sin_mejora = -np.inf, 0
+    while True:
+        rf.fit(X_cod, y)
+        curva.append((rf.n_estimators, float(rf.oob_score_)))
+        if rf.oob_score_ > mejor + tolerancia_oob:
+            mejor, sin_mejora = rf.oob_score_, 0
+        else:
+            sin_mejora += 1
+        if sin_mejora >= paciencia_oob or rf.n_estimators >= arboles_max:
+            break
+        rf.set_params(n_estimators=rf.n_estimators + arboles_paso)
+    rf.set_params(warm_start=False)
+    return curva
+
+
+def validacion_cruzada(pipeline: Pipeline, X: pd.DataFrame, y: pd.Series, n_folds: int,
+                       random_state: int, n_jobs: int | None = None) -> pd.DataFrame:
+    """Accuracy, recall y F1 (de la clase True) y tiempos de cada fold estratificado."""
+    # El RF de cada fold usa un solo núcleo: el paralelismo está en los folds
+    pipeline = pipeline.set_params(rf__n_jobs=1)
+    cv = StratifiedKFold(n_splits=n_folds, shuffle=True, random_state=random_state)
+    scoring = {"accuracy": make_scorer(accuracy_score),
+               "recall": make_scorer(recall_score, pos_label=True),
+               "f1": make_scorer(f1_score, pos_label=True)}
+    resultado = cross_validate(pipeline, X, y, cv=cv, scoring=scoring, n_jobs=n_jobs)
+    return pd.DataFrame({
+        "fold": range(1, n_folds + 1),
+        "ajuste_s": resultado["fit_time"],
+        "prediccion_s": resultado["score_time"],
+        "accuracy": resultado["test_accuracy"],
+        "recall": resultado["test_recall"],
+        "f1": resultado["test_f1"],
+    })
+
+
+def entrenar(X: pd.DataFrame, y: pd.Series, n_arboles: int | None, n_folds: int, random_state: int,
+             n_jobs: int | None = None) -> tuple[Pipeline, dict]:
+    """Pipeline ajustado sobre (X, y) y sus métricas (curva OOB, folds de la CV).
+
+    Con ``n_arboles`` None el número de árboles se decide con ``crecer_hasta_meseta``.
+    """
+    paises = paises_de(X)
+    pesos_clase = pesos_balanceados(y)
+    inicio = time.perf_counter()
+    pipeline = crear_pipeline(paises, pesos_clase, n_arboles or arboles_paso, random_state, n_jobs)
+    curva = []
+    if n_arboles is None:
+        curva = crecer_hasta_meseta(pipeline, X, y)
+    else:
+        pipeline.fit(X, y)
+    segundos = time.perf_counter() - inicio
+
+    n_arboles = pipeline["rf"].n_estimators
+    folds = validacion_cruzada(crear_pipeline(paises, pesos_clase, n_arboles, random_state),
+                               X, y, n_folds, random_state, n_jobs)
+    metricas = {
+        "n_arboles": n_arboles,
+        "ajuste_s": segundos,
+        "curva_oob": curva,
+        "cv": folds.to_dict(orient="list"),
+    }
+    return pipeline, metricas
@@ -1,109 +1,303 @@
+import hashlib
+
 import pandas as pd
-import numpy as np
-import re
+
+from cache_normalizacion import abrir_cache
+from carga_datos import (FILAS_LOTE, EscritorEtapa, cargar_mercado, cargar_mercado_por_lotes,
+                         guardar_etapa, proyectar, seleccionar_filas)
+from limpieza_ubicacion import limpiar_ubicacion_regex_final, mapear_unicos
+from sketch_cuantiles import SketchKLL, cuantil_ponderado
 
 # ==========================================
 # 0. CARGA INICIAL
 # ==========================================
 
 ruta_fichero = "dataset/Global Data Analyst Job Market 2025.csv"
-df = pd.read_csv(ruta_fichero, sep=";")
+ruta_cache_limpieza = "dataset/.cache/limpieza_ubicacion.sqlite"
+# El CSV limpio es entregable y se escribe siempre; con "auto" se añade el
+# Feather que leen analisis_datos.py y visualizacion_datos.py (si hay pyarrow)
+formato_salida = "auto"       # "auto" | "feather" | "csv"
+nombre_salida = "dataset/Global Data Analyst Job Market_Clean.csv"
+# Con un número de filas, la limpieza recorre el dataset por lotes
+# (limpiar_por_lotes) en vez de cargarlo entero; None = todo en memoria
+filas_lote = None
 
-print(f"Dimensiones Originales: {df.shape}")
+# Parámetros de la limpieza (forman parte de la clave de caché del runner)
+min_desc_longitud = 20        # descripciones más cortas se consideran basura
+factor_iqr = 1.5              # límite superior del capping: Q3 + factor_iqr * IQR
+# Cuartiles del capping: None = exactos; un error de rango (p. ej. 0.01 = 1%)
+# los estima con un sketch KLL persistido en ``ruta_sketch`` que se actualiza
+# solo con las filas nuevas de cada ejecución (ver cuartiles_sketch)
+error_cuantiles = None
+ruta_sketch = "dataset/.cache/sketch_desc_longitud.json"
 
-# ==========================================
-# 3.1. GESTIÓN DE CEROS Y NULOS
-# ==========================================
 
-print("\n--- 3.1 Análisis de Nulos ---")
-cols_criticas = ['salario_medio_ppp_2024', 'indice_coste_vida_2024']
-df_clean = df.dropna(subset=cols_criticas).copy()
+def parametros() -> dict:
+    return {"min_desc_longitud": min_desc_longitud, "factor_iqr": factor_iqr,
+            "error_cuantiles": error_cuantiles, "formato_salida": formato_salida}
 
-df_clean['titulo'] = df_clean['titulo'].fillna('Sin Título')
-df_clean['empresa'] = df_clean['empresa'].fillna('Empresa Confidencial')
-df_clean = df_clean[df_clean['indice_coste_vida_2024'] > 0]
 
-# ==========================================
-# 3.2. GESTIÓN DE TIPOS DE DATOS
-# ==========================================
+def filtrar_filas(df: pd.DataFrame) -> tuple[pd.DataFrame, int]:
+    """Nulos, tipos y filtro de calidad (3.1-3.3, paso 1) fila a fila.
 
-print("\n--- 3.2 Conversión de Tipos ---")
-cols_categoricas = ['pais', 'modalidad']
-for col in cols_categoricas:
-    df_clean[col] = df_clean[col].astype('category')
+    Los filtros se combinan en una sola máscara y las filas se seleccionan una
+    vez (``seleccionar_filas``): es la única copia del DataFrame en toda la
+    limpieza. Devuelve las filas que se conservan y cuántas quitó el filtro
+    de calidad.
+    """
+    # --- 3.1 GESTIÓN DE CEROS Y NULOS ---
+    cols_criticas = ['salario_medio_ppp_2024', 'indice_coste_vida_2024']
+    validas = df[cols_criticas].notna().all(axis=1) & (df['indice_coste_vida_2024'] > 0)
 
-df_clean['empresa'] = df_clean['empresa'].astype(str)
-df_clean['es_teletrabajo'] = df_clean['es_teletrabajo'].astype(bool)
+    # --- 3.3 PASO 1: FILTRO DE CALIDAD (MÍNIMO 20 CARACTERES) ---
+    # CAMBIO CLAVE: Bajamos a 20 .
+    # Solo borramos la basura real (0, 8 chars, etc.)
+    calidad = df['desc_longitud'] >= min_desc_longitud
+    borrados = int((validas & ~calidad).sum())
+    df_clean = seleccionar_filas(df, validas & calidad)
 
-# ==========================================
-# 3.3. GESTIÓN DE OUTLIERS 
-# ==========================================
+    # Textos por defecto (solo reemplazan columnas; las filas ya están elegidas)
+    df_clean['titulo'] = df_clean['titulo'].fillna('Sin Título')
+    df_clean['empresa'] = df_clean['empresa'].fillna('Empresa Confidencial')
 
-print("\n--- 3.3 Gestión de Outliers ---")
+    # --- 3.2 GESTIÓN DE TIPOS DE DATOS ---
+    # Categóricas y booleanos vienen ya tipados desde carga_datos.ESQUEMA_MERCADO.
+    # Los textos llegan como str (respaldados por Arrow con pandas 3 + pyarrow):
+    # solo se convierte si la columna quedó como object con valores mezclados
+    if df_clean['empresa'].dtype == object:
+        df_clean['empresa'] = df_clean['empresa'].astype(str)
+    return df_clean, borrados
 
-# --- PASO 1: FILTRO DE CALIDAD (MÍNIMO 20 CARACTERES) ---
-# CAMBIO CLAVE: Bajamos a 20 .
-# Solo borramos la basura real (0, 8 chars, etc.)
-filtro_calidad = df_clean['desc_longitud'] >= 20
-borrados = (~filtro_calidad).sum()
-df_clean = df_clean[filtro_calidad]
 
-print(f"   -> Se han eliminado {borrados} filas por descripción nula o error (<20 chars).")
-print(f"   -> Mínimo actual: {df_clean['desc_longitud'].min()} (Debe ser >= 20)")
+def limite_iqr(Q1: float, Q3: float) -> float:
+    """Límite superior del capping: Q3 + factor_iqr * IQR."""
+    IQR = Q3 - Q1
+    return Q3 + factor_iqr * IQR
 
-# --- PASO 2: CAPPING ESTADÍSTICO (IQR) ---
-# Calculamos cuartiles sobre los datos limpios
-Q1 = df_clean['desc_longitud'].quantile(0.25)
-Q3 = df_clean['desc_longitud'].quantile(0.75)
-IQR = Q3 - Q1
-upper_bound = Q3 + 1.5 * IQR
 
-# Aplicamos Capping solo superior
-df_clean['desc_longitud'] = np.where(
-    df_clean['desc_longitud'] > upper_bound, 
-    upper_bound, 
-    df_clean['desc_longitud']
-)
+def cuantil_de_frecuencias(frecuencias: pd.Series, q: float) -> float:
+    """Cuantil ``q`` de los datos resumidos en ``frecuencias`` (valor -> apariciones).
 
-print(f"   -> Winsorization Superior aplicada. Límite: {upper_bound:.2f}")
+    Interpola como ``Series.quantile`` (lineal, NaN si no hay datos): es el
+    mismo valor que sobre los datos enteros, pero ocupa un valor por longitud
+    distinta en vez de uno por fila.
+    """
+    frecuencias = frecuencias[frecuencias > 0]
+    return cuantil_ponderado(frecuencias.index.to_numpy(dtype="float64"), frecuencias.to_numpy(), q)
 
-# ==========================================
-# 3.4. LIMPIEZA DE TEXTO (CORREGIDA)
-# ==========================================
 
-print("\n--- 3.4 Normalización de Texto ---")
-
-df_clean['titulo'] = df_clean['titulo'].str.strip().str.title()
-
-def limpiar_ubicacion_regex_final(texto):
-    if pd.isna(texto): return "Desconocido"
-    texto = str(texto)
-    
-    if ',' in texto: texto = texto.split(',')[0]
-    
-    patron_ruido = r'(?i)\b(teletrabajo|trabajo|híbrido|hybrid|remote|homeoffice|work| in | en | at |España|Spain|Deutschland|Germany|United States|USA|UK|France|Francia)\b'
-    texto_limpio = re.sub(patron_ruido, ' ', texto)
-    
-    texto_limpio = re.sub(r'\b\d{4,5}\b', '', texto_limpio)
-    texto_limpio = re.sub(r'\s+', ' ', texto_limpio).strip().title()
-    
-    if len(texto_limpio) < 2: return "Desconocido"
-    
-    return texto_limpio
-
-df_clean['ciudad_limpia'] = df_clean['ubicacion_raw'].apply(limpiar_ubicacion_regex_final)
-
-# Recálculo variable objetivo
-df_clean['salario_real_ajustado'] = (
-    df_clean['salario_medio_ppp_2024'] / (df_clean['indice_coste_vida_2024'] / 100)
-).round(2)
+def _hash_filas(df: pd.DataFrame) -> bytes:
+    """Huella por fila de la identidad (url) y del valor (desc_longitud) de cada oferta."""
+    columnas = [c for c in ('url', 'desc_longitud') if c in df.columns]
+    return pd.util.hash_pandas_object(df[columnas].astype(str), index=False).to_numpy().tobytes()
 
-# ==========================================
-# GUARDADO FINAL
-# ==========================================
 
-nombre_salida = "dataset/Global Data Analyst Job Market_Clean.csv"
-df_clean.to_csv(nombre_salida, index=False, sep=";", encoding="utf-8-sig")
+def cuartiles_sketch(leer_lotes) -> tuple[float, float, int, int]:
+    """Q1 y Q3 de ``desc_longitud`` tras ``filtrar_filas``, con el sketch de ``ruta_sketch``.
+
+    ``leer_lotes()`` devuelve un iterable nuevo de lotes del dataset integrado.
+    Las ofertas solo se añaden al final del histórico (modo incremental del
+    scraper), así que el sketch guardado resume las primeras ``filas`` filas:
+    esas solo se comprueban por su huella y únicamente las nuevas se filtran y
+    se añaden. Si el histórico cambió (la huella no coincide) o cambió la
+    configuración, el sketch se reconstruye con una segunda lectura.
+
+    Devuelve (Q1, Q3, filas de entrada, filas quitadas por el filtro de calidad).
+    """
+    configuracion = {"error_cuantiles": error_cuantiles, "min_desc_longitud": min_desc_longitud}
+    guardado = SketchKLL.cargar(ruta_sketch)
+    if guardado is not None and guardado[1].get("configuracion") == configuracion:
+        sketch, estado = guardado
+    else:
+        sketch, estado = None, {"filas": 0, "borrados": 0, "huella": None}
+
+    nuevo = SketchKLL.para_error(error_cuantiles)
+    huella = hashlib.sha1()
+    huella_previa = hashlib.sha1().hexdigest() if estado["filas"] == 0 else None
+    filas, borrados = 0, 0
+    for lote in leer_lotes():
+        # Filas ya resumidas en el sketch guardado: solo se comprueban
+        corte = min(max(estado["filas"] - filas, 0), len(lote))
+        huella.update(_hash_filas(lote.iloc[:corte]))
+        filas += corte
+        if filas == estado["filas"] and huella_previa is None:
+            huella_previa = huella.hexdigest()
+        if corte < len(lote):
+            nuevas, borrados_lote = filtrar_filas(lote.iloc[corte:])
+            borrados += borrados_lote
+            nuevo.actualizar(nuevas['desc_longitud'])
+            huella.update(_hash_filas(lote.iloc[corte:]))
+            filas += len(lote) - corte
+
+    if sketch is not None and huella_previa == estado["huella"]:
+        print(f"   -> Sketch de cuantiles: {estado['filas']} filas del histórico, "
+              f"{filas - estado['filas']} nuevas")
+        sketch.fusionar(nuevo)
+        borrados += estado["borrados"]
+    elif estado["filas"] == 0:
+        sketch = nuevo
+    else:
+        print("   -> Sketch de cuantiles: el histórico cambió, se reconstruye")
+        estado = {"filas": 0, "borrados": 0, "huella": None}
+        sketch, borrados = SketchKLL.para_error(error_cuantiles), 0
+        for lote in leer_lotes():
+            lote, borrados_lote = filtrar_filas(lote)
+            borrados += borrados_lote
+            sketch.actualizar(lote['desc_longitud'])
+
+    sketch.guardar(ruta_sketch, configuracion=configuracion, filas=filas, borrados=borrados,
+                   huella=huella.hexdigest())
+    print(f"   -> Cuartiles aproximados (KLL, error de rango ±{sketch.error:.2%}, "
+          f"{sketch.retenidos} de {sketch.n} valores retenidos)")
+    return sketch.cuantil(0.25), sketch.cuantil(0.75), filas, borrados
+
+
+def recortar(df: pd.DataFrame, upper_bound: float) -> pd.DataFrame:
+    """Capping solo superior de ``desc_longitud`` (3.3, paso 2)."""
+    # Los NaN (y un límite NaN, sin datos) se quedan como están
+    df['desc_longitud'] = df['desc_longitud'].clip(upper=upper_bound)
+    return df
+
+
+def normalizar_texto(df: pd.DataFrame, cache=None) -> pd.DataFrame:
+    """Título y ciudad normalizados (3.4)."""
+    df['titulo'] = df['titulo'].str.strip().str.title()
+
+    # Cada ubicación distinta se limpia una sola vez, y las ya vistas en otras
+    # ejecuciones se leen de la caché en disco (limpieza_ubicacion.py)
+    df['ciudad_limpia'] = mapear_unicos(df['ubicacion_raw'], limpiar_ubicacion_regex_final, cache)
+    return df
+
+
+def limpiar(df: pd.DataFrame | None = None, formato: str = formato_salida,
+            guardar: bool = True) -> pd.DataFrame:
+    """Limpia el dataset integrado y lo devuelve.
+
+    Sin ``df`` lo lee de ``ruta_fichero``; el runner (pipeline.py) le pasa en
+    su lugar el DataFrame de ``integrar``. Con ``guardar`` escribe además el
+    CSV limpio (y el Feather según ``formato``) en ``nombre_salida``.
+    """
+    # Tipos ya declarados en la carga: pais/modalidad categóricas y es_teletrabajo bool.
+    # Si integracion_datos.py dejó un Feather vigente se lee ese en vez del CSV
+    if df is None:
+        df = cargar_mercado(ruta_fichero, "limpieza")
+    else:
+        df = proyectar(df, "limpieza")
+
+    print(f"Dimensiones Originales: {df.shape}")
+
+    # ==========================================
+    # 3.1 - 3.3 (PASO 1). NULOS, TIPOS Y FILTRO DE CALIDAD
+    # ==========================================
+
+    print("\n--- 3.1-3.3 Nulos, Tipos y Gestión de Outliers ---")
+    df_clean, borrados = filtrar_filas(df)
+
+    print(f"   -> Se han eliminado {borrados} filas por descripción nula o error (<{min_desc_longitud} chars).")
+    print(f"   -> Mínimo actual: {df_clean['desc_longitud'].min()} (Debe ser >= {min_desc_longitud})")
+
+    # --- PASO 2: CAPPING ESTADÍSTICO (IQR) ---
+    # Calculamos cuartiles sobre los datos limpios
+    if error_cuantiles:
+        Q1, Q3, _, _ = cuartiles_sketch(lambda: [df])
+    else:
+        Q1 = df_clean['desc_longitud'].quantile(0.25)
+        Q3 = df_clean['desc_longitud'].quantile(0.75)
+    upper_bound = limite_iqr(Q1, Q3)
+
+    # Aplicamos Capping solo superior
+    recortar(df_clean, upper_bound)
+
+    print(f"   -> Winsorization Superior aplicada. Límite: {upper_bound:.2f}")
+
+    # ==========================================
+    # 3.4. LIMPIEZA DE TEXTO (CORREGIDA)
+    # ==========================================
+
+    print("\n--- 3.4 Normalización de Texto ---")
+
+    cache = abrir_cache(ruta_cache_limpieza)
+    normalizar_texto(df_clean, cache)
+    if cache:
+        print(f"   -> Caché de limpieza: {cache.resumen()}")
+        cache.cerrar()
+
+    # salario_real_ajustado llega ya calculado por país desde la integración
+    # (integracion_datos.tabla_macro) y los filtros solo quitan filas
+
+    # ==========================================
+    # GUARDADO FINAL
+    # ==========================================
+
+    if guardar:
+        guardar_etapa(df_clean, nombre_salida, formato, entregable=True)
+        print(f"\n[OK] Dataset limpio guardado en: {nombre_salida}")
+    print(f"Filas finales: {len(df_clean)}")
+    return df_clean
+
+
+def limpiar_por_lotes(formato: str = formato_salida, filas_lote: int = FILAS_LOTE) -> None:
+    """``limpiar`` sin cargar el dataset entero: dos pasadas por lotes sobre ``ruta_fichero``.
+
+    Los límites del capping dependen de todas las filas, así que:
+
+    1. Primera pasada: ``filtrar_filas`` y frecuencias de ``desc_longitud``
+       (un contador por longitud distinta), de las que salen Q1 y Q3 exactos;
+       con ``error_cuantiles``, el sketch de ``cuartiles_sketch``.
+    2. Segunda pasada: filtro, capping con ese límite, normalización de texto
+       y escritura de cada lote en ``nombre_salida``.
+
+    En memoria solo hay un lote y las frecuencias. La salida es la misma que
+    la de ``limpiar``; no se devuelve DataFrame.
+    """
+    print(f"Limpieza por lotes de {filas_lote} filas: {ruta_fichero}")
+
+    # ==========================================
+    # PRIMERA PASADA: ESTADÍSTICOS GLOBALES
+    # ==========================================
+
+    print("\n--- 3.3 Gestión de Outliers (primera pasada) ---")
+    if error_cuantiles:
+        Q1, Q3, filas_entrada, borrados = cuartiles_sketch(
+            lambda: cargar_mercado_por_lotes(ruta_fichero, "limpieza", filas_lote))
+    else:
+        filas_entrada, borrados = 0, 0
+        frecuencias = pd.Series(dtype="int64")
+        for lote in cargar_mercado_por_lotes(ruta_fichero, "limpieza", filas_lote):
+            filas_entrada += len(lote)
+            lote, borrados_lote = filtrar_filas(lote)
+            borrados += borrados_lote
+            frecuencias = frecuencias.add(lote['desc_longitud'].value_counts(), fill_value=0)
+        Q1 = cuantil_de_frecuencias(frecuencias, 0.25)
+        Q3 = cuantil_de_frecuencias(frecuencias, 0.75)
+
+    print(f"Filas originales: {filas_entrada}")
+    print(f"   -> Se han eliminado {borrados} filas por descripción nula o error (<{min_desc_longitud} chars).")
+    upper_bound = limite_iqr(Q1, Q3)
+    print(f"   -> Winsorization Superior. Límite: {upper_bound:.2f}")
+
+    # ==========================================
+    # SEGUNDA PASADA: CAPPING, TEXTO Y GUARDADO
+    # ==========================================
+
+    print("\n--- 3.4 Normalización de Texto (segunda pasada) ---")
+    cache = abrir_cache(ruta_cache_limpieza)
+    try:
+        with EscritorEtapa(nombre_salida, formato, entregable=True) as escritor:
+            for lote in cargar_mercado_por_lotes(ruta_fichero, "limpieza", filas_lote):
+                lote, _ = filtrar_filas(lote)
+                escritor.escribir(normalizar_texto(recortar(lote, upper_bound), cache))
+    finally:
+        if cache:
+            print(f"   -> Caché de limpieza: {cache.resumen()}")
+            cache.cerrar()
+
+    print(f"\n[OK] Dataset limpio guardado en: {nombre_salida}")
+    print(f"Filas finales: {escritor.filas}")
+
 
-print(f"\n[OK] Dataset limpio guardado en: {nombre_salida}")
-print(f"Filas finales: {len(df_clean)}")
\ No newline at end of file
+if __name__ == "__main__":
+    if filas_lote:
+        limpiar_por_lotes(filas_lote=filas_lote)
+    else:
+        limpiar()
@@ -0,0 +1,171 @@
+import os
+import shutil
+import threading
+import time
+
+import pandas as pd
+
+from checkpoint_crawl import anadir_ids_indice, id_de_url
+
+# ==========================================
+# ESCRITURA EN STREAMING DE OFERTAS
+# ==========================================
+# Las ofertas ya no se acumulan en memoria hasta el final del crawl: los workers
+# las entregan a un EscritorOfertas, que deduplica por ``data-jk`` y vuelca
+# lotes de ``tamano_lote`` filas a uno o varios sinks. La memoria queda acotada
+# al lote y lo ya volcado es visible en disco mientras el crawl sigue:
+#
+#   SinkCSV      -> CSV (append). En un crawl completo se escribe en
+#                   ``*.parcial.csv`` y se renombra al cerrar.
+#   SinkParquet  -> directorio de ficheros Parquet, uno por lote (legible con
+#                   pd.read_parquet(directorio) en cualquier momento).
+#   SinkIndiceIds-> añade los ids volcados al índice del modo incremental.
+#   SinkMemoria  -> lista en memoria (pruebas y uso desde otros scripts).
+
+COLUMNAS_OFERTAS = [
+    "titulo", "empresa", "pais", "ubicacion_raw", "modalidad", "desc_longitud", "url",
+    "consulta", "consulta_ubicacion",   # búsqueda del plan que encontró la oferta
+]
+
+
+class SinkCSV:
+    """Añade cada lote a un CSV con la misma codificación que el scraper original."""
+
+    def __init__(self, ruta: str, incremental: bool = False):
+        self.ruta_final = ruta
+        if incremental:
+            self.ruta = ruta
+            self.cabecera = not os.path.exists(ruta)
+            if not self.cabecera:
+                self._migrar_columnas()
+        else:
+            raiz, extension = os.path.splitext(ruta)
+            self.ruta = f"{raiz}.parcial{extension}"
+            self.cabecera = True
+            if os.path.exists(self.ruta):
+                os.remove(self.ruta)
+
+    def _migrar_columnas(self) -> None:
+        # Un CSV de una versión anterior (sin las columnas de consulta) se
+        # reescribe una vez con el esquema actual antes de añadirle filas
+        cabecera = pd.read_csv(self.ruta, nrows=0, encoding="utf-8-sig").columns.tolist()
+        if cabecera != COLUMNAS_OFERTAS:
+            df = pd.read_csv(self.ruta, encoding="utf-8-sig").reindex(columns=COLUMNAS_OFERTAS)
+            temporal = f"{self.ruta}.tmp"
+            df.to_csv(temporal, index=False, encoding="utf-8-sig")
+            os.replace(temporal, self.ruta)
+
+    def escribir(self, df: pd.DataFrame) -> None:
+        df.to_csv(self.ruta, mode="a", header=self.cabecera, index=False, encoding="utf-8-sig")
+        self.cabecera = False
+
+    def cerrar(self) -> None:
+        if self.ruta != self.ruta_final and os.path.exists(self.ruta):
+            os.replace(self.ruta, self.ruta_final)
+
+
+class SinkParquet:
+    """Un fichero Parquet por lote dentro de un directorio (dataset particionado)."""
+
+    def __init__(self, ruta_dir: str, incremental: bool = False):
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError as error:
+            raise RuntimeError("El formato Parquet necesita pyarrow ('pip install pyarrow').") from error
+
+        self.ruta_final = ruta_dir
+        self.ruta = ruta_dir if incremental else f"{ruta_dir}.parcial"
+        if not incremental:
+            shutil.rmtree(self.ruta, ignore_errors=True)
+        os.makedirs(self.ruta, exist_ok=True)
+        self.prefijo = time.strftime("%Y%m%d-%H%M%S")
+        self.partes = 0
+
+    def escribir(self, df: pd.DataFrame) -> None:
+        nombre = f"part-{self.prefijo}-{self.partes:05d}.parquet"
+        temporal = os.path.join(self.ruta, f".{nombre}.tmp")
+        df.to_parquet(temporal, index=False)
+        # Renombrado atómico: un lector nunca ve un fichero a medio escribir
+        os.replace(temporal, os.path.join(self.ruta, nombre))
+        self.partes += 1
+
+    def cerrar(self) -> None:
+        if self.ruta != self.ruta_final:
+            shutil.rmtree(self.ruta_final, ignore_errors=True)
+            os.replace(self.ruta, self.ruta_final)
+
+
+class SinkIndiceIds:
+    """Mantiene al día el índice compacto de ids (debe ir después del CSV)."""
+
+    def __init__(self, ruta_indice: str):
+        self.ruta_indice = ruta_indice
+
+    def escribir(self, df: pd.DataFrame) -> None:
+        anadir_ids_indice(self.ruta_indice, [id_de_url(url) for url in df["url"]])
+
+    def cerrar(self) -> None:
+        pass
+
+
+class SinkMemoria:
+    """Acumula las filas en una lista (pruebas y uso desde otros scripts)."""
+
+    def __init__(self):
+        self.filas = []
+
+    def escribir(self, df: pd.DataFrame) -> None:
+        self.filas.extend(df.to_dict("records"))
+
+    def cerrar(self) -> None:
+        pass
+
+
+class EscritorOfertas:
+    """Punto de entrega común de los workers: deduplica y vuelca por lotes."""
+
+    def __init__(self, sinks: list, tamano_lote: int = 500):
+        self.sinks = sinks
+        self.tamano_lote = tamano_lote
+        self.total = 0
+        self._buffer = []
+        self._ids = set()
+        self._lock = threading.Lock()
+
+    def anadir(self, ofertas: dict) -> int:
+        """Recibe ``data-jk -> oferta``; devuelve cuántas eran nuevas."""
+        with self._lock:
+            nuevas = 0
+            for job_id, oferta in ofertas.items():
+                if job_id in self._ids:
+                    continue
+                self._ids.add(job_id)
+                self._buffer.append(oferta)
+                nuevas += 1
+            if len(self._buffer) >= self.tamano_lote:
+                self._volcar()
+            return nuevas
+
+    @property
+    def pendientes(self) -> int:
+        """Filas aceptadas que aún no se han volcado a los sinks."""
+        return len(self._buffer)
+
+    def volcar(self) -> None:
+        with self._lock:
+            self._volcar()
+
+    def _volcar(self) -> None:
+        if not self._buffer:
+            return
+        df = pd.DataFrame(self._buffer, columns=COLUMNAS_OFERTAS)
+        for sink in self.sinks:
+            sink.escribir(df)
+        self.total += len(df)
+        self._buffer = []
+
+    def cerrar(self) -> None:
+        with self._lock:
+            self._volcar()
+            for sink in self.sinks:
+                sink.cerrar()
@@ -0,0 +1,180 @@
+import html as html_lib
+import re
+import threading
+from dataclasses import dataclass
+
+import certifi
+import urllib3
+
+from pool_navegadores import PoolNavegadores
+
+# ==========================================
+# BACKENDS DE DESCARGA DE PÁGINAS
+# ==========================================
+# Todos devuelven el HTML en bruto de la página de resultados, de modo que el
+# mismo parser (parser_indeed.py) sirve para cualquiera de ellos:
+#
+#   FetcherHTTP       -> cliente HTTP con conexiones keep-alive por dominio
+#   FetcherNavegador  -> Selenium/uc a través de PoolNavegadores
+#   FetcherEscalado   -> HTTP por defecto; pasa al navegador cuando la
+#                        respuesta es un challenge (y se queda en él para ese
+#                        dominio durante el resto de la ejecución)
+#
+# La espera ante un challenge (``esperar_challenge``, que frena el dominio) se
+# hace solo aquí, una vez por descarga: el scraper no vuelve a esperar, solo
+# reintenta la página si el challenge sigue.
+
+USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/124.0 Safari/537.36"
+)
+# Solo huellas propias de la página de challenge (el script
+# /cdn-cgi/challenge-platform/ también se inyecta en páginas normales)
+MARCAS_CHALLENGE = ("_cf_chl_opt", "cf-chl-widget")
+TITULOS_CHALLENGE = ("challenge", "just a moment")
+
+_patron_titulo = re.compile(r"<title[^>]*>(.*?)</title>", re.IGNORECASE | re.DOTALL)
+
+
+@dataclass
+class Pagina:
+    """Resultado de descargar una URL con cualquiera de los backends."""
+
+    url: str
+    html: str
+    titulo: str
+    estado: int
+    backend: str
+
+    @property
+    def challenge(self) -> bool:
+        # Misma comprobación que hacía el scraper sobre driver.title, más las
+        # huellas de Cloudflare que solo se ven en el HTML sin renderizar
+        if any(t in self.titulo.lower() for t in TITULOS_CHALLENGE):
+            return True
+        if self.estado in (403, 429, 503):
+            return True
+        return any(marca in self.html for marca in MARCAS_CHALLENGE)
+
+
+def titulo_de(html: str) -> str:
+    coincidencia = _patron_titulo.search(html)
+    return html_lib.unescape(coincidencia.group(1)).strip() if coincidencia else ""
+
+
+class FetcherHTTP:
+    """Cliente HTTP ligero: un pool de conexiones keep-alive por dominio."""
+
+    nombre = "http"
+
+    def __init__(self, conexiones_por_dominio: int = 4, timeout: float = 30.0):
+        self.http = urllib3.PoolManager(
+            num_pools=16,
+            maxsize=conexiones_por_dominio,
+            block=True,
+            cert_reqs="CERT_REQUIRED",
+            ca_certs=certifi.where(),
+            headers={
+                **urllib3.make_headers(accept_encoding=True, user_agent=USER_AGENT),
+                "Accept": "text/html,application/xhtml+xml",
+                "Accept-Language": "es-ES,es;q=0.9,en;q=0.8,de;q=0.7",
+            },
+            timeout=urllib3.Timeout(connect=10.0, read=timeout),
+            retries=urllib3.Retry(total=2, backoff_factor=1.0, status_forcelist=(502, 504)),
+        )
+
+    def obtener(self, url: str, esperar_challenge=None) -> Pagina:
+        respuesta = self.http.request("GET", url)
+        charset = "utf-8"
+        tipo = respuesta.headers.get("Content-Type", "")
+        if "charset=" in tipo:
+            charset = tipo.split("charset=")[-1].split(";")[0].strip()
+        html = respuesta.data.decode(charset, errors="replace")
+        pagina = Pagina(url, html, titulo_de(html), respuesta.status, self.nombre)
+        if pagina.challenge and esperar_challenge:
+            esperar_challenge()
+        return pagina
+
+    def cerrar(self) -> None:
+        self.http.clear()
+
+
+class FetcherNavegador:
+    """Descarga con un navegador real tomando prestada una sesión del pool."""
+
+    nombre = "navegador"
+
+    def __init__(self, navegadores: PoolNavegadores):
+        self.navegadores = navegadores
+
+    def obtener(self, url: str, esperar_challenge=None) -> Pagina:
+        from selenium.webdriver.common.by import By
+
+        with self.navegadores.sesion() as sesion:
+            driver = sesion.driver
+            driver.get(url)
+
+            # Cerrar Pop-ups
+            try:
+                close_btn = driver.find_element(By.CSS_SELECTOR, "button[aria-label='cerrar'], button[aria-label='close'], div[aria-label='Cerrar']")
+                close_btn.click()
+            except:
+                pass
+
+            # En el navegador el challenge suele resolverse solo si se le da tiempo
+            pagina = Pagina(url, driver.page_source, driver.title, 200, self.nombre)
+            if pagina.challenge and esperar_challenge:
+                esperar_challenge()
+                pagina = Pagina(url, driver.page_source, driver.title, 200, self.nombre)
+            sesion.pagina_servida()
+        return pagina
+
+    def cerrar(self) -> None:
+        self.navegadores.cerrar()
+
+
+class FetcherEscalado:
+    """HTTP primero; navegador solo para los dominios que devuelven challenge."""
+
+    nombre = "auto"
+
+    def __init__(self, http: FetcherHTTP, navegador: FetcherNavegador):
+        self.http = http
+        self.navegador = navegador
+        self._escalados = set()
+        self._lock = threading.Lock()
+
+    def obtener(self, url: str, esperar_challenge=None) -> Pagina:
+        # La clave es la base del país (todo lo anterior a /jobs): con dominios
+        # reales equivale al host y con --base-local separa cada país
+        dominio = url.split("/jobs")[0]
+        with self._lock:
+            escalado = dominio in self._escalados
+
+        if not escalado:
+            # Sin esperar: ante un challenge el remedio es el navegador, que sí espera
+            pagina = self.http.obtener(url)
+            if not pagina.challenge:
+                return pagina
+            with self._lock:
+                self._escalados.add(dominio)
+            print(f"   🧭 [{dominio}] Challenge por HTTP ({pagina.estado}): se pasa al navegador")
+
+        return self.navegador.obtener(url, esperar_challenge)
+
+    def cerrar(self) -> None:
+        self.http.cerrar()
+        self.navegador.cerrar()
+
+
+def crear_fetcher(backend: str, navegadores: PoolNavegadores | None = None):
+    """Construye el backend pedido: ``auto`` (por defecto), ``http`` o ``navegador``."""
+    if backend == "http":
+        return FetcherHTTP()
+    if navegadores is None:
+        raise ValueError(f"El backend '{backend}' necesita un PoolNavegadores")
+    if backend == "navegador":
+        return FetcherNavegador(navegadores)
+    if backend == "auto":
+        return FetcherEscalado(FetcherHTTP(), FetcherNavegador(navegadores))
+    raise ValueError(f"Backend desconocido: {backend}")
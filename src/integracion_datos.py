@@ -1,193 +1,311 @@
 import pandas as pd
+import numpy as np
 import os
-import re
 import io
 
+from cache_normalizacion import abrir_cache
+from carga_datos import (FILAS_LOTE, EscritorEtapa, cargar_indeed, cargar_indeed_por_lotes,
+                         guardar_etapa)
+from limpieza_ubicacion import detectar_remoto, limpiar_ciudad, mapear_unicos
+
 # ==========================================
 # 1. CONFIGURACIÓN DE RUTAS
 # ==========================================
 ruta_actual = os.path.dirname(os.path.abspath(__file__))
 # Ajusta '..' si tu script está dentro de una subcarpeta src/
-ruta_proyecto = os.path.dirname(ruta_actual) 
+ruta_proyecto = os.path.dirname(ruta_actual)
 ruta_dataset = os.path.join(ruta_proyecto, "dataset")
 
 # Fallback de seguridad
 if not os.path.isdir(ruta_dataset):
     ruta_dataset = "dataset" if os.path.isdir("dataset") else "."
 
-print(f"[INFO] Trabajando en: {ruta_dataset}")
+# Caché en disco de la limpieza de ubicaciones (compartida con data_cleaning.py)
+ruta_cache_limpieza = os.path.join(ruta_dataset, ".cache", "limpieza_ubicacion.sqlite")
+max_entradas_cache = 200_000
+
+# Hand-off a data_cleaning.py (carga_datos.guardar_etapa): el CSV integrado
+# (versionado en el repo) se escribe siempre y "auto" añade el intermedio
+# columnar Feather si hay pyarrow, que es el que lee la limpieza.
+formato_salida = "auto"       # "auto" | "feather" | "csv"
+# Con un número de filas, la integración lee y escribe las ofertas por lotes
+# (integrar_por_lotes) en vez de cargarlas enteras; None = todo en memoria
+filas_lote = None
+
+nombre_archivo = "Global Data Analyst Job Market 2025.csv"
+ruta_salida = os.path.join(ruta_dataset, nombre_archivo)
+
+# Lista definitiva de columnas
+cols_finales_ordenadas = [
+    'titulo',
+    'empresa',
+    'pais',
+    'ciudad_limpia',
+    'ubicacion_raw',
+    'salario_medio_ppp_2024',
+    'indice_coste_vida_2024',
+    'indice_alquiler_2024',
+    'salario_real_ajustado',
+    'modalidad',
+    'es_teletrabajo',
+    'desc_longitud',
+    'url'
+]
+
+
+def parametros() -> dict:
+    """Configuración que cambia la salida de ``integrar``.
+
+    ``filas_lote`` no está: integrar_por_lotes da la misma salida.
+    """
+    return {"formato_salida": formato_salida, "columnas": cols_finales_ordenadas}
+
+
+def ruta_indeed() -> str:
+    return os.path.join(ruta_dataset, "indeed_global_final.csv")
+
+
+def ruta_oecd() -> str | None:
+    """Primer CSV del directorio con "OECD" en el nombre (o None)."""
+    archivos = [f for f in os.listdir(ruta_dataset) if "OECD" in f and f.endswith(".csv")]
+    return os.path.join(ruta_dataset, archivos[0]) if archivos else None
+
+
+def ruta_numbeo() -> str:
+    return os.path.join(ruta_dataset, "datos_numbeo_manual.csv")
+
+
+def ficheros_entrada() -> list[str]:
+    """Ficheros que lee ``integrar`` (el runner hashea su contenido)."""
+    return [r for r in (ruta_indeed(), ruta_oecd(), ruta_numbeo()) if r]
+
 
 # ==========================================
 # 2. CARGA DE OFERTAS (INDEED)
 # ==========================================
-print("[INFO] Cargando Indeed...")
-ruta_indeed = os.path.join(ruta_dataset, "indeed_global_final.csv")
-
-try:
-    df_indeed = pd.read_csv(
-        ruta_indeed, 
-        sep=',', 
-        quotechar='"', 
-        engine='python', 
-        on_bad_lines='warn'
-    )
-    
-    # 1. Selección de columnas de interés (INCLUYENDO desc_longitud y ubicacion_raw)
-    cols_indeed_deseadas = [
-        'titulo', 'empresa', 'pais', 'ubicacion_raw', 
-        'modalidad', 'desc_longitud', 'url'
-    ]
-    
-    # Filtrar solo las columnas que realmente existen en el CSV
-    cols_existentes = [c for c in cols_indeed_deseadas if c in df_indeed.columns]
-    df_indeed = df_indeed[cols_existentes]
-    
-    # Limpieza básica de espacios en país
-    if 'pais' in df_indeed.columns:
-        df_indeed['pais'] = df_indeed['pais'].str.strip()
-        
-    print(f"[OK] Indeed cargado: {len(df_indeed)} filas.")
-
-except Exception as e:
-    print(f"[ERROR] Fallo crítico cargando Indeed: {e}")
-    exit()
+
+def cargar_ofertas() -> pd.DataFrame:
+    print("[INFO] Cargando Indeed...")
+    try:
+        # Lectura tipada y proyectada a las columnas de interés (INCLUYENDO
+        # desc_longitud y ubicacion_raw); las que no existan en el CSV se omiten.
+        # Ver carga_datos.py
+        df_indeed = cargar_indeed(ruta_indeed())
+
+        # Limpieza básica de espacios en país
+        if 'pais' in df_indeed.columns:
+            df_indeed['pais'] = df_indeed['pais'].str.strip()
+
+        print(f"[OK] Indeed cargado: {len(df_indeed)} filas.")
+        return df_indeed
+
+    except Exception as e:
+        print(f"[ERROR] Fallo crítico cargando Indeed: {e}")
+        raise RuntimeError("Fallo crítico cargando Indeed") from e
 
 # ==========================================
 # 3. CARGA Y LIMPIEZA DE OECD (MACRO)
 # ==========================================
-print("[INFO] Procesando OECD...")
-
-try:
-    # Buscar archivo OECD automáticamente
-    archivo_oecd = [f for f in os.listdir(ruta_dataset) if "OECD" in f and f.endswith(".csv")][0]
-    df_oecd = pd.read_csv(os.path.join(ruta_dataset, archivo_oecd))
-    
-    # Mapa de códigos de país
-    mapa_paises = {'ESP': 'ES', 'DEU': 'DE', 'GBR': 'UK', 'USA': 'US', 'FRA': 'FR'}
-    
-    # Detectar nombre de columna de país (suele variar entre REF_AREA y LOCATION)
-    col_pais_oecd = 'REF_AREA' if 'REF_AREA' in df_oecd.columns else 'LOCATION'
-    
-    if col_pais_oecd in df_oecd.columns:
-        df_oecd['pais'] = df_oecd[col_pais_oecd].map(mapa_paises)
-        df_oecd = df_oecd.dropna(subset=['pais']) # Eliminar países fuera del alcance
-        
-        # Detectar columna de valor numérico
-        col_valor = 'OBS_VALUE' if 'OBS_VALUE' in df_oecd.columns else 'Value'
-        
-        # Renombrar a algo legible
-        df_oecd = df_oecd.rename(columns={col_valor: 'salario_medio_ppp_2024'})
-        
-        # --- LIMPIEZA VERTICAL ---
-        # Nos quedamos SOLO con país y salario. Descartamos metadatos basura.
-        df_oecd_limpio = df_oecd[['pais', 'salario_medio_ppp_2024']].copy()
-        
-        # Agrupar por país para evitar duplicados (media de valores si hay varios años)
-        df_oecd_limpio = df_oecd_limpio.groupby('pais', as_index=False)['salario_medio_ppp_2024'].mean()
-        
-        print(f"[OK] OECD procesado. Países: {df_oecd_limpio['pais'].unique()}")
-    else:
-        print("[WARN] Columna de país no encontrada en OECD. Creando DF vacío.")
+
+def cargar_oecd() -> pd.DataFrame:
+    print("[INFO] Procesando OECD...")
+
+    try:
+        # Buscar archivo OECD automáticamente
+        df_oecd = pd.read_csv(ruta_oecd())
+
+        # Mapa de códigos de país
+        mapa_paises = {'ESP': 'ES', 'DEU': 'DE', 'GBR': 'UK', 'USA': 'US', 'FRA': 'FR'}
+
+        # Detectar nombre de columna de país (suele variar entre REF_AREA y LOCATION)
+        col_pais_oecd = 'REF_AREA' if 'REF_AREA' in df_oecd.columns else 'LOCATION'
+
+        if col_pais_oecd in df_oecd.columns:
+            df_oecd['pais'] = df_oecd[col_pais_oecd].map(mapa_paises)
+            df_oecd = df_oecd.dropna(subset=['pais']) # Eliminar países fuera del alcance
+
+            # Detectar columna de valor numérico
+            col_valor = 'OBS_VALUE' if 'OBS_VALUE' in df_oecd.columns else 'Value'
+
+            # Renombrar a algo legible
+            df_oecd = df_oecd.rename(columns={col_valor: 'salario_medio_ppp_2024'})
+
+            # --- LIMPIEZA VERTICAL ---
+            # Nos quedamos SOLO con país y salario. Descartamos metadatos basura.
+            df_oecd_limpio = df_oecd[['pais', 'salario_medio_ppp_2024']].copy()
+
+            # Agrupar por país para evitar duplicados (media de valores si hay varios años)
+            df_oecd_limpio = df_oecd_limpio.groupby('pais', as_index=False)['salario_medio_ppp_2024'].mean()
+
+            print(f"[OK] OECD procesado. Países: {df_oecd_limpio['pais'].unique()}")
+        else:
+            print("[WARN] Columna de país no encontrada en OECD. Creando DF vacío.")
+            df_oecd_limpio = pd.DataFrame(columns=['pais', 'salario_medio_ppp_2024'])
+
+    except Exception as e:
+        print(f"[WARN] Error procesando OECD ({e}). Se omitirán datos salariales.")
         df_oecd_limpio = pd.DataFrame(columns=['pais', 'salario_medio_ppp_2024'])
 
-except Exception as e:
-    print(f"[WARN] Error procesando OECD ({e}). Se omitirán datos salariales.")
-    df_oecd_limpio = pd.DataFrame(columns=['pais', 'salario_medio_ppp_2024'])
+    return df_oecd_limpio
 
 # ==========================================
 # 4. CARGA DE NUMBEO (Manual o CSV)
 # ==========================================
-ruta_numbeo = os.path.join(ruta_dataset, "datos_numbeo_manual.csv")
-if os.path.exists(ruta_numbeo):
-    with open(ruta_numbeo, "r", encoding="utf-8") as f:
-        contenido = f.read().replace('"', '') # Limpieza rápida de comillas extra
-    df_numbeo = pd.read_csv(io.StringIO(contenido), sep=";")
-else:
+
+def cargar_numbeo() -> pd.DataFrame:
+    if os.path.exists(ruta_numbeo()):
+        with open(ruta_numbeo(), "r", encoding="utf-8") as f:
+            contenido = f.read().replace('"', '') # Limpieza rápida de comillas extra
+        return pd.read_csv(io.StringIO(contenido), sep=";")
     # Datos de respaldo (Fallback)
-    df_numbeo = pd.DataFrame({
+    return pd.DataFrame({
         'pais': ['ES', 'DE', 'UK', 'US', 'FR'],
         'indice_coste_vida_2024': [48.7, 63.5, 61.3, 72.9, 68.7],
         'indice_alquiler_2024': [18.2, 22.8, 26.9, 43.1, 21.5]
     })
 
+
 # ==========================================
-# 5. FUSIÓN DE DATOS (MERGE)
+# 5. TABLA MACRO POR PAÍS
 # ==========================================
-print("[INFO] Fusionando datasets...")
+# OECD y Numbeo dan una fila por país. En vez de hacer un merge contra cada
+# oferta, se construye una tabla pequeña indexada por ``pais`` (con la variable
+# objetivo ya calculada) y sus columnas se reparten a las ofertas por el código
+# categórico de su país: una indexación por columna, sin copias del join.
 
-# Merge 1: Fuentes Económicas (OECD + Numbeo)
-df_macro = pd.merge(df_oecd_limpio, df_numbeo, on='pais', how='outer')
+def tabla_macro(df_oecd_limpio: pd.DataFrame, df_numbeo: pd.DataFrame) -> pd.DataFrame:
+    """Columnas macro por país (float64), con ``salario_real_ajustado``."""
+    # Unión de las dos fuentes (outer: un país con solo una de ellas se conserva)
+    df_macro = pd.merge(df_oecd_limpio, df_numbeo, on='pais', how='outer')
+    df_macro = df_macro.drop_duplicates('pais').set_index('pais')
+    # Se convierten (no se filtran por tipo) las columnas que llegan al dataset:
+    # el DataFrame vacío de respaldo de cargar_oecd trae el salario como object
+    # y debe llegar a las ofertas igualmente, a NaN
+    df_macro = df_macro[[c for c in df_macro.columns if c in cols_finales_ordenadas]]
+    df_macro = df_macro.apply(pd.to_numeric, errors='coerce').astype('float64')
 
-# Merge 2: Ofertas + Economía (Left Join para mantener todas las ofertas)
-df_final = pd.merge(df_indeed, df_macro, on='pais', how='left')
+    # Variable objetivo (bienestar). Fórmula: Cuánto cunde el salario considerando el coste de vida local.
+    # Si el índice es 100 (NY), el salario vale lo que es. Si es 50 (barato), el salario cunde el doble.
+    # Se calcula una vez por país y viaja con la oferta (data_cleaning.py no la recalcula).
+    if {'salario_medio_ppp_2024', 'indice_coste_vida_2024'} <= set(df_macro.columns):
+        df_macro['salario_real_ajustado'] = (
+            df_macro['salario_medio_ppp_2024'] / (df_macro['indice_coste_vida_2024'] / 100)
+        ).round(2) # Redondear a 2 decimales
+    return df_macro
 
-# ==========================================
-# 6. POST-PROCESADO Y LIMPIEZA FINAL
-# ==========================================
-# Rellenar nulos críticos
-df_final['titulo'] = df_final['titulo'].fillna('Sin Título')
-
-# Validar que exista la columna desc_longitud antes de convertirla
-if 'desc_longitud' in df_final.columns:
-    df_final['desc_longitud'] = pd.to_numeric(df_final['desc_longitud'], errors='coerce').fillna(0)
-
-# Funciones de limpieza de texto
-def limpiar_ciudad(texto):
-    if pd.isna(texto): return "Desconocido"
-    # Eliminar palabras clave comunes del scraping
-    texto = re.sub(r'(?i)(teletrabajo|trabajo híbrido|homeoffice|remote|hybrid| in |au |en )', '', str(texto))
-    texto = re.sub(r'\b\d{4,5}\b', '', texto) # Quitar códigos postales
-    if "," in texto: texto = texto.split(",")[0] # Quedarse solo con la ciudad antes de la coma
-    return texto.strip().title()
-
-def detectar_remoto(texto):
-    if pd.isna(texto): return False
-    palabras = ['teletrabajo', 'remote', 'homeoffice', 'híbrido', 'hybrid']
-    return any(p in str(texto).lower() for p in palabras)
-
-if 'ubicacion_raw' in df_final.columns:
-    df_final['es_teletrabajo'] = df_final['ubicacion_raw'].apply(detectar_remoto)
-    df_final['ciudad_limpia'] = df_final['ubicacion_raw'].apply(limpiar_ciudad)
-    # Estandarizar modalidad si se detecta remoto en el texto
-    df_final.loc[df_final['es_teletrabajo'], 'modalidad'] = 'Remoto/Híbrido'
 
-# ==========================================
-# 6.5 CÁLCULO DE VARIABLE OBJETIVO (BIENESTAR)
-# ==========================================
-# Fórmula: Cuánto cunde el salario considerando el coste de vida local.
-# Si el índice es 100 (NY), el salario vale lo que es. Si es 50 (barato), el salario cunde el doble.
-df_final['salario_real_ajustado'] = df_final['salario_medio_ppp_2024'] / (df_final['indice_coste_vida_2024'] / 100)
-df_final['salario_real_ajustado'] = df_final['salario_real_ajustado'].round(2) # Redondear a 2 decimales
+def anadir_macro(df: pd.DataFrame, df_macro: pd.DataFrame) -> pd.DataFrame:
+    """Añade a ``df`` (in situ) las columnas de ``df_macro`` según su ``pais``.
 
-# ==========================================
-# 7. EXPORTACIÓN FINAL
-# ==========================================
-# Lista definitiva de columnas
-cols_finales_ordenadas = [
-    'titulo', 
-    'empresa', 
-    'pais', 
-    'ciudad_limpia', 
-    'ubicacion_raw',          
-    'salario_medio_ppp_2024', 
-    'indice_coste_vida_2024', 
-    'indice_alquiler_2024',
-    'salario_real_ajustado',
-    'modalidad', 
-    'es_teletrabajo', 
-    'desc_longitud',          
-    'url'
-]
+    Equivale a un left join por ``pais``: las ofertas de un país sin datos
+    macro quedan a NaN.
+    """
+    codigos = pd.Categorical(df['pais'], categories=df_macro.index).codes
+    for col in df_macro.columns:
+        # Fila extra a NaN al final: el código -1 (país desconocido) cae en ella
+        valores = np.append(df_macro[col].to_numpy(), np.nan)
+        df[col] = valores[codigos]
+    return df
 
-# Selección segura (solo columnas que existan)
-cols_a_guardar = [c for c in cols_finales_ordenadas if c in df_final.columns]
-df_final = df_final[cols_a_guardar]
 
-# Guardar CSV
-nombre_archivo = "Global Data Analyst Job Market 2025.csv"
-ruta_salida = os.path.join(ruta_dataset, nombre_archivo)
-df_final.to_csv(ruta_salida, index=False, sep=";", encoding="utf-8-sig")
+def procesar_ofertas(df_indeed: pd.DataFrame, df_macro: pd.DataFrame, cache=None) -> pd.DataFrame:
+    """Fusión, post-procesado y selección de columnas de un bloque de ofertas.
+
+    No depende de otras filas: ``integrar`` lo aplica a todas las ofertas de
+    una vez e ``integrar_por_lotes`` a cada lote.
+    """
+    # ==========================================
+    # 5.1 FUSIÓN DE DATOS
+    # ==========================================
+    # Ofertas + Economía: todas las ofertas se mantienen (como un left join)
+    df_final = anadir_macro(df_indeed, df_macro)
+
+    # ==========================================
+    # 6. POST-PROCESADO Y LIMPIEZA FINAL
+    # ==========================================
+    # Rellenar nulos críticos
+    df_final['titulo'] = df_final['titulo'].fillna('Sin Título')
+
+    # Validar que exista la columna desc_longitud antes de convertirla
+    if 'desc_longitud' in df_final.columns:
+        df_final['desc_longitud'] = pd.to_numeric(df_final['desc_longitud'], errors='coerce').fillna(0)
+
+    # Limpieza de texto: funciones compartidas con data_cleaning.py, aplicadas una
+    # vez por ubicación distinta y cacheadas entre ejecuciones (ver limpieza_ubicacion.py)
+    if 'ubicacion_raw' in df_final.columns:
+        df_final['es_teletrabajo'] = mapear_unicos(df_final['ubicacion_raw'], detectar_remoto, cache)
+        df_final['ciudad_limpia'] = mapear_unicos(df_final['ubicacion_raw'], limpiar_ciudad, cache)
+        # Estandarizar modalidad si se detecta remoto en el texto
+        df_final.loc[df_final['es_teletrabajo'], 'modalidad'] = 'Remoto/Híbrido'
+
+    # ==========================================
+    # 7. SELECCIÓN FINAL
+    # ==========================================
+    # Selección segura (solo columnas que existan)
+    cols_a_guardar = [c for c in cols_finales_ordenadas if c in df_final.columns]
+    return df_final[cols_a_guardar]
+
+
+def integrar(formato: str = formato_salida, guardar: bool = True) -> pd.DataFrame:
+    """Ofertas de Indeed + macro (OECD, Numbeo) con la ubicación normalizada.
+
+    Devuelve el dataset integrado; con ``guardar`` además lo escribe en
+    ``ruta_salida`` (el CSV y, según ``formato``, el Feather; ver guardar_etapa).
+    """
+    print(f"[INFO] Trabajando en: {ruta_dataset}")
+    df_indeed = cargar_ofertas()
+    df_macro = tabla_macro(cargar_oecd(), cargar_numbeo())
+
+    print("[INFO] Fusionando datasets...")
+    cache = abrir_cache(ruta_cache_limpieza, max_entradas_cache)
+    df_final = procesar_ofertas(df_indeed, df_macro, cache)
+    if cache:
+        print(f"[INFO] Caché de limpieza: {cache.resumen()}")
+        cache.cerrar()
+
+    if guardar:
+        # CSV integrado + intermedio Feather (según formato)
+        rutas_escritas = guardar_etapa(df_final, ruta_salida, formato, entregable=True)
+        print(f"\n[OK] Dataset generado: {', '.join(os.path.basename(r) for r in rutas_escritas)}")
+    print(f"[OK] Columnas incluidas: {list(df_final.columns)}")
+    print(f"[OK] Total filas: {len(df_final)}")
+    return df_final
+
+
+def integrar_por_lotes(formato: str = formato_salida, filas_lote: int = FILAS_LOTE) -> None:
+    """``integrar`` sin cargar todas las ofertas: lee, procesa y escribe por lotes.
+
+    Cada lote pasa por ``procesar_ofertas`` y se añade a ``ruta_salida`` en
+    cuanto termina, así que en memoria solo hay un lote y la tabla macro. La
+    salida es la misma que la de ``integrar``; no se devuelve DataFrame.
+    """
+    print(f"[INFO] Trabajando en: {ruta_dataset} (por lotes de {filas_lote} filas)")
+    df_macro = tabla_macro(cargar_oecd(), cargar_numbeo())
+
+    cache = abrir_cache(ruta_cache_limpieza, max_entradas_cache)
+    try:
+        with EscritorEtapa(ruta_salida, formato, entregable=True) as escritor:
+            for lote in cargar_indeed_por_lotes(ruta_indeed(), filas_lote):
+                if 'pais' in lote.columns:
+                    lote['pais'] = lote['pais'].str.strip()
+                escritor.escribir(procesar_ofertas(lote, df_macro, cache))
+    except Exception as e:
+        print(f"[ERROR] Fallo crítico integrando Indeed por lotes: {e}")
+        raise RuntimeError("Fallo crítico integrando Indeed por lotes") from e
+    finally:
+        if cache:
+            print(f"[INFO] Caché de limpieza: {cache.resumen()}")
+            cache.cerrar()
+
+    print(f"\n[OK] Dataset generado: {', '.join(os.path.basename(r) for r in escritor.rutas)}")
+    print(f"[OK] Total filas: {escritor.filas}")
+
 
-print(f"\n[OK] Dataset generado: {nombre_archivo}")
-print(f"[OK] Columnas incluidas: {list(df_final.columns)}")
-print(f"[OK] Total filas: {len(df_final)}")
\ No newline at end of file
+if __name__ == "__main__":
+    try:
+        if filas_lote:
+            integrar_por_lotes(filas_lote=filas_lote)
+        else:
+            integrar()
+    except RuntimeError:
+        exit(1)
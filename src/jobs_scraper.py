@@ -1,85 +1,32 @@
-import ssl
-import certifi
+import argparse
 import os
-import sys
-import subprocess
-import platform
-import re
 import time
-import random
-import pandas as pd
-from selenium.webdriver.common.by import By
-from urllib.parse import quote_plus
-try:
-    import undetected_chromedriver as uc
-except ImportError:
-    print("Installing undetected-chromedriver...")
-    try:
-        subprocess.check_call([sys.executable, "-m", "pip", "install", "undetected-chromedriver"])
-    except subprocess.CalledProcessError as install_error:
-        raise RuntimeError(
-            "No se pudo instalar automáticamente undetected-chromedriver. "
-            "Instala el paquete manualmente con 'pip install undetected-chromedriver'."
-        ) from install_error
-    import undetected_chromedriver as uc
-
-
-def detectar_version_chrome() -> int | None:
-    """Devuelve la versión mayor de Chrome instalada (ej. 142) si se puede detectar."""
-    version_env = os.getenv("CHROME_VERSION" ) or os.getenv("CHROME_VERSION_MAIN")
-    if version_env:
-        try:
-            return int(version_env.split(".")[0])
-        except ValueError:
-            pass
-
-    if platform.system() == "Windows":
-        claves = [
-            r"HKEY_CURRENT_USER\Software\Google\Chrome\BLBeacon",
-            r"HKEY_LOCAL_MACHINE\Software\Google\Chrome\BLBeacon",
-        ]
-        for clave in claves:
-            try:
-                salida = subprocess.check_output(
-                    ["reg", "query", clave, "/v", "version"],
-                    encoding="utf-8",
-                    errors="ignore",
-                )
-                coincidencia = re.search(r"(\d+\.\d+\.\d+\.\d+)", salida)
-                if coincidencia:
-                    return int(coincidencia.group(1).split(".")[0])
-            except (subprocess.CalledProcessError, FileNotFoundError):
-                continue
-    return None
-    import undetected_chromedriver as uc
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from parser_indeed import extraer_ofertas
+from limitador_ritmo import obtener_limitador
+from pool_navegadores import PoolNavegadores
+from fetchers import crear_fetcher
+from checkpoint_crawl import CheckpointCrawl, cargar_ids_historicos, ruta_checkpoint
+from plan_crawl import TareaCrawl, consultas_de, expandir_plan
+from escritura_ofertas import EscritorOfertas, SinkCSV, SinkIndiceIds, SinkParquet
 
 # ==========================================
-# 1. PARCHE SSL (Para Mac OS)
+# 1. CONFIGURACIÓN DE DESCARGA
 # ==========================================
-
-ssl._create_default_https_context = ssl._create_unverified_context
+# Por defecto las páginas se piden con un cliente HTTP (fetchers.py) y solo se
+# abre un navegador para los dominios que responden con un challenge. Los
+# drivers los crea bajo demanda PoolNavegadores (pool_navegadores.py):
+# importar este módulo no abre Chrome ni detecta versiones. El parche SSL para
+# Mac OS solo está activo mientras se crea un driver (pool_navegadores.py): las
+# peticiones HTTP verifican certificados.
+
+backend = "auto"              # "auto" | "http" | "navegador"
+headless = False              # --headless para modo oculto
+paginas_por_sesion = 50       # reciclar el navegador tras N páginas...
+max_rss_mb = 1500             # ...o si su árbol de procesos supera esta RSS
 
 # ==========================================
-# 2. CONFIGURACIÓN DEL NAVEGADOR
-# ==========================================
-
-options = uc.ChromeOptions()
-options.add_argument("--window-size=1920,1080")
-options.add_argument("--disable-popup-blocking")
-# options.add_argument("--headless") # Descomentar para modo oculto
-
-driver_kwargs = {"options": options}
-version_chrome = detectar_version_chrome()
-if version_chrome:
-    driver_kwargs["version_main"] = version_chrome
-    print(f"Usando Chrome versión {version_chrome} detectada automáticamente")
-else:
-    print("No se pudo detectar la versión de Chrome; se usará la predeterminada de uc")
-
-driver = uc.Chrome(**driver_kwargs)
-
-# ==========================================
-# 3. PARÁMETROS (MULTI-PAÍS)
+# 2. PARÁMETROS (MULTI-PAÍS)
 # ==========================================
 
 PAISES = {
@@ -90,158 +37,339 @@ PAISES = {
     
 }
 
-keyword = "data analyst"
-location = "" 
+# Matriz de búsquedas: cada keyword se busca en cada ubicación de cada país
+# ("" = sin filtro de ubicación). Ver plan_crawl.py.
+keywords = ["data analyst"]
+locations = [""]
 max_pages_per_country = 5 
-
-keyword_enc = quote_plus(keyword)
-location_enc = quote_plus(location)
-
-ofertas = []
-ids_vistos = set()
+# Tareas (búsqueda x país) en paralelo. Las pausas las marca un limitador AIMD
+# por dominio (limitador_ritmo.py), compartido por todos los workers que lo visiten.
+max_workers = len(PAISES)
+# Modo incremental: se deja de paginar un país cuando al menos esta fracción de
+# la página son ofertas ya conocidas (de ejecuciones anteriores).
+umbral_conocidas = 0.8
+# Reintentos de una página que sigue en challenge después de la espera del fetcher
+reintentos_challenge = 1
+
+# Ruta relativa: ../dataset/desde_source
+ruta_source = os.path.dirname(os.path.abspath(__file__))
+ruta_proyecto = os.path.dirname(ruta_source)
+ruta_dataset = os.path.join(ruta_proyecto, "dataset")
+ruta_csv_final = os.path.join(ruta_dataset, "indeed_global_final.csv")
+ruta_parquet_final = os.path.join(ruta_dataset, "indeed_global_final.parquet")
+ruta_indice_ids = os.path.join(ruta_dataset, ".crawl", "ids_indeed.txt")
+ruta_cache_navegador = os.path.join(ruta_dataset, ".crawl", "navegador")
+
+# Salida en streaming (escritura_ofertas.py): las ofertas se vuelcan a disco en
+# lotes de ``tamano_lote`` filas mientras el crawl avanza.
+formato_salida = "csv"        # "csv" | "parquet" | "ambos"
+tamano_lote = 500
 
 # ==========================================
-# 4. SCRAPING
+# 3. SCRAPING
 # ==========================================
 
-print("🌍 Iniciando scraping...")
-
-try:
-    for codigo_pais, dominio_base in PAISES.items():
-        print(f"\n✈️  PROCESANDO PAÍS: {codigo_pais}")
-        
-        base_url = f"{dominio_base}/jobs?q={{}}&l={{}}&start={{}}"
+def scrapear_tarea(
+    tarea: TareaCrawl,
+    fetcher,
+    escritor: EscritorOfertas,
+    checkpoint: CheckpointCrawl | None = None,
+    ids_historicos: set | None = None,
+) -> int:
+    """Recorre las páginas de una búsqueda en un país pidiéndolas a ``fetcher``.
+
+    Cada página se entrega a ``escritor``, que deduplica por ``data-jk`` entre
+    todos los workers y búsquedas y vuelca a disco por lotes; devuelve cuántas
+    ofertas nuevas aportó la tarea. Cada oferta lleva la búsqueda que la
+    encontró (``consulta``/``consulta_ubicacion``). Con ``checkpoint`` (el de
+    esta búsqueda) se saltan las páginas ya hechas y los ids de ejecuciones
+    anteriores. Con ``ids_historicos`` (modo incremental) se para en cuanto una
+    página es casi toda conocida.
+    """
+    codigo_pais, dominio_base, etiqueta = tarea.pais, tarea.dominio_base, tarea.etiqueta
+    total = 0
+    ids_vistos = checkpoint.ids_vistos() if checkpoint else set()
+    ids_historicos = ids_historicos or set()
+
+    print(f"\n✈️  PROCESANDO: {etiqueta}")
+    if checkpoint and checkpoint.pais_terminado(codigo_pais):
+        print(f"⏭️  {etiqueta} ya completado en el checkpoint.")
+        return total
+
+    limitador = obtener_limitador(dominio_base)
+
+    def esperar_challenge():
+        # Challenge de Cloudflare: se frena el dominio y se le da tiempo. La
+        # llama el fetcher (una vez por descarga); el scraper solo reintenta
+        espera = limitador.penalizar("challenge")
+        print(f"   ⚠️ [{etiqueta}] Cloudflare detectado. Esperando {espera:.0f}s...")
+        time.sleep(espera)
+
+    for page in range(0, max_pages_per_country * 10, 10):
+        if checkpoint and checkpoint.pagina_hecha(codigo_pais, page):
+            print(f"   ⏭️  [{etiqueta}] Página start={page} ya en checkpoint")
+            continue
+
+        url = tarea.url(page)
+        print(f"   📄 [{etiqueta}] Página start={page}")
         
-        for page in range(0, max_pages_per_country * 10, 10):
-            url = base_url.format(keyword_enc, location_enc, page)
-            print(f"   📄 Página start={page}")
-            
-            driver.get(url)
-            time.sleep(random.uniform(4, 6))
-
-            # Cerrar Pop-ups
-            try:
-                close_btn = driver.find_element(By.CSS_SELECTOR, "button[aria-label='cerrar'], button[aria-label='close'], div[aria-label='Cerrar']")
-                close_btn.click()
-            except:
-                pass 
-
-            # Detectar Cloudflare
-            if "challenge" in driver.title.lower():
-                print("   ⚠️ Cloudflare detectado. Esperando 15s...")
-                time.sleep(15)
-
-            job_cards = driver.find_elements(By.CSS_SELECTOR, "div.job_seen_beacon")
-            if not job_cards:
-                job_cards = driver.find_elements(By.CSS_SELECTOR, "td.resultContent")
-
-            print(f"      → Ofertas: {len(job_cards)}")
-
-            if not job_cards:
-                if page > 0: break
-                else: continue
-
-            for card in job_cards:
+        limitador.esperar()
+        pagina = fetcher.obtener(url, esperar_challenge)
+        for _ in range(reintentos_challenge):
+            if not pagina.challenge:
+                break
+            print(f"   🔁 [{etiqueta}] Sigue el challenge: reintentando start={page}")
+            limitador.esperar()
+            pagina = fetcher.obtener(url, esperar_challenge)
+        if pagina.challenge:
+            # Ya penalizado por el fetcher: la página queda pendiente en el
+            # checkpoint para la próxima ejecución
+            print(f"   ⏭️  [{etiqueta}] Challenge sin resolver en start={page}: se salta")
+            continue
+
+        # El HTML en bruto se parsea en local, venga del backend que venga
+        t_extraccion = time.perf_counter()
+        job_cards = extraer_ofertas(pagina.html, codigo_pais, dominio_base)
+        ms_extraccion = (time.perf_counter() - t_extraccion) * 1000
+
+        print(f"      → [{etiqueta}] Ofertas: {len(job_cards)} ({ms_extraccion:.1f} ms, {pagina.backend})")
+
+        if not job_cards:
+            limitador.penalizar("sin tarjetas")
+            if page > 0:
+                if checkpoint:
+                    checkpoint.registrar_pagina(codigo_pais, page, {}, fin=True)
+                break
+            else: continue
+
+        nuevas = {}
+        for job_id, oferta in job_cards:
+            if job_id in ids_vistos or job_id in ids_historicos:
+                continue
+            ids_vistos.add(job_id)
+            oferta["consulta"] = tarea.keyword
+            oferta["consulta_ubicacion"] = tarea.location
+            nuevas[job_id] = oferta
+
+        # Indeed ordena por fecha: si la página ya es casi toda conocida,
+        # las siguientes también lo serán
+        conocidas = sum(job_id in ids_historicos for job_id, _ in job_cards)
+        agotado = bool(ids_historicos) and conocidas >= umbral_conocidas * len(job_cards)
+        if checkpoint:
+            checkpoint.registrar_pagina(codigo_pais, page, nuevas, fin=agotado)
+        # Después del checkpoint: lo que quede sin volcar se recupera de él
+        total += escritor.anadir(nuevas)
+
+        limitador.exito()
+        print(f"      ⏱️  [{etiqueta}] Ritmo: {limitador.resumen()}")
+        if agotado:
+            print(f"   🛑 [{etiqueta}] {conocidas}/{len(job_cards)} ofertas ya conocidas: fin de paginación")
+            break
+    
+    print(f"✅ {etiqueta} terminado ({total} ofertas nuevas).")
+
+    return total
+
+
+def crear_fetcher_por_defecto(backend: str, workers: int, headless: bool):
+    """Backend de descarga con un pool perezoso de ``workers`` navegadores."""
+    navegadores = PoolNavegadores(
+        workers,
+        ruta_cache_navegador,
+        headless=headless,
+        paginas_por_sesion=paginas_por_sesion,
+        max_rss_mb=max_rss_mb,
+    )
+    return crear_fetcher(backend, navegadores)
+
+
+def abrir_checkpoints(tareas: list[TareaCrawl], sufijo: str = "",
+                      reiniciar: bool = False) -> dict:
+    """Un CheckpointCrawl por búsqueda del plan, indexado por (keyword, location)."""
+    checkpoints = {}
+    for keyword, location in consultas_de(tareas):
+        checkpoint = CheckpointCrawl(ruta_checkpoint(ruta_dataset, keyword, location, sufijo))
+        if reiniciar:
+            checkpoint.reiniciar()
+        checkpoints[(keyword, location)] = checkpoint
+    return checkpoints
+
+
+def scrapear_todos(
+    escritor: EscritorOfertas,
+    tareas: list[TareaCrawl] | None = None,
+    workers: int = max_workers,
+    checkpoints: dict | None = None,
+    ids_historicos: set | None = None,
+    fetcher=None,
+) -> int:
+    """Reparte las tareas del plan entre ``workers`` hilos que escriben en ``escritor``.
+
+    Por defecto el plan es ``keywords`` x ``locations`` x ``PAISES``. La cola
+    del ejecutor es la de tareas: cada worker toma la siguiente al terminar la
+    suya. Las páginas se piden a ``fetcher``; si no se pasa uno, se crea el
+    backend ``backend`` con un pool de ``workers`` navegadores y se cierra al
+    terminar. ``checkpoints`` es el dict de ``abrir_checkpoints``. Devuelve el
+    número de ofertas entregadas al escritor.
+    """
+    if tareas is None:
+        tareas = expandir_plan(keywords, locations, PAISES)
+    checkpoints = checkpoints or {}
+    ids_historicos = ids_historicos or set()
+    inicio = time.perf_counter()
+    print(f"🗺️  Plan: {len(tareas)} tareas ({len(consultas_de(tareas))} búsquedas)")
+    if checkpoints:
+        # Lo ya extraído en ejecuciones anteriores (incluido lo de un worker caído
+        # o lo que no llegó a volcarse) se reenvía al escritor página a página
+        for checkpoint in checkpoints.values():
+            for ofertas in checkpoint.iterar_ofertas():
+                escritor.anadir({j: o for j, o in ofertas.items() if j not in ids_historicos})
+        if escritor.total or escritor.pendientes:
+            print(f"♻️  {escritor.total + escritor.pendientes} ofertas recuperadas del checkpoint")
+
+    fetcher_propio = fetcher is None
+    if fetcher_propio:
+        fetcher = crear_fetcher_por_defecto(backend, workers, headless)
+
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as ejecutor:
+            futuros = {
+                ejecutor.submit(
+                    scrapear_tarea, tarea, fetcher, escritor,
+                    checkpoints.get(tarea.consulta), ids_historicos,
+                ): tarea
+                for tarea in tareas
+            }
+            for futuro in as_completed(futuros):
+                tarea = futuros[futuro]
                 try:
-                    # --- ID ÚNICO ---
-                    try:
-                        job_id = card.get_attribute("data-jk")
-                        if not job_id:
-                            link_elem = card.find_element(By.CSS_SELECTOR, "a.jcs-JobTitle")
-                            job_id = link_elem.get_attribute("data-jk")
-                    except:
-                        continue
-
-                    if not job_id or job_id in ids_vistos:
-                        continue
-                    ids_vistos.add(job_id)
-
-                    # --- EXTRACCIÓN ---
-                    
-                    # 1. Título
-                    try:
-                        title = card.find_element(By.CSS_SELECTOR, "h2.jobTitle span").text.strip()
-                    except:
-                        title = "Data Analyst"
-
-                    # 2. Empresa
-                    try:
-                        company = card.find_element(By.CSS_SELECTOR, "span[data-testid='company-name']").text.strip()
-                    except:
-                        company = "Confidencial"
-
-                    # 3. Ubicación (Texto sucio)
-                    try:
-                        location_txt = card.find_element(By.CSS_SELECTOR, "div[data-testid='text-location']").text.strip()
-                    except:
-                        location_txt = "Ubicación desconocida"
-
-                    # 4. Longitud descripción (Numérica)
-                    # Intentamos sacar el snippet, si falla, medimos toda la tarjeta para evitar 0s
-                    try:
-                        summary_elem = card.find_element(By.CSS_SELECTOR, "div.job-snippet")
-                        summary_text = summary_elem.text.strip()
-                        desc_len = len(summary_text)
-                    except:
-                        desc_len = len(card.text)
-
-                    # --- VARIABLES DERIVADAS ---
-                    
-                    # Modalidad (Categórica Target)
-                    loc_lower = location_txt.lower()
-                    if "remoto" in loc_lower or "remote" in loc_lower:
-                        modalidad = "Remoto"
-                    elif "híbrido" in loc_lower or "hybrid" in loc_lower:
-                        modalidad = "Híbrido"
-                    else:
-                        modalidad = "Presencial"
-
-                    link = f"{dominio_base}/viewjob?jk={job_id}"
-
-                    ofertas.append({
-                        "titulo": title,
-                        "empresa": company,
-                        "pais": codigo_pais,
-                        "ubicacion_raw": location_txt,
-                        "modalidad": modalidad,
-                        "desc_longitud": desc_len,
-                        "url": link
-                    })
-
-                except Exception:
-                    continue
-            
-            driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-            time.sleep(random.uniform(2, 4))
-        
-        print(f"✅ País {codigo_pais} terminado.")
-        time.sleep(2)
+                    futuro.result()
+                except Exception as e:
+                    # Una tarea caída no tumba al resto: lo ya extraído está en el escritor
+                    print(f"❌ Error en {tarea.etiqueta}: {e}")
+    finally:
+        if fetcher_propio:
+            fetcher.cerrar()
 
-except Exception as e:
-    print(f"❌ Error: {e}")
+    print(f"\n⏱️  Scraping completado en {time.perf_counter() - inicio:.1f}s con {workers} workers")
+    return escritor.total + escritor.pendientes
 
-finally:
-    driver.quit()
 
 # ==========================================
-# 5. GUARDADO
+# 4. GUARDADO
 # ==========================================
 
-if ofertas:
-    # Ruta relativa: ../dataset/desde_source
-    ruta_source = os.path.dirname(os.path.abspath(__file__))
-    ruta_proyecto = os.path.dirname(ruta_source)
-    ruta_dataset = os.path.join(ruta_proyecto, "dataset")
+def crear_escritor(formato: str = formato_salida, incremental: bool = False,
+                   lote: int = tamano_lote) -> EscritorOfertas:
+    """Escritor con los sinks de salida; en modo incremental se añade al CSV."""
     os.makedirs(ruta_dataset, exist_ok=True)
-    
-    ruta_archivo = os.path.join(ruta_dataset, "indeed_global_final.csv")
-    
-    df = pd.DataFrame(ofertas)
-    df.to_csv(ruta_archivo, index=False, encoding="utf-8-sig")
-    
-    print("\n✅ Extracción finalizada.")
-    print(f"📁 Guardado en: {ruta_archivo}")
-    print(f"📊 Total registros: {len(df)}")
-    print(df.head())
-else:
-    print("\n⚠️ No se encontraron datos.")
+    sinks = []
+    if formato in ("csv", "ambos"):
+        sinks.append(SinkCSV(ruta_csv_final, incremental))
+        if incremental:
+            # El índice va después del CSV para que quede al día (mtime)
+            sinks.append(SinkIndiceIds(ruta_indice_ids))
+    if formato in ("parquet", "ambos"):
+        sinks.append(SinkParquet(ruta_parquet_final, incremental))
+    return EscritorOfertas(sinks, tamano_lote=lote)
+
+
+def cerrar_checkpoints(checkpoints: dict, tareas: list[TareaCrawl]) -> bool:
+    """Tras publicar la salida, borra los checkpoints si el crawl quedó completo.
+
+    Así una nueva ejecución vuelve a pedir las páginas en lugar de republicar
+    las filas del checkpoint. Si a alguna búsqueda le faltan páginas (una
+    tarea caída o un challenge sin resolver) se conservan todos: la salida se
+    reescribe entera al reanudar y necesita también las filas de las demás.
+    Devuelve si se borraron.
+    """
+    starts = range(0, max_pages_per_country * 10, 10)
+    pendientes = [
+        consulta for consulta, checkpoint in checkpoints.items()
+        if not checkpoint.completo([t.pais for t in tareas if t.consulta == consulta], starts)
+    ]
+    if pendientes:
+        print(f"♻️  Crawl incompleto (búsquedas con páginas pendientes: {len(pendientes)}): "
+              f"se conserva el checkpoint para reanudar")
+        return False
+    for checkpoint in checkpoints.values():
+        checkpoint.reiniciar()
+    return True
+
+
+def cerrar_escritor(escritor: EscritorOfertas, incremental: bool = False) -> None:
+    """Vuelca el último lote, publica los ficheros y resume la extracción."""
+    escritor.cerrar()
+    if escritor.total:
+        print("\n✅ Extracción finalizada.")
+        for sink in escritor.sinks:
+            if hasattr(sink, "ruta_final"):
+                print(f"📁 Guardado en: {sink.ruta_final}")
+        print(f"📊 Total registros{' nuevos' if incremental else ''}: {escritor.total}")
+    else:
+        print("\n⚠️ No se encontraron datos.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Scraper multi-país de ofertas de Indeed")
+    parser.add_argument("--workers", type=int, default=max_workers,
+                        help="tareas en paralelo (y tamaño del pool de navegadores)")
+    parser.add_argument("--keyword", action="append", dest="keywords", metavar="TEXTO",
+                        help="keyword a buscar (repetible; por defecto las de 'keywords')")
+    parser.add_argument("--location", action="append", dest="locations", metavar="TEXTO",
+                        help="ubicación a buscar (repetible; por defecto las de 'locations')")
+    parser.add_argument("--reiniciar", action="store_true",
+                        help="descarta el checkpoint y empieza el crawl de cero "
+                             "(tras un crawl completo ya se descarta al publicar)")
+    parser.add_argument("--sin-checkpoint", action="store_true",
+                        help="no lee ni escribe el estado en disco")
+    parser.add_argument("--headless", action="store_true", default=headless,
+                        help="navegador sin ventana")
+    parser.add_argument("--backend", choices=["auto", "http", "navegador"], default=backend,
+                        help="auto: HTTP y navegador solo ante challenges")
+    parser.add_argument("--base-local", metavar="URL",
+                        help="sirve todos los países desde URL/<pais> (p. ej. un servidor de fixtures)")
+    parser.add_argument("--incremental", action="store_true",
+                        help="solo ofertas nuevas: para al llegar a ids conocidos y añade al CSV")
+    parser.add_argument("--formato", choices=["csv", "parquet", "ambos"], default=formato_salida,
+                        help="formato de salida (parquet: un fichero por lote en un directorio)")
+    parser.add_argument("--lote", type=int, default=tamano_lote,
+                        help="filas por volcado a disco")
+    args = parser.parse_args()
+
+    ids_historicos = None
+    sufijo = ""
+    if args.incremental:
+        ids_historicos = cargar_ids_historicos(ruta_csv_final, ruta_indice_ids)
+        # Cursor propio por día: el de ayer no debe saltar las páginas de hoy
+        sufijo = time.strftime("%Y-%m-%d")
+        print(f"🔁 Modo incremental: {len(ids_historicos)} ids conocidos")
+
+    paises = PAISES
+    if args.base_local:
+        paises = {codigo: f"{args.base_local.rstrip('/')}/{codigo.lower()}" for codigo in PAISES}
+    tareas = expandir_plan(args.keywords or keywords, args.locations or locations, paises)
+
+    checkpoints = None
+    if not args.sin_checkpoint:
+        checkpoints = abrir_checkpoints(tareas, sufijo, reiniciar=args.reiniciar)
+
+    escritor = crear_escritor(args.formato, args.incremental, args.lote)
+    print("🌍 Iniciando scraping...")
+    fetcher = crear_fetcher_por_defecto(args.backend, args.workers, args.headless)
+    try:
+        scrapear_todos(
+            escritor,
+            tareas=tareas,
+            workers=args.workers,
+            checkpoints=checkpoints,
+            ids_historicos=ids_historicos,
+            fetcher=fetcher,
+        )
+    finally:
+        fetcher.cerrar()
+    # Solo se publica la salida si el crawl termina; si no, el checkpoint la rehace
+    cerrar_escritor(escritor, incremental=args.incremental)
+    # Publicada la salida, un crawl completo no se reanuda: la próxima ejecución empieza de cero
+    if checkpoints:
+        cerrar_checkpoints(checkpoints, tareas)
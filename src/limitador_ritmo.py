@@ -0,0 +1,91 @@
+import random
+import threading
+import time
+from collections import deque
+
+# ==========================================
+# RITMO ADAPTATIVO POR DOMINIO (AIMD)
+# ==========================================
+# En lugar de pausas fijas (4-6s + 2-4s por página y 15s ante Cloudflare), cada
+# dominio tiene un intervalo mínimo entre peticiones que:
+#   - baja de forma aditiva mientras las páginas cargan limpias, y
+#   - se multiplica cuando aparece un challenge o una página sin tarjetas.
+# Es un token bucket de capacidad 1 cuya tasa (1 / intervalo) ajusta AIMD.
+
+
+class LimitadorAIMD:
+    """Controla el intervalo entre peticiones a un mismo dominio."""
+
+    def __init__(
+        self,
+        dominio: str,
+        intervalo_inicial: float = 6.0,
+        intervalo_min: float = 2.0,
+        intervalo_max: float = 60.0,
+        paso: float = 0.5,
+        factor: float = 2.0,
+        jitter: float = 0.2,
+        ventana: int = 20,
+    ):
+        self.dominio = dominio
+        self.intervalo = intervalo_inicial
+        self.intervalo_min = intervalo_min
+        self.intervalo_max = intervalo_max
+        self.paso = paso
+        self.factor = factor
+        self.jitter = jitter
+        self._proxima = 0.0
+        self._lock = threading.Lock()
+        self._marcas = deque(maxlen=ventana)
+
+    def esperar(self) -> float:
+        """Bloquea hasta que el dominio admite otra petición. Devuelve lo dormido."""
+        with self._lock:
+            ahora = time.monotonic()
+            # Jitter para no pedir con un periodo exacto (como hacía random.uniform)
+            intervalo = self.intervalo * random.uniform(1 - self.jitter, 1 + self.jitter)
+            turno = max(ahora, self._proxima)
+            self._proxima = turno + intervalo
+            self._marcas.append(turno)
+        espera = turno - ahora
+        if espera > 0:
+            time.sleep(espera)
+        return espera
+
+    def exito(self) -> None:
+        """Página limpia: se acelera (aumento aditivo de la tasa)."""
+        with self._lock:
+            self.intervalo = max(self.intervalo_min, self.intervalo - self.paso)
+
+    def penalizar(self, motivo: str = "") -> float:
+        """Challenge o página vacía: se frena (reducción multiplicativa) y
+        se aplaza el siguiente turno. Devuelve el nuevo intervalo."""
+        with self._lock:
+            self.intervalo = min(self.intervalo_max, self.intervalo * self.factor)
+            self._proxima = max(self._proxima, time.monotonic() + self.intervalo)
+            intervalo = self.intervalo
+        print(f"   🐢 [{self.dominio}] Frenando ({motivo}): intervalo {intervalo:.1f}s")
+        return intervalo
+
+    def tasa_efectiva(self) -> float:
+        """Peticiones por minuto sobre la ventana de las últimas peticiones."""
+        with self._lock:
+            marcas = list(self._marcas)
+        if len(marcas) < 2 or marcas[-1] <= marcas[0]:
+            return 60.0 / self.intervalo
+        return 60.0 * (len(marcas) - 1) / (marcas[-1] - marcas[0])
+
+    def resumen(self) -> str:
+        return f"{self.tasa_efectiva():.1f} pág/min (intervalo {self.intervalo:.1f}s)"
+
+
+_limitadores = {}
+_lock_registro = threading.Lock()
+
+
+def obtener_limitador(dominio: str, **kwargs) -> LimitadorAIMD:
+    """Devuelve el limitador compartido del dominio (uno por dominio y proceso)."""
+    with _lock_registro:
+        if dominio not in _limitadores:
+            _limitadores[dominio] = LimitadorAIMD(dominio, **kwargs)
+        return _limitadores[dominio]
@@ -0,0 +1,102 @@
+import re
+
+import pandas as pd
+
+from cache_normalizacion import version_de
+
+# ==========================================
+# LIMPIEZA DE UBICACIONES (COMPARTIDA)
+# ==========================================
+# Funciones de limpieza de ``ubicacion_raw`` que usan integracion_datos.py y
+# data_cleaning.py. Los patrones se compilan una sola vez al importar y las
+# funciones se aplican por valor distinto (``mapear_unicos``): en el histórico
+# hay millones de filas pero solo unos miles de ubicaciones diferentes, así que
+# cada una se limpia una vez y el resultado se reparte a todas sus filas.
+# Cada función por valor es la misma que antes se pasaba a ``Series.apply``,
+# por lo que la salida es idéntica. Con una CacheNormalizacion
+# (cache_normalizacion.py) los valores ya vistos en ejecuciones anteriores ni
+# siquiera se limpian: se leen de disco.
+
+# Integración: ruido del scraping (ojo: " in ", "au ", "en " con espacios)
+PATRON_RUIDO_INTEGRACION = re.compile(r'(?i)(teletrabajo|trabajo híbrido|homeoffice|remote|hybrid| in |au |en )')
+# Limpieza: además quita nombres de país y palabras sueltas del anuncio
+PATRON_RUIDO_LIMPIEZA = re.compile(
+    r'(?i)\b(teletrabajo|trabajo|híbrido|hybrid|remote|homeoffice|work| in | en | at '
+    r'|España|Spain|Deutschland|Germany|United States|USA|UK|France|Francia)\b'
+)
+PATRON_CODIGO_POSTAL = re.compile(r'\b\d{4,5}\b')
+PATRON_ESPACIOS = re.compile(r'\s+')
+
+PALABRAS_REMOTO = ('teletrabajo', 'remote', 'homeoffice', 'híbrido', 'hybrid')
+
+
+def limpiar_ciudad(texto):
+    """Ciudad de ``ubicacion_raw`` tal como la deja la integración."""
+    if pd.isna(texto): return "Desconocido"
+    # Eliminar palabras clave comunes del scraping
+    texto = PATRON_RUIDO_INTEGRACION.sub('', str(texto))
+    texto = PATRON_CODIGO_POSTAL.sub('', texto) # Quitar códigos postales
+    if "," in texto: texto = texto.split(",")[0] # Quedarse solo con la ciudad antes de la coma
+    return texto.strip().title()
+
+
+def detectar_remoto(texto):
+    if pd.isna(texto): return False
+    texto = str(texto).lower()
+    return any(p in texto for p in PALABRAS_REMOTO)
+
+
+def limpiar_ubicacion_regex_final(texto):
+    """Ciudad de ``ubicacion_raw`` con la limpieza más estricta de data_cleaning."""
+    if pd.isna(texto): return "Desconocido"
+    texto = str(texto)
+
+    if ',' in texto: texto = texto.split(',')[0]
+
+    texto_limpio = PATRON_RUIDO_LIMPIEZA.sub(' ', texto)
+    texto_limpio = PATRON_CODIGO_POSTAL.sub('', texto_limpio)
+    texto_limpio = PATRON_ESPACIOS.sub(' ', texto_limpio).strip().title()
+
+    if len(texto_limpio) < 2: return "Desconocido"
+
+    return texto_limpio
+
+
+# Versión de cada limpiador para la caché: cambia sola al tocar su código o
+# sus patrones
+VERSIONES = {
+    "limpiar_ciudad": version_de(limpiar_ciudad, PATRON_RUIDO_INTEGRACION, PATRON_CODIGO_POSTAL),
+    "detectar_remoto": version_de(detectar_remoto, PALABRAS_REMOTO),
+    "limpiar_ubicacion_regex_final": version_de(
+        limpiar_ubicacion_regex_final, PATRON_RUIDO_LIMPIEZA, PATRON_CODIGO_POSTAL, PATRON_ESPACIOS
+    ),
+}
+
+
+def _resultados_unicos(unicos, funcion, cache) -> list:
+    if cache is None or funcion.__name__ not in VERSIONES:
+        return [funcion(valor) for valor in unicos]
+
+    nombre, version = funcion.__name__, VERSIONES[funcion.__name__]
+    claves = [str(valor) for valor in unicos]
+    conocidos = cache.obtener(nombre, version, claves)
+    nuevos = {clave: funcion(valor) for clave, valor in zip(claves, unicos) if clave not in conocidos}
+    cache.guardar(nombre, version, nuevos)
+    conocidos.update(nuevos)
+    return [conocidos[clave] for clave in claves]
+
+
+def mapear_unicos(serie: pd.Series, funcion, cache=None) -> pd.Series:
+    """Equivalente a ``serie.apply(funcion)`` evaluando cada valor distinto una vez.
+
+    Con ``cache`` (CacheNormalizacion) solo se evalúan los valores que no se
+    hayan limpiado ya en una ejecución anterior con la misma versión.
+    """
+    codigos, unicos = pd.factorize(serie, use_na_sentinel=True)
+    # El último elemento es el resultado para nulos: el código -1 de factorize
+    # apunta justo a él con ``take``
+    traduccion = pd.Series(_resultados_unicos(unicos, funcion, cache) + [funcion(None)])
+    resultado = traduccion.take(codigos)
+    resultado.index = serie.index
+    resultado.name = serie.name
+    return resultado
@@ -0,0 +1,234 @@
+import re
+from html.parser import HTMLParser
+
+# ==========================================
+# EXTRACCIÓN OFFLINE DE TARJETAS DE INDEED
+# ==========================================
+# Sustituye el recorrido tarjeta a tarjeta con Selenium (5-7 llamadas WebDriver
+# por oferta) por un único ``page_source`` parseado en local. Los selectores
+# reproducen los CSS que usaba el scraper:
+#
+#   tarjeta   -> div.job_seen_beacon   (fallback: td.resultContent)
+#   id        -> @data-jk de la tarjeta o de a.jcs-JobTitle
+#   título    -> h2.jobTitle span
+#   empresa   -> span[data-testid='company-name']
+#   ubicación -> div[data-testid='text-location']
+#   snippet   -> div.job-snippet       (fallback: texto completo de la tarjeta)
+
+CAMPOS = ("titulo", "empresa", "ubicacion", "snippet", "texto")
+
+ELEMENTOS_VACIOS = {
+    "area", "base", "br", "col", "embed", "hr", "img", "input",
+    "link", "meta", "param", "source", "track", "wbr",
+}
+ELEMENTOS_SIN_TEXTO = {"script", "style", "noscript", "template"}
+
+_espacios = re.compile(r"\s+")
+
+
+def _clases(attrs: dict) -> set:
+    return set((attrs.get("class") or "").split())
+
+
+def _campo_de(tag: str, attrs: dict, dentro_de_titulo: bool) -> str | None:
+    """Devuelve qué campo de la oferta abre este elemento (o None)."""
+    clases = _clases(attrs)
+    testid = attrs.get("data-testid")
+    if tag == "span" and dentro_de_titulo:
+        return "titulo"
+    if tag == "span" and testid == "company-name":
+        return "empresa"
+    if tag == "div" and testid == "text-location":
+        return "ubicacion"
+    if tag == "div" and "job-snippet" in clases:
+        return "snippet"
+    return None
+
+
+class _Tarjeta:
+    """Acumulador de los campos de una tarjeta mientras se parsea."""
+
+    def __init__(self, attrs: dict):
+        self.job_id = attrs.get("data-jk")
+        self.campos = {}
+        self.texto = []
+
+
+class _ParserIndeed(HTMLParser):
+    """Parser en streaming que recoge las tarjetas de ambos layouts.
+
+    ``campos`` limita qué campos se capturan (lo usa el benchmark para medir
+    el coste de cada uno); por defecto, todos.
+    """
+
+    def __init__(self, campos=CAMPOS):
+        super().__init__(convert_charrefs=True)
+        self.campos = set(campos)
+        self.pila = []            # (tag, marcas) por cada elemento abierto
+        self.beacons = []
+        self.result_content = []
+        self.abiertas = []        # tarjetas en curso (pueden anidarse)
+        self.capturas = []        # (tarjeta, campo, buffer) en curso
+        self.en_titulo = 0
+        self.sin_texto = 0
+
+    def handle_starttag(self, tag, attrs_lista):
+        if self.sin_texto:
+            # Dentro de <noscript>/<template> el navegador no crea elementos:
+            # solo se sigue el anidamiento para saber cuándo se sale
+            marcas = []
+            if tag in ELEMENTOS_SIN_TEXTO:
+                self.sin_texto += 1
+                marcas.append("sin_texto")
+            if tag not in ELEMENTOS_VACIOS:
+                self.pila.append((tag, marcas))
+            return
+
+        attrs = dict(attrs_lista)
+        clases = _clases(attrs)
+        marcas = []
+
+        if tag == "div" and "job_seen_beacon" in clases:
+            tarjeta = _Tarjeta(attrs)
+            self.beacons.append(tarjeta)
+            self.abiertas.append(tarjeta)
+            marcas.append("tarjeta")
+        elif tag == "td" and "resultContent" in clases:
+            tarjeta = _Tarjeta(attrs)
+            self.result_content.append(tarjeta)
+            self.abiertas.append(tarjeta)
+            marcas.append("tarjeta")
+
+        if tag == "a" and "jcs-JobTitle" in clases and attrs.get("data-jk"):
+            for tarjeta in self.abiertas:
+                if not tarjeta.job_id:
+                    tarjeta.job_id = attrs["data-jk"]
+
+        campo = _campo_de(tag, attrs, self.en_titulo > 0)
+        if campo in self.campos:
+            # Como find_element: nos quedamos con la primera coincidencia
+            for tarjeta in self.abiertas:
+                if campo not in tarjeta.campos:
+                    tarjeta.campos[campo] = None
+                    self.capturas.append((tarjeta, campo, []))
+                    marcas.append(("captura", tarjeta, campo))
+
+        if tag == "h2" and "jobTitle" in clases:
+            self.en_titulo += 1
+            marcas.append("titulo")
+        if tag in ELEMENTOS_SIN_TEXTO:
+            self.sin_texto += 1
+            marcas.append("sin_texto")
+
+        if tag in ELEMENTOS_VACIOS:
+            self._cerrar(marcas)
+        else:
+            self.pila.append((tag, marcas))
+
+    def handle_startendtag(self, tag, attrs_lista):
+        self.handle_starttag(tag, attrs_lista)
+        if tag not in ELEMENTOS_VACIOS:
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        # HTML real no siempre cierra bien: se desapila hasta el tag coincidente
+        if not any(abierto == tag for abierto, _ in self.pila):
+            return
+        while self.pila:
+            abierto, marcas = self.pila.pop()
+            self._cerrar(marcas)
+            if abierto == tag:
+                break
+
+    def handle_data(self, data):
+        if self.sin_texto:
+            return
+        if "texto" in self.campos:
+            for tarjeta in self.abiertas:
+                tarjeta.texto.append(data)
+        for _, _, buffer in self.capturas:
+            buffer.append(data)
+
+    def _cerrar(self, marcas):
+        for marca in marcas:
+            if marca == "tarjeta":
+                self.abiertas.pop()
+            elif marca == "titulo":
+                self.en_titulo -= 1
+            elif marca == "sin_texto":
+                self.sin_texto -= 1
+            else:
+                _, tarjeta, campo = marca
+                for i, (t, c, buffer) in enumerate(self.capturas):
+                    if t is tarjeta and c == campo:
+                        tarjeta.campos[campo] = normalizar_texto("".join(buffer))
+                        del self.capturas[i]
+                        break
+
+
+def normalizar_texto(texto: str) -> str:
+    """Equivalente aproximado a ``WebElement.text``: espacios colapsados y recortados."""
+    return _espacios.sub(" ", texto).strip()
+
+
+def detectar_modalidad(location_txt: str) -> str:
+    # Modalidad (Categórica Target)
+    loc_lower = location_txt.lower()
+    if "remoto" in loc_lower or "remote" in loc_lower:
+        return "Remoto"
+    elif "híbrido" in loc_lower or "hybrid" in loc_lower:
+        return "Híbrido"
+    return "Presencial"
+
+
+def extraer_tarjetas(html: str, campos=CAMPOS) -> list[dict]:
+    """Parsea el HTML de una página de resultados y devuelve los campos en bruto."""
+    parser = _ParserIndeed(campos)
+    parser.feed(html)
+    parser.close()
+
+    tarjetas = parser.beacons or parser.result_content
+    return [
+        {
+            "job_id": tarjeta.job_id,
+            "titulo": tarjeta.campos.get("titulo"),
+            "empresa": tarjeta.campos.get("empresa"),
+            "ubicacion": tarjeta.campos.get("ubicacion"),
+            "snippet": tarjeta.campos.get("snippet"),
+            "texto": normalizar_texto("".join(tarjeta.texto)),
+        }
+        for tarjeta in tarjetas
+    ]
+
+
+def construir_oferta(tarjeta: dict, codigo_pais: str, dominio_base: str) -> dict:
+    """Aplica los mismos valores por defecto y derivadas que el scraper original."""
+    # None = selector sin coincidencia (el ``except`` del scraper original)
+    title = tarjeta["titulo"] if tarjeta["titulo"] is not None else "Data Analyst"
+    company = tarjeta["empresa"] if tarjeta["empresa"] is not None else "Confidencial"
+    location_txt = tarjeta["ubicacion"] if tarjeta["ubicacion"] is not None else "Ubicación desconocida"
+
+    # Intentamos sacar el snippet, si falla, medimos toda la tarjeta para evitar 0s
+    if tarjeta["snippet"] is not None:
+        desc_len = len(tarjeta["snippet"])
+    else:
+        desc_len = len(tarjeta["texto"])
+
+    return {
+        "titulo": title,
+        "empresa": company,
+        "pais": codigo_pais,
+        "ubicacion_raw": location_txt,
+        "modalidad": detectar_modalidad(location_txt),
+        "desc_longitud": desc_len,
+        "url": f"{dominio_base}/viewjob?jk={tarjeta['job_id']}",
+    }
+
+
+def extraer_ofertas(html: str, codigo_pais: str, dominio_base: str) -> list[tuple[str, dict]]:
+    """Devuelve ``(data-jk, oferta)`` para cada tarjeta con id, en orden de página."""
+    return [
+        (tarjeta["job_id"], construir_oferta(tarjeta, codigo_pais, dominio_base))
+        for tarjeta in extraer_tarjetas(html)
+        if tarjeta["job_id"]
+    ]
@@ -0,0 +1,288 @@
+import argparse
+import hashlib
+import os
+import time
+from dataclasses import dataclass
+from graphlib import TopologicalSorter
+from typing import Callable
+
+import pandas as pd
+
+import analisis_datos
+import cache_normalizacion
+import carga_datos
+import clasificador_teletrabajo
+import data_cleaning
+import integracion_datos
+import limpieza_ubicacion
+import registro_modelos
+import seleccion_clusters
+import sketch_cuantiles
+import visualizacion_datos
+from cache_etapas import CacheEtapas, clave_etapa, hash_codigo, hash_fichero
+from carga_datos import cargar_mercado, formato_intermedio, ruta_columnar, ruta_huella
+
+# ==========================================
+# RUNNER DEL PIPELINE (DAG DE ETAPAS)
+# ==========================================
+# Las etapas (integrar -> limpiar -> analizar / figuras) se ejecutan en un
+# único proceso y en orden topológico, pasándose los DataFrames en memoria: no
+# se reimportan pandas/sklearn/matplotlib por script ni se relee de disco la
+# salida de la etapa anterior. Cada etapa sigue escribiendo sus ficheros
+# (Feather/CSV, figuras) como al ejecutarla suelta.
+#
+# La clave de una etapa combina el contenido de los ficheros que lee, el hash
+# de la salida de las etapas de las que depende, su código (``codigo``) y sus
+# parámetros (p. ej. ``min_desc_longitud``, ``factor_iqr``, ``n_clusters``).
+# Si la clave ya está en la caché (cache_etapas.py) la etapa no se ejecuta y
+# sus ficheros se restauran de ahí si hace falta. La salida de una etapa
+# cacheada solo se recarga de disco si alguna etapa posterior tiene que
+# ejecutarse. Cada figura es una etapa propia: retocar una solo regenera esa.
+# El análisis y las figuras 4 y 5 comparten los modelos de registro_modelos.py:
+# se entrenan una vez por dataset y el resto los carga del registro.
+#
+# Uso (desde la raíz del proyecto):
+#   python src/pipeline.py                            # todo el DAG
+#   python src/pipeline.py visualizacion              # las figuras y lo que necesiten
+#   python src/pipeline.py visualizacion.figura_3     # una sola figura
+#   python src/pipeline.py --forzar                   # sin usar la caché
+#   python src/pipeline.py --lotes 100000             # integración/limpieza por lotes
+#
+# Con ``--lotes`` la integración y la limpieza no cargan el dataset entero
+# (integrar_por_lotes, limpiar_por_lotes): no devuelven DataFrame y las etapas
+# siguientes leen su salida de disco.
+
+ruta_cache_etapas = os.path.join(integracion_datos.ruta_dataset, ".cache", "etapas")
+max_versiones = 5             # claves que se conservan por etapa
+
+
+@dataclass(frozen=True)
+class Etapa:
+    """Nodo del DAG: ``ejecutar`` recibe las salidas de ``depende_de``, en orden."""
+
+    nombre: str
+    ejecutar: Callable
+    depende_de: tuple[str, ...] = ()
+    ficheros: Callable[[], list[str]] = list      # entradas en disco ajenas al DAG
+    salidas: Callable[[], list[str]] = list       # ficheros que produce (se cachean)
+    recargar: Callable[[], object] | None = None  # salida desde disco si no se ejecuta
+    codigo: tuple = ()                            # funciones/módulos cuyo código la define
+    parametros: Callable[[], dict] = dict
+
+
+def hash_dataframe(df: pd.DataFrame) -> str:
+    """Hash del contenido y del esquema (columnas y tipos) de ``df``."""
+    h = hashlib.sha1()
+    h.update(repr([(c, str(t)) for c, t in df.dtypes.items()]).encode("utf-8"))
+    h.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return h.hexdigest()
+
+
+def hash_salida(salida, ficheros: list[str]) -> str | None:
+    """Hash de ``salida``; si la etapa no devolvió nada (modo por lotes), el de sus ``ficheros``."""
+    if isinstance(salida, pd.DataFrame):
+        return hash_dataframe(salida)
+    if salida is None and ficheros:
+        return hashlib.sha1("".join(hash_fichero(r) for r in ficheros).encode("utf-8")).hexdigest()
+    return None
+
+
+def necesarias(etapas: dict, objetivos: list[str]) -> set:
+    """Los ``objetivos`` y todas las etapas de las que dependen.
+
+    Un objetivo sin punto incluye todas sus sub-etapas (``visualizacion`` ->
+    ``visualizacion.figura_1``...).
+    """
+    pendientes = [n for n in etapas if n in objetivos or n.split(".")[0] in objetivos]
+    resultado = set()
+    while pendientes:
+        nombre = pendientes.pop()
+        if nombre not in resultado:
+            resultado.add(nombre)
+            pendientes.extend(etapas[nombre].depende_de)
+    return resultado
+
+
+def ejecutar_pipeline(etapas: list[Etapa], objetivos: list[str] | None = None,
+                      forzar: bool = False, cache: CacheEtapas | None = None) -> dict:
+    """Ejecuta el DAG y devuelve ``{etapa: (estado, segundos)}``.
+
+    ``estado`` es ``"ejecutada"``, ``"cacheada"`` (ficheros ya en disco) o
+    ``"restaurada"`` (alguno se copió de la caché); el tiempo de una etapa no
+    ejecutada incluye recargar su salida, si hizo falta.
+    """
+    cache = cache or CacheEtapas(ruta_cache_etapas, max_versiones)
+    por_nombre = {e.nombre: e for e in etapas}
+    incluidas = necesarias(por_nombre, objetivos or list(por_nombre))
+    orden = [n for n in TopologicalSorter({n: e.depende_de for n, e in por_nombre.items()}).static_order()
+             if n in incluidas]
+
+    salidas = {}       # nombre -> salida en memoria (o None si no se ha recargado)
+    hashes = {}        # nombre -> hash de la salida
+    informe = {}
+
+    def salida_de(nombre: str):
+        if salidas[nombre] is None and por_nombre[nombre].recargar:
+            inicio = time.perf_counter()
+            salidas[nombre] = por_nombre[nombre].recargar()
+            estado, segundos = informe[nombre]
+            informe[nombre] = (estado, segundos + time.perf_counter() - inicio)
+        return salidas[nombre]
+
+    for nombre in orden:
+        etapa = por_nombre[nombre]
+        inicio = time.perf_counter()
+        clave = clave_etapa(
+            nombre,
+            etapa.ficheros(),
+            {d: hashes[d] for d in etapa.depende_de},
+            hash_codigo(*etapa.codigo),
+            etapa.parametros(),
+        )
+        entrada = None if forzar else cache.buscar(nombre, clave)
+        if entrada is not None:
+            copiados = cache.restaurar(entrada)
+            estado = "restaurada" if copiados else "cacheada"
+            print(f"\n⏭️  [{nombre}] {estado}: sin cambios en entradas, código ni parámetros")
+            salidas[nombre], hashes[nombre] = None, entrada["salida"]
+            informe[nombre] = (estado, time.perf_counter() - inicio)
+            continue
+
+        print(f"\n▶️  [{nombre}]")
+        salida = etapa.ejecutar(*[salida_de(d) for d in etapa.depende_de])
+        salidas[nombre], hashes[nombre] = salida, hash_salida(salida, etapa.salidas())
+        # Se registra tras cada etapa: si una posterior falla, esta no se repite
+        cache.guardar(nombre, clave, etapa.salidas(), hashes[nombre])
+        informe[nombre] = ("ejecutada", time.perf_counter() - inicio)
+
+    return informe
+
+
+def salidas_entregable(ruta_csv: str, formato: str) -> list[str]:
+    """Ficheros que deja ``guardar_etapa(..., entregable=True)``: el CSV y, con
+    Feather, el Feather y la huella del CSV (se cachean y restauran juntos)."""
+    if formato_intermedio(formato) == "feather":
+        return [ruta_csv, ruta_columnar(ruta_csv), ruta_huella(ruta_csv)]
+    return [ruta_csv]
+
+
+def etapa_figura(numero: int, funcion: Callable) -> Etapa:
+    return Etapa(
+        f"visualizacion.figura_{numero}",
+        lambda df: funcion(visualizacion_datos.preparar(df), mostrar=False),
+        depende_de=("limpieza",),
+        salidas=lambda: [os.path.join(visualizacion_datos.output_folder,
+                                      visualizacion_datos.FIGURAS[numero - 1])],
+        codigo=(funcion, visualizacion_datos.preparar, visualizacion_datos._guardar_figura,
+                visualizacion_datos._terminar_figura, registro_modelos, seleccion_clusters,
+                clasificador_teletrabajo, carga_datos.proyectar, carga_datos.tipar),
+        parametros=lambda: {**visualizacion_datos.parametros(),
+                            "figura": visualizacion_datos.FIGURAS[numero - 1]},
+    )
+
+
+def integrar():
+    if integracion_datos.filas_lote:
+        return integracion_datos.integrar_por_lotes(filas_lote=integracion_datos.filas_lote)
+    return integracion_datos.integrar()
+
+
+def limpiar(df):
+    if data_cleaning.filas_lote:
+        return data_cleaning.limpiar_por_lotes(filas_lote=data_cleaning.filas_lote)
+    return data_cleaning.limpiar(df)
+
+
+def recargar(ruta_csv: str):
+    """Salida de una etapa no ejecutada.
+
+    En modo por lotes no se carga entera: limpiar_por_lotes, analizar y las
+    figuras leen de disco lo que necesitan.
+    """
+    return None if data_cleaning.filas_lote else cargar_mercado(ruta_csv, "limpieza")
+
+
+def ficheros_limpieza() -> list[str]:
+    """Con ``error_cuantiles``, el sketch KLL persistido (los cuartiles dependen de él).
+
+    La etapa también lo reescribe: tras ejecutarla, la siguiente clave ya usa
+    el sketch actualizado y vuelve a ser estable mientras no cambien los datos.
+    """
+    if data_cleaning.error_cuantiles and os.path.exists(data_cleaning.ruta_sketch):
+        return [data_cleaning.ruta_sketch]
+    return []
+
+
+def parametros_limpieza() -> dict:
+    """Parámetros de la limpieza; ``filas_lote`` (``--lotes``) solo con ``error_cuantiles``.
+
+    Con cuartiles exactos la salida por lotes es la misma que sin ellos
+    (limpiar_por_lotes), así que la clave deja fuera ``filas_lote`` a propósito
+    y una limpieza cacheada sirve para los dos modos. Con el sketch, los
+    cuartiles aproximados dependen de cómo se parte la entrada en lotes.
+    """
+    parametros = data_cleaning.parametros()
+    if data_cleaning.error_cuantiles:
+        parametros["filas_lote"] = data_cleaning.filas_lote
+    return parametros
+
+
+ETAPAS = [
+    Etapa(
+        "integracion",
+        integrar,
+        ficheros=integracion_datos.ficheros_entrada,
+        salidas=lambda: salidas_entregable(integracion_datos.ruta_salida, integracion_datos.formato_salida),
+        recargar=lambda: recargar(integracion_datos.ruta_salida),
+        codigo=(integrar, integracion_datos, carga_datos, limpieza_ubicacion, cache_normalizacion),
+        parametros=integracion_datos.parametros,
+    ),
+    Etapa(
+        "limpieza",
+        limpiar,
+        depende_de=("integracion",),
+        ficheros=ficheros_limpieza,
+        salidas=lambda: salidas_entregable(data_cleaning.nombre_salida, data_cleaning.formato_salida),
+        recargar=lambda: recargar(data_cleaning.nombre_salida),
+        codigo=(limpiar, data_cleaning, carga_datos, limpieza_ubicacion, sketch_cuantiles, cache_normalizacion),
+        parametros=parametros_limpieza,
+    ),
+    Etapa(
+        "analisis",
+        analisis_datos.analizar,
+        depende_de=("limpieza",),
+        salidas=lambda: [str(analisis_datos.fig_dir / f) for f in analisis_datos.FIGURAS],
+        codigo=(analisis_datos, registro_modelos, seleccion_clusters, clasificador_teletrabajo,
+                carga_datos.proyectar, carga_datos.tipar),
+        parametros=analisis_datos.parametros,
+    ),
+    *[etapa_figura(i, f) for i, f in enumerate(visualizacion_datos.FUNCIONES_FIGURA, start=1)],
+]
+
+
+def imprimir_informe(informe: dict) -> None:
+    ancho = max(len(n) for n in informe) + 2
+    print(f"\n{'etapa':<{ancho}}{'estado':<12}{'s':>8}")
+    for nombre, (estado, segundos) in informe.items():
+        print(f"{nombre:<{ancho}}{estado:<12}{segundos:>8.2f}")
+    print(f"{'total':<{ancho + 12}}{sum(s for _, s in informe.values()):>8.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pipeline integración -> limpieza -> análisis/figuras")
+    parser.add_argument("etapas", nargs="*", metavar="ETAPA",
+                        help=f"etapas a ejecutar (y las que necesiten); por defecto todas: "
+                             f"{', '.join(e.nombre for e in ETAPAS)}")
+    parser.add_argument("--forzar", action="store_true",
+                        help="ejecuta las etapas aunque estén en la caché")
+    parser.add_argument("--lotes", type=int, metavar="FILAS",
+                        help="integración y limpieza por lotes de FILAS filas, sin cargar el dataset entero")
+    args = parser.parse_args()
+    conocidas = {e.nombre for e in ETAPAS} | {e.nombre.split(".")[0] for e in ETAPAS}
+    desconocidas = set(args.etapas) - conocidas
+    if desconocidas:
+        parser.error(f"etapas desconocidas: {', '.join(sorted(desconocidas))}")
+
+    if args.lotes:
+        integracion_datos.filas_lote = data_cleaning.filas_lote = args.lotes
+    imprimir_informe(ejecutar_pipeline(ETAPAS, args.etapas, forzar=args.forzar))
@@ -0,0 +1,75 @@
+import re
+from dataclasses import dataclass
+from urllib.parse import quote_plus
+
+# ==========================================
+# PLAN DE CRAWL (KEYWORDS x UBICACIONES x PAÍSES)
+# ==========================================
+# Una búsqueda ya no es un par de globales fijo: el plan es la matriz de
+# keywords x ubicaciones x países, expandida en una lista de tareas sin
+# repetidos que consumen los workers del scraper. Cada tarea recorre las
+# páginas de una búsqueda en un país; las ofertas que salen en varias
+# búsquedas se deduplican por ``data-jk`` en el escritor (escritura_ofertas.py)
+# y conservan la primera consulta que las encontró.
+
+_patron_espacios = re.compile(r"\s+")
+
+
+def normalizar_consulta(texto: str) -> str:
+    """``"  Data   Analyst "`` -> ``"data analyst"`` (clave de deduplicación)."""
+    return _patron_espacios.sub(" ", texto or "").strip().lower()
+
+
+@dataclass(frozen=True)
+class TareaCrawl:
+    """Una búsqueda (keyword + ubicación) en el dominio de un país."""
+
+    keyword: str
+    location: str
+    pais: str
+    dominio_base: str
+
+    @property
+    def consulta(self) -> tuple[str, str]:
+        return (self.keyword, self.location)
+
+    @property
+    def etiqueta(self) -> str:
+        # Prefijo de los logs: "ES" con una sola búsqueda sería ambiguo
+        if self.location:
+            return f"{self.pais}·{self.keyword}@{self.location}"
+        return f"{self.pais}·{self.keyword}"
+
+    def url(self, start: int) -> str:
+        return (f"{self.dominio_base}/jobs?q={quote_plus(self.keyword)}"
+                f"&l={quote_plus(self.location)}&start={start}")
+
+
+def _sin_repetidos(valores: list[str]) -> list[str]:
+    vistos = {}
+    for valor in valores:
+        clave = normalizar_consulta(valor)
+        # Se conserva la primera grafía; la clave solo decide si es repetido
+        vistos.setdefault(clave, _patron_espacios.sub(" ", valor or "").strip())
+    return list(vistos.values())
+
+
+def expandir_plan(keywords: list[str], locations: list[str], paises: dict) -> list[TareaCrawl]:
+    """Expande la matriz en tareas únicas, alternando países en la cola.
+
+    El orden es keyword -> ubicación -> país, de modo que tareas consecutivas
+    van a dominios distintos y los workers no se pisan el limitador de ritmo.
+    """
+    tareas = []
+    for keyword in _sin_repetidos(keywords):
+        if not keyword:
+            continue
+        for location in _sin_repetidos(locations or [""]):
+            for codigo_pais, dominio_base in paises.items():
+                tareas.append(TareaCrawl(keyword, location, codigo_pais, dominio_base))
+    return tareas
+
+
+def consultas_de(tareas: list[TareaCrawl]) -> list[tuple[str, str]]:
+    """Búsquedas distintas del plan (una por checkpoint), en orden."""
+    return list(dict.fromkeys(tarea.consulta for tarea in tareas))
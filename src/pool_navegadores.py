@@ -0,0 +1,259 @@
+import json
+import os
+import platform
+import queue
+import re
+import shutil
+import ssl
+import subprocess
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import psutil
+except ImportError:  # Opcional: sin psutil solo se recicla por nº de páginas
+    psutil = None
+
+# ==========================================
+# POOL DE SESIONES DE NAVEGADOR
+# ==========================================
+# - Los drivers se crean al pedir la primera página, nunca al importar.
+# - La versión de Chrome detectada y el chromedriver ya parcheado por uc se
+#   guardan en disco (``dir_cache``) para no repetir detección ni descarga.
+# - Cada hueco del pool tiene su propio perfil persistente (cookies, caché)
+#   que se reutiliza entre ejecuciones.
+# - Una sesión se recicla tras ``paginas_por_sesion`` páginas o si el árbol de
+#   procesos del navegador supera ``max_rss_mb``.
+
+TTL_VERSION = 7 * 24 * 3600  # Chrome se actualiza solo: se re-detecta cada semana
+
+
+def detectar_version_chrome() -> int | None:
+    """Devuelve la versión mayor de Chrome instalada (ej. 142) si se puede detectar."""
+    version_env = os.getenv("CHROME_VERSION" ) or os.getenv("CHROME_VERSION_MAIN")
+    if version_env:
+        try:
+            return int(version_env.split(".")[0])
+        except ValueError:
+            pass
+
+    if platform.system() == "Windows":
+        claves = [
+            r"HKEY_CURRENT_USER\Software\Google\Chrome\BLBeacon",
+            r"HKEY_LOCAL_MACHINE\Software\Google\Chrome\BLBeacon",
+        ]
+        for clave in claves:
+            try:
+                salida = subprocess.check_output(
+                    ["reg", "query", clave, "/v", "version"],
+                    encoding="utf-8",
+                    errors="ignore",
+                )
+                coincidencia = re.search(r"(\d+\.\d+\.\d+\.\d+)", salida)
+                if coincidencia:
+                    return int(coincidencia.group(1).split(".")[0])
+            except (subprocess.CalledProcessError, FileNotFoundError):
+                continue
+    return None
+
+
+@contextmanager
+def _ssl_sin_verificar():
+    """Parche SSL (para Mac OS) solo mientras uc descarga/parchea chromedriver.
+
+    uc descarga con urllib y el contexto HTTPS por defecto; en Mac OS sin los
+    certificados instalados falla. Se restaura al salir, así que el resto del
+    proceso (p. ej. FetcherHTTP) sigue verificando certificados.
+    """
+    original = ssl._create_default_https_context
+    ssl._create_default_https_context = ssl._create_unverified_context
+    try:
+        yield
+    finally:
+        ssl._create_default_https_context = original
+
+
+def _importar_uc():
+    try:
+        import undetected_chromedriver as uc
+    except ImportError as error:
+        raise RuntimeError(
+            "No se encontró undetected-chromedriver. "
+            "Instala el paquete manualmente con 'pip install undetected-chromedriver'."
+        ) from error
+    return uc
+
+
+class Sesion:
+    """Un hueco del pool: driver perezoso + contador de páginas."""
+
+    def __init__(self, pool: "PoolNavegadores", indice: int):
+        self.pool = pool
+        self.indice = indice
+        self.paginas = 0
+        self._driver = None
+
+    @property
+    def driver(self):
+        if self._driver is None:
+            self._driver = self.pool._crear_driver(self)
+            self.paginas = 0
+        return self._driver
+
+    def pagina_servida(self) -> None:
+        """Anota una página y recicla el driver si toca."""
+        self.paginas += 1
+        motivo = None
+        if self.paginas >= self.pool.paginas_por_sesion:
+            motivo = f"{self.paginas} páginas"
+        else:
+            rss = self.rss_mb()
+            if rss is not None and rss > self.pool.max_rss_mb:
+                motivo = f"{rss:.0f} MB de RSS"
+        if motivo:
+            print(f"   🔄 Reciclando sesión {self.indice} ({motivo})")
+            self.cerrar()
+
+    def rss_mb(self) -> float | None:
+        """Memoria residente del navegador y sus procesos hijos (requiere psutil)."""
+        if psutil is None or self._driver is None:
+            return None
+        try:
+            proceso = psutil.Process(self._driver.browser_pid)
+            procesos = [proceso] + proceso.children(recursive=True)
+            return sum(p.memory_info().rss for p in procesos) / 1e6
+        except (AttributeError, psutil.Error):
+            return None
+
+    def cerrar(self) -> None:
+        if self._driver is not None:
+            try:
+                self._driver.quit()
+            except Exception:
+                pass
+            self._driver = None
+
+
+class PoolNavegadores:
+    """Conjunto acotado de sesiones de navegador reutilizables entre países."""
+
+    def __init__(
+        self,
+        tamano: int,
+        dir_cache: str,
+        headless: bool = False,
+        paginas_por_sesion: int = 50,
+        max_rss_mb: float = 1500,
+        argumentos: list | None = None,
+    ):
+        self.dir_cache = dir_cache
+        self.headless = headless
+        self.paginas_por_sesion = paginas_por_sesion
+        self.max_rss_mb = max_rss_mb
+        self.argumentos = argumentos or [
+            "--window-size=1920,1080",
+            "--disable-popup-blocking",
+        ]
+        self._ruta_config = os.path.join(dir_cache, "navegador.json")
+        self._lock = threading.Lock()
+        self._config = None
+        self._libres = queue.Queue()
+        self._sesiones = [Sesion(self, i) for i in range(max(1, tamano))]
+        for sesion in self._sesiones:
+            self._libres.put(sesion)
+
+    # --- caché en disco -------------------------------------------------
+
+    def _cargar_config(self) -> dict:
+        if self._config is not None:
+            return self._config
+        config = {}
+        if os.path.exists(self._ruta_config):
+            with open(self._ruta_config, "r", encoding="utf-8") as f:
+                config = json.load(f)
+        if time.time() - config.get("detectado", 0) > TTL_VERSION:
+            version = detectar_version_chrome()
+            if version != config.get("version_main"):
+                # Chrome ha cambiado: el chromedriver cacheado ya no sirve
+                config.pop("driver", None)
+            config["version_main"] = version
+            config["detectado"] = time.time()
+            self._guardar_config(config)
+        if config.get("version_main"):
+            print(f"Usando Chrome versión {config['version_main']} (caché: {self._ruta_config})")
+        else:
+            print("No se pudo detectar la versión de Chrome; se usará la predeterminada de uc")
+        self._config = config
+        return config
+
+    def _guardar_config(self, config: dict) -> None:
+        os.makedirs(self.dir_cache, exist_ok=True)
+        with open(self._ruta_config, "w", encoding="utf-8") as f:
+            json.dump(config, f, indent=2)
+
+    # --- creación de drivers --------------------------------------------
+
+    def _crear_driver(self, sesion: Sesion):
+        # uc parchea el binario de chromedriver al arrancar: si dos hilos lo
+        # hacen a la vez se pisan el fichero, así que la creación se serializa.
+        with self._lock:
+            uc = _importar_uc()
+            config = self._cargar_config()
+
+            options = uc.ChromeOptions()
+            for argumento in self.argumentos:
+                options.add_argument(argumento)
+
+            perfil = os.path.join(self.dir_cache, "perfiles", f"sesion-{sesion.indice}")
+            os.makedirs(perfil, exist_ok=True)
+            driver_kwargs = {
+                "options": options,
+                "user_data_dir": perfil,   # perfil caliente entre ejecuciones
+                "headless": self.headless,
+            }
+            if config.get("version_main"):
+                driver_kwargs["version_main"] = config["version_main"]
+            driver_cache = config.get("driver")
+            if driver_cache and os.path.exists(driver_cache):
+                driver_kwargs["driver_executable_path"] = driver_cache
+
+            inicio = time.perf_counter()
+            with _ssl_sin_verificar():
+                driver = uc.Chrome(**driver_kwargs)
+            print(f"   🚀 Sesión {sesion.indice} lista en {time.perf_counter() - inicio:.1f}s")
+
+            if "driver_executable_path" not in driver_kwargs:
+                self._cachear_driver(driver, config)
+            return driver
+
+    def _cachear_driver(self, driver, config: dict) -> None:
+        """Copia el chromedriver parcheado para no re-descargarlo la próxima vez."""
+        try:
+            origen = driver.patcher.executable_path
+        except AttributeError:
+            return
+        destino = os.path.join(self.dir_cache, "driver", os.path.basename(origen))
+        os.makedirs(os.path.dirname(destino), exist_ok=True)
+        shutil.copy2(origen, destino)
+        config["driver"] = destino
+        self._guardar_config(config)
+
+    # --- uso ------------------------------------------------------------
+
+    @contextmanager
+    def sesion(self):
+        """Presta una sesión libre (bloquea si están todas en uso)."""
+        sesion = self._libres.get()
+        try:
+            yield sesion
+        except Exception:
+            # Un driver que ha fallado no se devuelve caliente al pool
+            sesion.cerrar()
+            raise
+        finally:
+            self._libres.put(sesion)
+
+    def cerrar(self) -> None:
+        for sesion in self._sesiones:
+            sesion.cerrar()
@@ -0,0 +1,195 @@
+import argparse
+import http.server
+import io
+import json
+import sys
+import threading
+import time
+
+import pandas as pd
+
+import registro_modelos
+from carga_datos import COLUMNAS_ETAPA, ESQUEMA_INDEED, FILAS_LOTE
+
+# ==========================================
+# PUNTUACIÓN DE OFERTAS NUEVAS (TELETRABAJO)
+# ==========================================
+# Probabilidad de teletrabajo de ofertas con el esquema del scraper
+# (indeed_global_final.csv) sin repetir el análisis: el pipeline entrenado
+# (codificador + Random Forest, registro_modelos.py) se carga una sola vez y
+# las ofertas se puntúan por lotes de ``filas_lote`` filas. Las variables se
+# calculan vectorizadas por lote, como en la integración y la limpieza:
+# ``desc_longitud`` numérica (0 si no lo es), ``titulo_len`` del título
+# normalizado y ``pais`` sin espacios.
+#
+# Por defecto usa los últimos modelos registrados (``--modelo`` elige una clave).
+# La salida es un CSV con ``COLUMNAS_ID``, ``prob_teletrabajo`` y
+# ``pred_teletrabajo``. Al terminar se informa de las filas por segundo.
+#
+# Uso (desde la raíz del proyecto):
+#   python src/puntuar_ofertas.py ofertas.csv -o predicciones.csv
+#   cat ofertas.csv | python src/puntuar_ofertas.py - > predicciones.csv
+#   python src/puntuar_ofertas.py --servir --puerto 8766
+#
+# Con ``--servir`` queda como proceso local de larga duración (el modelo se
+# carga una vez): ``POST /puntuar`` con el CSV en el cuerpo devuelve el CSV de
+# predicciones y ``GET /estado`` las filas puntuadas y su ritmo, en JSON.
+
+COLUMNAS_ID = ['url', 'titulo', 'empresa', 'pais']
+COLUMNAS_NECESARIAS = ['titulo', 'pais', 'desc_longitud']
+
+
+def leer_lotes(fuente, filas_lote: int = FILAS_LOTE):
+    """Lotes del CSV del scraper desde una ruta o un fichero abierto (generador)."""
+    columnas = COLUMNAS_ETAPA["integracion"]
+    tipos = {c: t for c, t in ESQUEMA_INDEED.items() if c in columnas}
+    with pd.read_csv(
+        fuente,
+        usecols=lambda c: c in columnas,
+        dtype=tipos,
+        engine="c",
+        encoding="utf-8-sig",
+        on_bad_lines="warn",
+        chunksize=filas_lote,
+    ) as lector:
+        for lote in lector:
+            faltan = [c for c in COLUMNAS_NECESARIAS if c not in lote.columns]
+            if faltan:
+                raise ValueError(f"Faltan columnas del esquema de Indeed: {faltan}")
+            yield lote
+
+
+def caracteristicas(lote: pd.DataFrame) -> pd.DataFrame:
+    """Variables de entrada del RF (``clasificador_teletrabajo.COLUMNAS``) de un lote."""
+    titulo = lote['titulo'].fillna('Sin Título').str.strip().str.title()
+    return pd.DataFrame({
+        'desc_longitud': pd.to_numeric(lote['desc_longitud'], errors='coerce').fillna(0).astype("float64"),
+        'titulo_len': titulo.str.len(),
+        'pais': lote['pais'].str.strip(),
+    }, index=lote.index)
+
+
+class Puntuador:
+    """Pipeline del RF cargado una vez y contadores de lo puntuado."""
+
+    def __init__(self, modelos: registro_modelos.Modelos):
+        self.modelos = modelos
+        self._indice_true = list(modelos.rf.classes_).index(True)
+        self._lock = threading.Lock()
+        self.filas = 0
+        self.segundos = 0.0
+
+    @classmethod
+    def desde_registro(cls, clave: str | None = None) -> "Puntuador":
+        modelos = registro_modelos.cargar(clave) if clave else registro_modelos.cargar_ultimo()
+        if modelos is None:
+            raise FileNotFoundError("No hay modelos en el registro: ejecuta antes src/analisis_datos.py")
+        return cls(modelos)
+
+    @property
+    def filas_por_segundo(self) -> float:
+        return self.filas / self.segundos if self.segundos else 0.0
+
+    def puntuar(self, lote: pd.DataFrame) -> pd.DataFrame:
+        inicio = time.perf_counter()
+        prob = self.modelos.rf.predict_proba(caracteristicas(lote))[:, self._indice_true]
+        salida = lote.reindex(columns=COLUMNAS_ID)
+        salida['prob_teletrabajo'] = prob
+        # Como ``predict``: en caso de empate gana la primera clase (False)
+        salida['pred_teletrabajo'] = prob > 0.5
+        with self._lock:
+            self.filas += len(lote)
+            self.segundos += time.perf_counter() - inicio
+        return salida
+
+    def puntuar_csv(self, fuente, destino, filas_lote: int = FILAS_LOTE) -> tuple[int, float]:
+        """Puntúa el CSV ``fuente`` y escribe las predicciones en ``destino`` (abierto).
+
+        Devuelve (filas, segundos) de esta llamada, incluidas lectura y escritura.
+        """
+        inicio = time.perf_counter()
+        filas = 0
+        for lote in leer_lotes(fuente, filas_lote):
+            self.puntuar(lote).to_csv(destino, index=False, header=filas == 0)
+            filas += len(lote)
+        return filas, time.perf_counter() - inicio
+
+
+def servir(puntuador: Puntuador, puerto: int, filas_lote: int = FILAS_LOTE) -> None:
+    class ManejadorPuntuacion(http.server.BaseHTTPRequestHandler):
+        def _responder(self, codigo: int, cuerpo: bytes, tipo: str) -> None:
+            self.send_response(codigo)
+            self.send_header("Content-Type", tipo)
+            self.send_header("Content-Length", str(len(cuerpo)))
+            self.end_headers()
+            self.wfile.write(cuerpo)
+
+        def do_GET(self):
+            if self.path != "/estado":
+                self._responder(404, b"not found", "text/plain")
+                return
+            estado = {"modelo": puntuador.modelos.clave, "filas": puntuador.filas,
+                      "segundos": puntuador.segundos, "filas_por_segundo": puntuador.filas_por_segundo}
+            self._responder(200, json.dumps(estado).encode("utf-8"), "application/json")
+
+        def do_POST(self):
+            if self.path != "/puntuar":
+                self._responder(404, b"not found", "text/plain")
+                return
+            cuerpo = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            salida = io.StringIO()
+            try:
+                filas, segundos = puntuador.puntuar_csv(io.BytesIO(cuerpo), salida, filas_lote)
+            except (ValueError, pd.errors.ParserError) as e:
+                self._responder(400, str(e).encode("utf-8"), "text/plain; charset=utf-8")
+                return
+            self.log_message("%d filas en %.3fs", filas, segundos)
+            self._responder(200, salida.getvalue().encode("utf-8"), "text/csv; charset=utf-8")
+
+    servidor = http.server.ThreadingHTTPServer(("127.0.0.1", puerto), ManejadorPuntuacion)
+    print(f"[INFO] Modelo {puntuador.modelos.clave[:12]} cargado; sirviendo en http://127.0.0.1:{puerto}",
+          file=sys.stderr)
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servidor.server_close()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Probabilidad de teletrabajo de ofertas nuevas")
+    parser.add_argument("entrada", nargs="?", help="CSV con el esquema de Indeed ('-' = entrada estándar)")
+    parser.add_argument("-o", "--salida", default="-", help="CSV de predicciones ('-' = salida estándar)")
+    parser.add_argument("--modelo", default=None, help="clave del registro (por defecto, el último)")
+    parser.add_argument("--filas-lote", type=int, default=FILAS_LOTE)
+    parser.add_argument("--servir", action="store_true", help="proceso local de larga duración (HTTP)")
+    parser.add_argument("--puerto", type=int, default=8766)
+    args = parser.parse_args()
+    if not args.servir and args.entrada is None:
+        parser.error("indica un CSV de entrada o --servir")
+
+    try:
+        puntuador = Puntuador.desde_registro(args.modelo)
+    except FileNotFoundError as e:
+        print(f"[ERROR] {e}", file=sys.stderr)
+        return 1
+    if args.servir:
+        servir(puntuador, args.puerto, args.filas_lote)
+        return 0
+
+    # En binario: el CSV del scraper puede traer BOM (utf-8-sig)
+    fuente = sys.stdin.buffer if args.entrada == "-" else args.entrada
+    if args.salida == "-":
+        filas, segundos = puntuador.puntuar_csv(fuente, sys.stdout, args.filas_lote)
+    else:
+        with open(args.salida, "w", encoding="utf-8", newline="") as destino:
+            filas, segundos = puntuador.puntuar_csv(fuente, destino, args.filas_lote)
+    # Los mensajes van a stderr para no mezclarse con el CSV en la salida estándar
+    print(f"[OK] {filas} ofertas puntuadas en {segundos:.2f}s ({filas / max(segundos, 1e-9):,.0f} filas/s; "
+          f"modelo: {puntuador.filas_por_segundo:,.0f} filas/s)", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,223 @@
+import hashlib
+import json
+import os
+import shutil
+import time
+from dataclasses import dataclass, field
+
+import joblib
+import numpy as np
+import pandas as pd
+import sklearn
+from sklearn.cluster import KMeans, MiniBatchKMeans
+from sklearn.metrics import accuracy_score
+from sklearn.model_selection import train_test_split
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+
+import clasificador_teletrabajo
+import seleccion_clusters
+from cache_etapas import hash_codigo
+from clasificador_teletrabajo import COLUMNAS as COLUMNAS_RF
+from seleccion_clusters import COLUMNAS_CLUSTER, COLUMNA_COSTE, crear_modelo, deduplicar, roles_por_coste
+
+# ==========================================
+# REGISTRO DE MODELOS (ENTRENAR UNA VEZ)
+# ==========================================
+# analisis_datos.py y visualizacion_datos.py usan los mismos modelos: el
+# StandardScaler + KMeans de los clusters económicos y el Random Forest del
+# teletrabajo (con su codificador, clasificador_teletrabajo.py). Se entrenan
+# una sola vez (``entrenar``) y se guardan con lo necesario para usarlos: el
+# papel de cada cluster y las columnas codificadas del RF.
+#
+#   <ruta_registro>/<clave>/modelos.joblib -> Modelos
+#   <ruta_registro>/<clave>/meta.json      -> parámetros, métricas, versiones
+#
+# La clave es un hash de las columnas del dataset que usan los modelos, de
+# los parámetros, del código de ``entrenar`` y de la versión de scikit-learn.
+# ``obtener_modelos`` carga los de la clave si están y solo si no, entrena y
+# los registra: regenerar una figura no ajusta ningún modelo. Se conservan las
+# ``max_versiones`` claves usadas más recientemente.
+#
+# Con ``n_clusters = None`` el k y la semilla de K-Means se eligen con la
+# búsqueda de seleccion_clusters.py (silueta/inercia en paralelo).
+
+ruta_registro = os.path.join("dataset", ".cache", "modelos")
+max_versiones = 5
+
+# Parámetros de los modelos
+n_clusters = 3                # None: se elige con seleccion_clusters.buscar
+algoritmo_kmeans = "kmeans"   # "kmeans" | "minibatch" | "auto" (seleccion_clusters.py)
+rango_k = (2, 8)              # k y semillas que se evalúan si n_clusters es None
+semillas_k = 5
+workers_k = None
+n_init = 10
+n_estimators = None           # None: se añaden árboles hasta que el score OOB se estanca
+n_folds = 5                   # validación cruzada estratificada del RF
+n_jobs = -1                   # procesos de la validación cruzada y del ajuste final del RF
+test_size = 0.2
+random_state = 42
+
+OBJETIVO_RF = 'es_teletrabajo'
+# Columnas del dataset de las que dependen los modelos (entran en la clave)
+COLUMNAS_ENTRADA = [*COLUMNAS_CLUSTER, 'desc_longitud', 'titulo', 'pais', OBJETIVO_RF]
+
+
+def parametros() -> dict:
+    return {"n_clusters": n_clusters, "algoritmo_kmeans": algoritmo_kmeans, "rango_k": list(rango_k),
+            "semillas_k": semillas_k, "n_init": n_init, "n_estimators": n_estimators, "n_folds": n_folds,
+            "test_size": test_size, "random_state": random_state}
+
+
+@dataclass
+class Modelos:
+    """Modelos entrenados y lo necesario para aplicarlos a un DataFrame."""
+
+    scaler: StandardScaler
+    kmeans: KMeans | MiniBatchKMeans
+    rf: Pipeline                  # codificador + RandomForestClassifier
+    roles_cluster: dict           # etiqueta de KMeans -> papel (seleccion_clusters.roles_por_coste)
+    columnas_rf: list             # columnas codificadas que ve el RF, en orden
+    clave: str = ""
+    metricas: dict = field(default_factory=dict)
+
+    def etiquetas_cluster(self, df: pd.DataFrame) -> np.ndarray:
+        # Se predice cada vector distinto una vez y se reparte a sus filas
+        unicos, _, inversa = deduplicar(df[COLUMNAS_CLUSTER])
+        return self.kmeans.predict(self.scaler.transform(unicos))[inversa]
+
+    def importancias(self) -> pd.Series:
+        return pd.Series(self.rf["rf"].feature_importances_, index=self.columnas_rf)
+
+
+def matriz_rf(df: pd.DataFrame) -> pd.DataFrame:
+    """Variables de entrada del RF (sin codificar: eso lo hace el pipeline)."""
+    if 'titulo_len' not in df.columns:
+        df = df.assign(titulo_len=df['titulo'].str.len())
+    return df[COLUMNAS_RF]
+
+
+def particion_rf(X: pd.DataFrame, y: pd.Series) -> list:
+    """Split train/test del RF (el mismo en el entrenamiento y en la evaluación)."""
+    return train_test_split(X, y, test_size=test_size, random_state=random_state)
+
+
+def entrenar(df: pd.DataFrame) -> Modelos:
+    """Ajusta los modelos sobre ``df`` (el único sitio donde se entrenan)."""
+    # Clustering económico: escalado + K-Means (con k fijo o el de la búsqueda)
+    # sobre los vectores distintos, cada uno con el peso de sus filas
+    unicos, pesos, _ = deduplicar(df[COLUMNAS_CLUSTER])
+    scaler = StandardScaler().fit(unicos, sample_weight=pesos)
+    X_scaled = scaler.transform(unicos)
+    metricas = {}
+    if n_clusters is None:
+        busqueda = seleccion_clusters.buscar(X_scaled, range(rango_k[0], rango_k[1] + 1), range(semillas_k),
+                                             algoritmo_kmeans, workers_k, pesos)
+        k, semilla = seleccion_clusters.mejor_config(busqueda)
+        kmeans = crear_modelo(k, semilla, algoritmo_kmeans, n_init=1, n_puntos=len(unicos))
+        metricas.update({"k": k, "semilla_k": semilla})
+    else:
+        kmeans = crear_modelo(n_clusters, random_state, algoritmo_kmeans, n_init=n_init, n_puntos=len(unicos))
+    etiquetas = kmeans.fit(X_scaled, sample_weight=pesos).labels_
+
+    # Papel de cada cluster (Lógica de Negocio): menor coste de vida = eficiente,
+    # mayor = caro, los intermedios = resto. Media de las filas = media ponderada
+    ponderado = pd.DataFrame({"coste": unicos[COLUMNA_COSTE] * pesos, "filas": pesos}).groupby(etiquetas).sum()
+    roles = roles_por_coste(ponderado["coste"] / ponderado["filas"])
+
+    # Random Forest del teletrabajo, sobre el split de entrenamiento (con
+    # validación cruzada; Balanced para detectar la clase minoritaria)
+    X = matriz_rf(df)
+    X_train, X_test, y_train, y_test = particion_rf(X, df[OBJETIVO_RF])
+    rf, metricas_rf = clasificador_teletrabajo.entrenar(X_train, y_train, n_estimators, n_folds,
+                                                        random_state, n_jobs)
+    metricas.update(metricas_rf)
+
+    metricas["accuracy"] = float(accuracy_score(y_test, rf.predict(X_test)))
+    columnas = list(rf["codificador"].get_feature_names_out())
+    return Modelos(scaler, kmeans, rf, roles, columnas, metricas=metricas)
+
+
+# ==========================================
+# PERSISTENCIA
+# ==========================================
+
+def clave_modelos(df: pd.DataFrame) -> str:
+    datos = df[COLUMNAS_ENTRADA]
+    h = hashlib.sha1()
+    h.update(repr([(c, str(t)) for c, t in datos.dtypes.items()]).encode("utf-8"))
+    h.update(pd.util.hash_pandas_object(datos, index=False).to_numpy().tobytes())
+    version = {**parametros(), "codigo": hash_codigo(entrenar, matriz_rf, particion_rf, seleccion_clusters,
+                                                clasificador_teletrabajo),
+               "sklearn": sklearn.__version__}
+    h.update(json.dumps(version, sort_keys=True).encode("utf-8"))
+    return h.hexdigest()
+
+
+def _directorio(clave: str) -> str:
+    return os.path.join(ruta_registro, clave)
+
+
+def cargar(clave: str) -> Modelos | None:
+    """Modelos registrados con ``clave`` (o None si no están o no se pueden leer)."""
+    ruta = os.path.join(_directorio(clave), "modelos.joblib")
+    try:
+        modelos = joblib.load(ruta)
+    except (FileNotFoundError, EOFError, ValueError, AttributeError, ImportError):
+        return None
+    # La poda conserva los usados más recientemente
+    os.utime(_directorio(clave))
+    return modelos
+
+
+def cargar_ultimo() -> Modelos | None:
+    """Los modelos registrados o usados más recientemente (p. ej. para puntuar ofertas nuevas)."""
+    try:
+        versiones = [n for n in os.listdir(ruta_registro) if not n.endswith(".tmp")]
+    except FileNotFoundError:
+        return None
+    for clave in sorted(versiones, key=lambda n: os.path.getmtime(_directorio(n)), reverse=True):
+        modelos = cargar(clave)
+        if modelos is not None:
+            return modelos
+    return None
+
+
+def guardar(modelos: Modelos) -> str:
+    directorio = _directorio(modelos.clave)
+    temporal = f"{directorio}.tmp"
+    shutil.rmtree(temporal, ignore_errors=True)
+    os.makedirs(temporal)
+    joblib.dump(modelos, os.path.join(temporal, "modelos.joblib"))
+    with open(os.path.join(temporal, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump({"clave": modelos.clave, "creado": time.time(), "parametros": parametros(),
+                   "sklearn": sklearn.__version__, "metricas": modelos.metricas,
+                   "roles_cluster": modelos.roles_cluster, "columnas_rf": modelos.columnas_rf}, f, indent=2)
+    shutil.rmtree(directorio, ignore_errors=True)
+    os.replace(temporal, directorio)
+    _podar()
+    return directorio
+
+
+def _podar() -> None:
+    versiones = sorted(
+        (os.path.join(ruta_registro, n) for n in os.listdir(ruta_registro) if not n.endswith(".tmp")),
+        key=os.path.getmtime,
+        reverse=True,
+    )
+    for directorio in versiones[max_versiones:]:
+        shutil.rmtree(directorio, ignore_errors=True)
+
+
+def obtener_modelos(df: pd.DataFrame) -> Modelos:
+    """Modelos para ``df``: del registro si ya se entrenaron; si no, se entrenan y registran."""
+    clave = clave_modelos(df)
+    modelos = cargar(clave)
+    if modelos is not None:
+        print(f"[INFO] Modelos cargados del registro ({clave[:12]})")
+        return modelos
+    print(f"[INFO] Entrenando modelos ({clave[:12]})...")
+    modelos = entrenar(df)
+    modelos.clave = clave
+    guardar(modelos)
+    return modelos
@@ -0,0 +1,266 @@
+import argparse
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import product
+
+import numpy as np
+import pandas as pd
+import sklearn
+from sklearn.cluster import KMeans, MiniBatchKMeans
+from sklearn.metrics import pairwise_distances_chunked, silhouette_score
+from sklearn.preprocessing import StandardScaler
+from threadpoolctl import threadpool_limits
+
+# ==========================================
+# SELECCIÓN DE K PARA EL CLUSTERING ECONÓMICO
+# ==========================================
+# Evalúa en paralelo (un proceso por configuración) cada combinación de k y
+# semilla de inicialización sobre las variables estandarizadas del clustering,
+# con inercia y silueta. Cada configuración es un ajuste con una sola
+# inicialización: para cada k se queda la semilla de menor inercia (lo mismo
+# que haría ``n_init``) y se elige el k de mayor silueta. Reajustar con
+# ``crear_modelo(k, semilla, n_init=1)`` reproduce exactamente el ganador.
+#
+# Los resultados se cachean por configuración en ``ruta_cache`` (clave: datos,
+# k, semilla, algoritmo y versión de scikit-learn): ampliar el rango de k o de
+# semillas solo ajusta las configuraciones nuevas.
+#
+# ``algoritmo`` es "kmeans", "minibatch" (MiniBatchKMeans, para muchas filas)
+# o "auto" (MiniBatchKMeans a partir de ``umbral_minibatch`` puntos). Los
+# puntos son los que ve el ajuste: con ``deduplicar``, los vectores distintos
+# y no las ofertas que representan.
+#
+# Las dos variables son constantes por país: millones de ofertas se quedan en
+# unos pocos puntos distintos. ``deduplicar`` reduce las filas a sus vectores
+# distintos con su número de repeticiones como peso (``sample_weight``); el
+# ajuste sobre ellos es el mismo que sobre las filas (misma inercia, misma
+# partición) y su coste ya no depende del número de ofertas. Las etiquetas se
+# devuelven a cada fila con el índice inverso.
+#
+# Uso (desde la raíz del proyecto):
+#   python src/seleccion_clusters.py [--k 2 8] [--semillas 5] [--workers 4] [--algoritmo auto]
+
+ruta_fichero = "dataset/Global Data Analyst Job Market_Clean.csv"
+ruta_cache = os.path.join("dataset", ".cache", "seleccion_clusters.json")
+
+COLUMNAS_CLUSTER = ['salario_real_ajustado', 'indice_coste_vida_2024']
+COLUMNA_COSTE = 'indice_coste_vida_2024'
+
+umbral_minibatch = 100_000     # puntos a partir de los que "auto" usa MiniBatchKMeans
+tam_lote_minibatch = 4096
+muestra_silueta = 10_000       # la silueta es O(n²): por encima se estima con una muestra
+memoria_silueta_mb = 64        # bloque de distancias por proceso en silueta_ponderada
+
+
+def crear_modelo(k: int, semilla: int, algoritmo: str = "kmeans", n_init: int = 1,
+                 n_puntos: int = 0) -> KMeans | MiniBatchKMeans:
+    if algoritmo == "auto":
+        algoritmo = "minibatch" if n_puntos >= umbral_minibatch else "kmeans"
+    if algoritmo == "minibatch":
+        return MiniBatchKMeans(n_clusters=k, random_state=semilla, n_init=n_init, batch_size=tam_lote_minibatch)
+    if algoritmo == "kmeans":
+        return KMeans(n_clusters=k, random_state=semilla, n_init=n_init)
+    raise ValueError(f"Algoritmo de clustering desconocido: {algoritmo!r}")
+
+
+def deduplicar(df: pd.DataFrame) -> tuple[pd.DataFrame, np.ndarray, np.ndarray]:
+    """(vectores distintos de ``df``, filas que tiene cada uno, vector de cada fila).
+
+    Los vectores van en orden de aparición; ``unicos.iloc[inversa]`` reconstruye ``df``.
+    """
+    grupos = df.groupby(list(df.columns), sort=False, dropna=False)
+    inversa = grupos.ngroup().to_numpy()
+    tamanos = grupos.size()
+    return tamanos.index.to_frame(index=False), tamanos.to_numpy(dtype="float64"), inversa
+
+
+# ==========================================
+# NOMBRES DE LOS CLUSTERS
+# ==========================================
+
+def roles_por_coste(coste_medio: pd.Series) -> dict:
+    """Papel de cada cluster según su coste de vida medio, para cualquier k.
+
+    El de menor coste es "eficiente", el de mayor "caro" y los intermedios
+    "resto" (si solo hay uno) o "resto_1", "resto_2"... de menor a mayor coste.
+    """
+    orden = [int(e) for e in coste_medio.sort_values(kind="stable").index]
+    if len(orden) < 2:
+        raise ValueError("Hacen falta al menos 2 clusters para asignar perfiles")
+    intermedios = orden[1:-1]
+    roles = {orden[0]: "eficiente", orden[-1]: "caro"}
+    if len(intermedios) == 1:
+        roles[intermedios[0]] = "resto"
+    else:
+        roles.update({e: f"resto_{i}" for i, e in enumerate(intermedios, start=1)})
+    return roles
+
+
+def nombres_cluster(roles: dict, nombres: dict) -> dict:
+    """Etiqueta de cluster -> nombre, con ``nombres`` por papel ("eficiente", "caro", "resto")."""
+    mapa = {}
+    for etiqueta, rol in roles.items():
+        base, _, numero = rol.partition("_")
+        mapa[etiqueta] = f"{nombres[base]} {numero}" if numero else nombres[base]
+    return mapa
+
+
+# ==========================================
+# BÚSQUEDA EN PARALELO
+# ==========================================
+
+def _hash_datos(X: np.ndarray, pesos: np.ndarray) -> str:
+    h = hashlib.sha1(np.ascontiguousarray(X, dtype="float64").tobytes())
+    h.update(np.ascontiguousarray(pesos, dtype="float64").tobytes())
+    return h.hexdigest()
+
+
+def _clave_config(hash_datos: str, k: int, semilla: int, algoritmo: str) -> str:
+    config = {"datos": hash_datos, "k": k, "semilla": semilla, "algoritmo": algoritmo,
+              "tam_lote": tam_lote_minibatch, "muestra_silueta": muestra_silueta,
+              "sklearn": sklearn.__version__}
+    return hashlib.sha1(json.dumps(config, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def silueta_ponderada(X: np.ndarray, etiquetas: np.ndarray, pesos: np.ndarray) -> float:
+    """``silhouette_score`` de las filas que representan ``X`` con sus ``pesos`` (repeticiones).
+
+    Exacta y en O(len(X)²) de tiempo: cada punto cuenta ``pesos`` veces en las
+    medias de distancias y en la media final; un cluster de una sola fila
+    puntúa 0. Las distancias se calculan por bloques de filas de como mucho
+    ``memoria_silueta_mb`` y solo se guardan sus sumas por cluster
+    (len(X) x k), no la matriz entera.
+    """
+    clusters, propio = np.unique(etiquetas, return_inverse=True)
+    miembros = propio[None, :] == np.arange(len(clusters))[:, None]
+    # Suma ponderada de distancias de cada punto a cada cluster y filas por cluster
+    pesos_cluster = (miembros * pesos).T
+    sumas = np.vstack(list(pairwise_distances_chunked(
+        X, reduce_func=lambda bloque, inicio: bloque @ pesos_cluster, working_memory=memoria_silueta_mb)))
+    filas = miembros @ pesos
+    filas_propio = filas[propio]
+    todos = np.arange(len(X))
+    # Las repeticiones del propio punto están a distancia 0 pero cuentan en la media
+    a = sumas[todos, propio] / np.maximum(filas_propio - 1, 1)
+    medias = sumas / filas
+    medias[todos, propio] = np.inf
+    b = medias.min(axis=1)
+    s = np.where(filas_propio > 1, (b - a) / np.maximum(np.maximum(a, b), np.finfo("float64").tiny), 0.0)
+    return float(np.average(s, weights=pesos))
+
+
+def evaluar_config(X: np.ndarray, k: int, semilla: int, algoritmo: str, pesos: np.ndarray | None = None) -> dict:
+    """Ajusta una configuración (una inicialización) y mide inercia y silueta.
+
+    Con ``pesos`` cada punto de ``X`` representa esas filas (``deduplicar``).
+    """
+    if pesos is None:
+        pesos = np.ones(len(X))
+    # Un hilo por proceso: el paralelismo está en los procesos
+    with threadpool_limits(1):
+        inicio = time.perf_counter()
+        modelo = crear_modelo(k, semilla, algoritmo, n_init=1, n_puntos=len(X))
+        modelo.fit(X, sample_weight=pesos)
+        segundos = time.perf_counter() - inicio
+        etiquetas = modelo.labels_
+        if len(np.unique(etiquetas)) < 2:
+            silueta = np.nan
+        elif len(X) <= muestra_silueta:
+            silueta = silueta_ponderada(X, etiquetas, pesos)
+        else:
+            # Muestra de filas: cada punto con probabilidad proporcional a su peso
+            rng = np.random.default_rng(semilla)
+            muestra = rng.choice(len(X), size=muestra_silueta, p=pesos / pesos.sum())
+            silueta = (float(silhouette_score(X[muestra], etiquetas[muestra]))
+                       if len(np.unique(etiquetas[muestra])) > 1 else np.nan)
+    return {"k": k, "semilla": semilla, "algoritmo": algoritmo, "inercia": float(modelo.inertia_),
+            "silueta": silueta, "segundos": segundos}
+
+
+def _leer_cache() -> dict:
+    try:
+        with open(ruta_cache, encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def _escribir_cache(resultados: dict) -> None:
+    os.makedirs(os.path.dirname(ruta_cache), exist_ok=True)
+    with open(f"{ruta_cache}.tmp", "w", encoding="utf-8") as f:
+        json.dump(resultados, f)
+    os.replace(f"{ruta_cache}.tmp", ruta_cache)
+
+
+def buscar(X: np.ndarray, ks=range(2, 9), semillas=range(5), algoritmo: str = "kmeans",
+           workers: int | None = None, pesos: np.ndarray | None = None) -> pd.DataFrame:
+    """Inercia y silueta de cada (k, semilla) sobre ``X`` ya estandarizado.
+
+    ``pesos``: filas que representa cada punto de ``X`` (``deduplicar``).
+
+    Solo se evalúan los k menores que el número de puntos distintos: con uno
+    por punto la partición es trivial (silueta 1) y con más K-Means no puede
+    formarlos. Devuelve una fila por configuración.
+    """
+    if pesos is None:
+        pesos = np.ones(len(X))
+    if algoritmo == "auto":
+        algoritmo = "minibatch" if len(X) >= umbral_minibatch else "kmeans"
+    distintos = len(np.unique(X, axis=0))
+    ks = [k for k in ks if 2 <= k < distintos]
+    if not ks:
+        raise ValueError(f"Ningún k evaluable con {distintos} puntos distintos")
+
+    hash_datos = _hash_datos(X, pesos)
+    cache = _leer_cache()
+    configs = {_clave_config(hash_datos, k, s, algoritmo): (k, s) for k, s in product(ks, semillas)}
+    pendientes = {clave: config for clave, config in configs.items() if clave not in cache}
+    print(f"[INFO] Selección de k: {len(configs)} configuraciones, {len(configs) - len(pendientes)} en caché")
+
+    if pendientes:
+        with ProcessPoolExecutor(max_workers=workers) as ejecutor:
+            futuros = {clave: ejecutor.submit(evaluar_config, X, k, s, algoritmo, pesos)
+                       for clave, (k, s) in pendientes.items()}
+            cache.update({clave: futuro.result() for clave, futuro in futuros.items()})
+        _escribir_cache(cache)
+
+    return pd.DataFrame([cache[clave] for clave in configs]).sort_values(["k", "semilla"], ignore_index=True)
+
+
+def mejor_config(resultados: pd.DataFrame) -> tuple[int, int]:
+    """(k, semilla): para cada k la semilla de menor inercia; gana el k de mayor silueta."""
+    por_k = resultados.loc[resultados.groupby("k")["inercia"].idxmin()]
+    ganador = por_k.loc[por_k["silueta"].idxmax()]
+    return int(ganador["k"]), int(ganador["semilla"])
+
+
+def escalar(df: pd.DataFrame) -> tuple[np.ndarray, np.ndarray]:
+    """(vectores distintos estandarizados, filas de cada uno) de las variables del clustering."""
+    unicos, pesos, _ = deduplicar(df[COLUMNAS_CLUSTER])
+    return StandardScaler().fit(unicos, sample_weight=pesos).transform(unicos), pesos
+
+
+def main() -> None:
+    from carga_datos import cargar_mercado
+
+    parser = argparse.ArgumentParser(description="Selección de k para el clustering económico")
+    parser.add_argument("--k", type=int, nargs=2, default=[2, 8], metavar=("MIN", "MAX"))
+    parser.add_argument("--semillas", type=int, default=5, help="inicializaciones por k")
+    parser.add_argument("--algoritmo", choices=["kmeans", "minibatch", "auto"], default="auto")
+    parser.add_argument("--workers", type=int, default=None, help="procesos (por defecto, uno por núcleo)")
+    args = parser.parse_args()
+
+    df = cargar_mercado(ruta_fichero, "analisis")
+    X, pesos = escalar(df)
+    resultados = buscar(X, range(args.k[0], args.k[1] + 1), range(args.semillas),
+                        args.algoritmo, args.workers, pesos)
+    print(resultados.to_string(index=False))
+    k, semilla = mejor_config(resultados)
+    print(f"\n>> Mejor configuración: k={k} (semilla {semilla})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+import json
+import math
+import os
+
+import numpy as np
+
+# ==========================================
+# SKETCH DE CUANTILES (KLL)
+# ==========================================
+# Resumen de tamaño acotado de una columna numérica para calcular cuantiles
+# aproximados sin ordenar (ni guardar) todos los valores. Es un sketch KLL
+# (Karnin, Lang, Liberty 2016): una pila de "compactadores"; el nivel h guarda
+# valores que representan 2^h originales cada uno. Cuando un nivel se llena se
+# ordena y la mitad de sus valores (los pares o los impares, al azar) sube al
+# siguiente nivel con el doble de peso.
+#
+# - ``actualizar`` añade un lote de valores (un lote del CSV, un shard del crawl).
+# - ``fusionar`` junta dos sketches (p. ej. de workers distintos) en uno que
+#   resume la unión de sus datos, con el mismo error.
+# - ``guardar`` / ``cargar`` lo persisten en JSON (unos pocos KB).
+#
+# El error se da como error de rango normalizado: el cuantil q devuelto está
+# entre los cuantiles exactos q - error y q + error (con alta probabilidad).
+# Mientras no se ha compactado nada el resultado es exacto e interpola igual
+# que ``Series.quantile``.
+
+# Factor de capacidad entre niveles consecutivos (el de la publicación)
+FACTOR_NIVEL = 2 / 3
+# Error de rango ~ A / k^B, ajuste empírico de Apache DataSketches para KLL
+CONSTANTE_ERROR = 2.296
+EXPONENTE_ERROR = 0.9723
+K_MINIMO = 8
+
+
+def error_de_k(k: int) -> float:
+    """Error de rango normalizado aproximado de un sketch con parámetro ``k``."""
+    return CONSTANTE_ERROR / k ** EXPONENTE_ERROR
+
+
+def k_para_error(error: float) -> int:
+    """Menor ``k`` cuyo error de rango no supera ``error`` (p. ej. 0.01 = 1%)."""
+    if not 0 < error < 1:
+        raise ValueError(f"El error de rango debe estar entre 0 y 1: {error!r}")
+    return max(math.ceil((CONSTANTE_ERROR / error) ** (1 / EXPONENTE_ERROR)), K_MINIMO)
+
+
+def cuantil_ponderado(valores: np.ndarray, pesos: np.ndarray, q: float) -> float:
+    """Cuantil ``q`` de ``valores`` donde cada uno cuenta ``pesos`` veces.
+
+    Interpola como ``Series.quantile`` (lineal, NaN si no hay datos): con todos
+    los pesos a 1 da exactamente el mismo float.
+    """
+    orden = np.argsort(valores, kind="stable")
+    valores = np.asarray(valores, dtype="float64")[orden]
+    acumulados = np.asarray(pesos)[orden].cumsum()
+    if len(valores) == 0 or acumulados[-1] == 0:
+        return np.nan
+    # Posición (0-based) del cuantil entre los datos ordenados y valores a sus lados
+    h = (acumulados[-1] - 1) * q
+    abajo = valores[np.searchsorted(acumulados, np.floor(h), side="right")]
+    arriba = valores[np.searchsorted(acumulados, np.ceil(h), side="right")]
+    # Misma fórmula que numpy (method="linear") para dar el mismo float
+    t = h - np.floor(h)
+    diferencia = arriba - abajo
+    return arriba - diferencia * (1 - t) if t >= 0.5 else abajo + diferencia * t
+
+
+class SketchKLL:
+    """Cuantiles aproximados de un flujo de valores en memoria O(k)."""
+
+    def __init__(self, k: int = 200, semilla: int = 0):
+        self.k = max(int(k), K_MINIMO)
+        self.semilla = semilla
+        self.n = 0
+        self.niveles = [np.empty(0)]
+        self._rng = np.random.default_rng(semilla)
+
+    @classmethod
+    def para_error(cls, error: float, semilla: int = 0) -> "SketchKLL":
+        return cls(k_para_error(error), semilla)
+
+    @property
+    def error(self) -> float:
+        return error_de_k(self.k)
+
+    @property
+    def retenidos(self) -> int:
+        return sum(len(nivel) for nivel in self.niveles)
+
+    def _capacidad(self, nivel: int) -> int:
+        profundidad = len(self.niveles) - nivel - 1
+        return max(math.ceil(self.k * FACTOR_NIVEL ** profundidad), 2)
+
+    def actualizar(self, valores) -> "SketchKLL":
+        """Añade ``valores`` (los NaN se ignoran, como en ``Series.quantile``)."""
+        valores = np.asarray(valores, dtype="float64")
+        valores = valores[~np.isnan(valores)]
+        if len(valores):
+            self.n += len(valores)
+            self.niveles[0] = np.concatenate([self.niveles[0], valores])
+            self._compactar()
+        return self
+
+    def fusionar(self, otro: "SketchKLL") -> "SketchKLL":
+        """Añade a este sketch los datos resumidos en ``otro``."""
+        self.k = min(self.k, otro.k)
+        while len(self.niveles) < len(otro.niveles):
+            self.niveles.append(np.empty(0))
+        for nivel, valores in enumerate(otro.niveles):
+            self.niveles[nivel] = np.concatenate([self.niveles[nivel], valores])
+        self.n += otro.n
+        self._compactar()
+        return self
+
+    def _compactar(self) -> None:
+        # Se compacta el nivel más bajo que se pase de capacidad hasta que no
+        # quede ninguno: un lote grande sube nivel a nivel, mitad a mitad
+        while True:
+            llenos = [h for h in range(len(self.niveles)) if len(self.niveles[h]) > self._capacidad(h)]
+            if not llenos:
+                return
+            nivel = llenos[0]
+            if nivel + 1 == len(self.niveles):
+                self.niveles.append(np.empty(0))
+            datos = np.sort(self.niveles[nivel])
+            # Con un número impar de valores, el último se queda en su nivel
+            resto = datos[len(datos) - len(datos) % 2:]
+            datos = datos[:len(datos) - len(datos) % 2]
+            promovidos = datos[self._rng.integers(2)::2]
+            self.niveles[nivel + 1] = np.concatenate([self.niveles[nivel + 1], promovidos])
+            self.niveles[nivel] = resto
+
+    def cuantil(self, q: float) -> float:
+        """Cuantil ``q`` aproximado (exacto mientras no se haya compactado)."""
+        valores = np.concatenate(self.niveles)
+        pesos = np.concatenate([np.full(len(v), 2 ** h, dtype="int64") for h, v in enumerate(self.niveles)])
+        return cuantil_ponderado(valores, pesos, q)
+
+    def a_dict(self) -> dict:
+        return {"k": self.k, "semilla": self.semilla, "n": self.n,
+                "niveles": [nivel.tolist() for nivel in self.niveles]}
+
+    @classmethod
+    def desde_dict(cls, datos: dict) -> "SketchKLL":
+        sketch = cls(datos["k"], datos["semilla"])
+        sketch.n = datos["n"]
+        sketch.niveles = [np.asarray(nivel, dtype="float64") for nivel in datos["niveles"]]
+        # Mismo sketch -> mismas compactaciones al seguir actualizándolo
+        sketch._rng = np.random.default_rng([datos["semilla"], datos["n"]])
+        return sketch
+
+    def guardar(self, ruta: str, **metadatos) -> None:
+        """Escribe el sketch (y ``metadatos`` JSON) en ``ruta`` de forma atómica."""
+        os.makedirs(os.path.dirname(ruta) or ".", exist_ok=True)
+        with open(f"{ruta}.tmp", "w", encoding="utf-8") as f:
+            json.dump({**metadatos, "sketch": self.a_dict()}, f)
+        os.replace(f"{ruta}.tmp", ruta)
+
+    @classmethod
+    def cargar(cls, ruta: str) -> tuple["SketchKLL", dict] | None:
+        """(sketch, metadatos) guardados en ``ruta``, o None si no hay o no se puede leer."""
+        try:
+            with open(ruta, encoding="utf-8") as f:
+                datos = json.load(f)
+            return cls.desde_dict(datos.pop("sketch")), datos
+        except (FileNotFoundError, json.JSONDecodeError, KeyError, TypeError):
+            return None
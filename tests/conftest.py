@@ -0,0 +1,7 @@
+import os
+import sys
+
+# Los módulos del proyecto se importan como en los scripts: desde src/ (y bench/)
+RUTA_PROYECTO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(RUTA_PROYECTO, "src"))
+sys.path.insert(0, os.path.join(RUTA_PROYECTO, "bench"))
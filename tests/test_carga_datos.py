@@ -0,0 +1,30 @@
+import pytest
+
+import carga_datos
+
+BLOQUE_PYARROW = 1 << 20
+
+
+@pytest.mark.skipif(carga_datos.motor_csv() != "pyarrow", reason="sin pyarrow")
+def test_celda_de_varias_lineas_en_el_corte_de_bloque_no_pierde_la_fila(tmp_path, capsys):
+    # pyarrow corta los bloques en el último salto de línea antes de 1 MiB: si
+    # es el de una celda entre comillas, la fila sale partida
+    lineas = ["titulo;pais;ubicacion_raw;salario_real_ajustado;desc_longitud\n"]
+    tamano = len(lineas[0])
+    while tamano < BLOQUE_PYARROW - 200:
+        lineas.append(f"Data Analyst {len(lineas)};US;Madrid;1.5;91.0\n")
+        tamano += len(lineas[-1])
+    inicio = f'Data Analyst {len(lineas)};US;"New York, NY'
+    lineas.append(inicio + "x" * (BLOQUE_PYARROW - tamano - len(inicio) - 5)
+                  + '\n(Garment District area)";1.5;91.0\n')
+    lineas += [f"Data Analyst {len(lineas) + i};US;Madrid;1.5;91.0\n" for i in range(1000)]
+    ruta = tmp_path / "mercado.csv"
+    ruta.write_text("".join(lineas), encoding="utf-8")
+
+    df = carga_datos.cargar_mercado(str(ruta), "analisis")
+    assert len(df) == len(lineas) - 1
+    assert df["titulo"].tolist() == [f"Data Analyst {i}" for i in range(1, len(lineas))]
+    assert "Se usa el parser en C" in capsys.readouterr().out
+
+    with pytest.raises(ValueError):
+        carga_datos.cargar_mercado(str(ruta), "analisis", motor="pyarrow")
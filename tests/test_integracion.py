@@ -0,0 +1,40 @@
+import pandas as pd
+import pytest
+
+import data_cleaning
+import integracion_datos
+
+COLUMNAS_MACRO = ['salario_medio_ppp_2024', 'indice_coste_vida_2024', 'indice_alquiler_2024',
+                  'salario_real_ajustado']
+
+
+@pytest.fixture
+def sin_cache(monkeypatch, tmp_path):
+    monkeypatch.setattr(integracion_datos, "ruta_cache_limpieza", str(tmp_path / "limpieza.sqlite"))
+
+
+def test_tabla_macro_con_oecd_vacio_conserva_las_columnas():
+    # El respaldo de cargar_oecd: columna de salario sin filas (dtype object)
+    oecd_vacio = pd.DataFrame(columns=['pais', 'salario_medio_ppp_2024'])
+    macro = integracion_datos.tabla_macro(oecd_vacio, integracion_datos.cargar_numbeo())
+    assert list(macro.columns) == COLUMNAS_MACRO
+    assert (macro.dtypes == "float64").all()
+    assert macro['salario_medio_ppp_2024'].isna().all()
+    assert macro['salario_real_ajustado'].isna().all()
+    assert macro['indice_coste_vida_2024'].notna().all()
+
+
+@pytest.mark.parametrize("contenido", [None, "columna;rota\n1;2\n"], ids=["sin_fichero", "malformado"])
+def test_integrar_sin_oecd_llega_a_la_limpieza(monkeypatch, tmp_path, sin_cache, contenido):
+    ruta = None
+    if contenido is not None:
+        ruta = tmp_path / "OECD_roto.csv"
+        ruta.write_text(contenido, encoding="utf-8")
+    monkeypatch.setattr(integracion_datos, "ruta_oecd", lambda: None if ruta is None else str(ruta))
+
+    df = integracion_datos.integrar(guardar=False)
+    assert set(COLUMNAS_MACRO) <= set(df.columns)
+    assert df['salario_medio_ppp_2024'].isna().all()
+    # Sin salarios no queda ninguna oferta, pero la limpieza no falla
+    limpio, _ = data_cleaning.filtrar_filas(df)
+    assert limpio.empty
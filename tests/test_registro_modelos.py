@@ -0,0 +1,23 @@
+import os
+
+import pandas as pd
+from sklearn.cluster import KMeans
+
+import registro_modelos
+import seleccion_clusters
+from carga_datos import cargar_mercado
+RUTA_LIMPIO = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "dataset",
+                           "Global Data Analyst Job Market_Clean.csv")
+
+
+def test_auto_elige_el_algoritmo_por_los_vectores_distintos(monkeypatch):
+    # Más filas que el umbral pero pocos vectores distintos: el ajuste
+    # deduplicado es pequeño y "auto" debe quedarse en KMeans
+    df = pd.concat([cargar_mercado(RUTA_LIMPIO, "limpieza")] * 4, ignore_index=True)
+    unicos, _, _ = seleccion_clusters.deduplicar(df[seleccion_clusters.COLUMNAS_CLUSTER])
+    monkeypatch.setattr(seleccion_clusters, "umbral_minibatch", len(unicos) + 1)
+    monkeypatch.setattr(registro_modelos, "algoritmo_kmeans", "auto")
+    assert len(df) >= seleccion_clusters.umbral_minibatch
+
+    modelos = registro_modelos.entrenar(df)
+    assert type(modelos.kmeans) is KMeans
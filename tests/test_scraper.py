@@ -0,0 +1,164 @@
+import json
+import os
+import threading
+
+import pytest
+
+import jobs_scraper
+import servidor_fixtures
+from checkpoint_crawl import id_de_url
+from escritura_ofertas import EscritorOfertas, SinkMemoria
+from fetchers import FetcherEscalado, FetcherHTTP, Pagina
+from limitador_ritmo import obtener_limitador
+from plan_crawl import expandir_plan
+
+# Crawl de extremo a extremo contra bench/servidor_fixtures.py (en un hilo y
+# puerto libre): FetcherHTTP de verdad, scrapear_todos y un SinkMemoria.
+
+PAGINAS = 5
+PAGINAS_PLAN = len(jobs_scraper.PAISES) * jobs_scraper.max_pages_per_country
+
+
+class FetcherContado(FetcherHTTP):
+    """FetcherHTTP que cuenta las páginas pedidas y puede cortarse tras ``limite``."""
+
+    def __init__(self, limite: int | None = None):
+        super().__init__()
+        self.limite = limite
+        self.pedidas = 0
+        self._lock = threading.Lock()
+
+    def obtener(self, url: str, esperar_challenge=None) -> Pagina:
+        with self._lock:
+            if self.limite is not None and self.pedidas >= self.limite:
+                raise RuntimeError("corte simulado del crawl")
+            self.pedidas += 1
+        return super().obtener(url, esperar_challenge)
+
+
+class NavegadorFalso(FetcherContado):
+    """Hace de FetcherNavegador (sin Chrome): descarga por HTTP y anota las URLs."""
+
+    nombre = "navegador"
+
+    def __init__(self):
+        super().__init__()
+        self.urls = []
+
+    def obtener(self, url: str, esperar_challenge=None) -> Pagina:
+        self.urls.append(url)
+        return super().obtener(url, esperar_challenge)
+
+
+@pytest.fixture(scope="module")
+def paises():
+    servidor = servidor_fixtures.arrancar(paginas=PAGINAS)
+    base = f"http://127.0.0.1:{servidor.server_address[1]}"
+    paises = {codigo: f"{base}/{codigo.lower()}" for codigo in jobs_scraper.PAISES}
+    for dominio in paises.values():
+        # Casi sin pausas entre peticiones: el servidor es local
+        obtener_limitador(dominio, intervalo_inicial=0.001, intervalo_min=0.001, jitter=0.0)
+    yield paises
+    servidor.shutdown()
+    servidor.server_close()
+
+
+@pytest.fixture
+def tareas(paises, monkeypatch, tmp_path):
+    # Checkpoints en un directorio temporal y sin challenges pendientes
+    monkeypatch.setattr(jobs_scraper, "ruta_dataset", str(tmp_path))
+    monkeypatch.setattr(servidor_fixtures.ManejadorFixtures, "challenges", set())
+    return expandir_plan(jobs_scraper.keywords, jobs_scraper.locations, paises)
+
+
+@pytest.fixture(scope="module")
+def esperados() -> set:
+    """``data-jk`` que sirve el servidor: los del corpus con el sufijo de página."""
+    with open(os.path.join(servidor_fixtures.RUTA_FIXTURES, "esperado.json"), encoding="utf-8") as f:
+        esperado = json.load(f)
+    ids = set()
+    for pais in jobs_scraper.PAISES:
+        for n in range(min(PAGINAS, jobs_scraper.max_pages_per_country)):
+            layout = servidor_fixtures.LAYOUTS[n % len(servidor_fixtures.LAYOUTS)]
+            ids.update(f"{job_id}p{n}" for job_id, _ in esperado[f"{pais.lower()}_{layout}.html"])
+    return ids
+
+
+def crawl(tareas: list, fetcher, checkpoints: dict | None = None) -> list[str]:
+    """``data-jk`` de las filas que llegan al sink."""
+    sink = SinkMemoria()
+    escritor = EscritorOfertas([sink], tamano_lote=50)
+    jobs_scraper.scrapear_todos(escritor, tareas=tareas, workers=len(tareas), checkpoints=checkpoints,
+                                fetcher=fetcher)
+    escritor.cerrar()
+    return [id_de_url(fila["url"]) for fila in sink.filas]
+
+
+def espiar_penalizaciones(monkeypatch, dominio: str) -> list:
+    limitador = obtener_limitador(dominio)
+    motivos = []
+    penalizar = limitador.penalizar
+    monkeypatch.setattr(limitador, "penalizar", lambda motivo: motivos.append(motivo) or penalizar(motivo))
+    return motivos
+
+
+def test_http_primero_extrae_todas_las_ofertas(tareas, esperados):
+    navegador = NavegadorFalso()
+    ids = crawl(tareas, FetcherEscalado(FetcherContado(), navegador))
+    assert len(ids) == len(esperados)
+    assert set(ids) == esperados
+    # Sin challenges no se abre el navegador
+    assert navegador.urls == []
+
+
+def test_challenge_por_http_penaliza_una_vez_y_reintenta(tareas, esperados, paises, monkeypatch):
+    motivos = espiar_penalizaciones(monkeypatch, paises["ES"])
+    servidor_fixtures.ManejadorFixtures.challenges = {("es", 0)}
+    fetcher = FetcherContado()
+    ids = crawl(tareas, fetcher)
+    assert motivos == ["challenge"]
+    assert fetcher.pedidas == PAGINAS_PLAN + 1
+    assert set(ids) == esperados
+
+
+def test_challenge_escala_solo_ese_dominio_al_navegador(tareas, esperados, paises, monkeypatch):
+    motivos = espiar_penalizaciones(monkeypatch, paises["ES"])
+    servidor_fixtures.ManejadorFixtures.challenges = {("es", 0)}
+    http, navegador = FetcherContado(), NavegadorFalso()
+    fetcher = FetcherEscalado(http, navegador)
+    ids = crawl(tareas, fetcher)
+    assert set(ids) == esperados
+    # Se escala una vez y el resto de páginas de ES ya van por el navegador
+    assert fetcher._escalados == {paises["ES"].split("/jobs")[0]}
+    assert len(navegador.urls) == jobs_scraper.max_pages_per_country
+    assert all(url.startswith(paises["ES"]) for url in navegador.urls)
+    assert http.pedidas == PAGINAS_PLAN - jobs_scraper.max_pages_per_country + 1
+    # La petición HTTP con challenge no espera: el remedio es el navegador
+    assert "challenge" not in motivos
+
+
+def test_reanuda_tras_un_corte(tareas, esperados):
+    corte = 7
+    checkpoints = jobs_scraper.abrir_checkpoints(tareas)
+    ids_corte = crawl(tareas, FetcherContado(limite=corte), checkpoints)
+    assert len(ids_corte) == corte * 15
+    # Al publicar un crawl incompleto el checkpoint se conserva
+    assert not jobs_scraper.cerrar_checkpoints(checkpoints, tareas)
+
+    reanudado = FetcherContado()
+    ids = crawl(tareas, reanudado, jobs_scraper.abrir_checkpoints(tareas))
+    assert reanudado.pedidas == PAGINAS_PLAN - corte
+    assert len(ids) == len(esperados)
+    assert set(ids) == esperados
+
+
+def test_un_crawl_completo_no_se_reanuda_tras_publicar(tareas, esperados):
+    checkpoints = jobs_scraper.abrir_checkpoints(tareas)
+    crawl(tareas, FetcherContado(), checkpoints)
+    assert jobs_scraper.cerrar_checkpoints(checkpoints, tareas)
+    assert not any(os.path.exists(c.ruta) for c in checkpoints.values())
+
+    siguiente = FetcherContado()
+    ids = crawl(tareas, siguiente, jobs_scraper.abrir_checkpoints(tareas))
+    assert siguiente.pedidas == PAGINAS_PLAN
+    assert set(ids) == esperados